@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 import os
 from pathlib import Path
 from decouple import config
@@ -17,6 +18,8 @@ from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Apps shared by every project in this repository (the common app) live at its root.
+sys.path.append(str(BASE_DIR.parent.parent))
 
 
 # Quick-start development settings - unsuitable for production
@@ -46,6 +49,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt.token_blacklist',
     
     'user',
+    'common',
 ]
 
 MIDDLEWARE = [
@@ -144,3 +148,7 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Per-user data exports written by build_data_exports, purged after DATA_EXPORT_TTL_DAYS.
+DATA_EXPORT_DIR = Path(config('DATA_EXPORT_DIR', default=str(BASE_DIR / 'exports')))
+DATA_EXPORT_TTL_DAYS = config('DATA_EXPORT_TTL_DAYS', default=7, cast=int)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, Post
+from .models import CustomUser, Post, AccountDeletion, DataExport
 
 
 class CustomUserAdmin(UserAdmin):
@@ -27,6 +27,19 @@ class PostAdmin(admin.ModelAdmin):
     search_fields = ('title', 'content')
 
 
+@admin.register(AccountDeletion)
+class AccountDeletionAdmin(admin.ModelAdmin):
+    list_display = ('email', 'status', 'step', 'requested_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('email',)
+
+
+@admin.register(DataExport)
+class DataExportAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'size', 'requested_at', 'finished_at')
+    list_filter = ('status',)
+
+
 admin.site.register(CustomUser, CustomUserAdmin)
 
 # Register your models here.
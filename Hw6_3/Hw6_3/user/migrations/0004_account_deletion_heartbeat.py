@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_data_export'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accountdeletion',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
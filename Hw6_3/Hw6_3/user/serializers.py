@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from .models import CustomUser, Post
+from .models import CustomUser, DataExport, Post
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -67,4 +67,11 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def validate(self, attrs):
         data = super().validate(attrs)
         data['user'] = UserSerializer(self.user).data
-        return data
\ No newline at end of file
+        return data
+
+
+class DataExportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DataExport
+        fields = ('id', 'status', 'size', 'rows', 'error', 'requested_at', 'finished_at')
+        read_only_fields = fields
@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import (
-    RegisterView, ProfileView,
+    RegisterView, ProfileView, DataExportView, DataExportDownloadView,
     LogoutView, PostListCreateView, PostDetailView,
     ChangePasswordView, CustomTokenObtainPairView
 )
@@ -11,6 +11,8 @@ from rest_framework_simplejwt.views import TokenRefreshView
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('profile/', ProfileView.as_view(), name='user-profile'),
+    path('exports/', DataExportView.as_view(), name='data-exports'),
+    path('exports/<int:pk>/download/', DataExportDownloadView.as_view(), name='data-export-download'),
 
     path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
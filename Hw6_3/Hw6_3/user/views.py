@@ -1,10 +1,13 @@
 from rest_framework import generics, permissions, viewsets, status
 from django.contrib.auth import get_user_model
-from .models import Post
+from .models import DataExport, Post
+from common import views as common
+from common.views import DeferredDeletionMixin
+from .deletion import request_deletion
 from rest_framework.response import Response
 from .serializers import (
     RegisterSerializer, UserSerializer, ChangePasswordSerializer, 
-    PostSerializer, CustomTokenObtainPairSerializer
+    PostSerializer, CustomTokenObtainPairSerializer, DataExportSerializer
 )
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -33,13 +36,23 @@ class LogoutView(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-class ProfileView(generics.RetrieveUpdateAPIView):
+class ProfileView(DeferredDeletionMixin, generics.RetrieveUpdateDestroyAPIView):
+    request_deletion = staticmethod(request_deletion)
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = UserSerializer
 
     def get_object(self):
         return self.request.user
 
+
+class DataExportView(common.DataExportView):
+    queue = DataExport
+    serializer_class = DataExportSerializer
+
+
+class DataExportDownloadView(common.DataExportDownloadView):
+    queue = DataExport
+
 class ChangePasswordView(generics.UpdateAPIView):
     serializer_class = ChangePasswordSerializer
     model = User
@@ -11,12 +11,15 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 ""
+import sys
 import os
 from pathlib import Path
 from decouple import config, Csv
 from datetime import timedelta
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Apps shared by every project in this repository (the common app) live at its root.
+sys.path.append(str(BASE_DIR.parent))
 
 
 # Quick-start development settings - unsuitable for production
@@ -46,6 +49,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt.token_blacklist',
     'social_django',
     'user',
+    'common',
 
 ]
 
@@ -124,6 +128,13 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -147,8 +158,20 @@ REST_FRAMEWORK = {
     'DEFAULT AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication'
         'rest_framework_simplejwt.authentication.JWTAuthentication',
-    ]
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': config('THROTTLE_AUTH_IP', default='30/min'),
+        'auth_email': config('THROTTLE_AUTH_EMAIL', default='10/min'),
+        'register_ip': config('THROTTLE_REGISTER_IP', default='20/hour'),
+    },
+    # Reverse proxies in front of the app: the throttles key on the client IP
+    # they append to X-Forwarded-For. 0 keys on REMOTE_ADDR, so a forged
+    # header cannot mint new IPs.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
+# Sliding-window throttles: keys kept per worker, and an optional cache alias shared by all workers.
+THROTTLE_MAX_KEYS = config('THROTTLE_MAX_KEYS', default=100000, cast=int)
+THROTTLE_SHARED_CACHE = config('THROTTLE_SHARED_CACHE', default='')
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
@@ -156,7 +179,15 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     "BLACKLIST_AFTER_ROTATION": True,
     "ROTATE_REFRESH_TOKENS": True,
+    'TOKEN_REFRESH_SERIALIZER': 'user.serializers.CachedTokenRefreshSerializer',
 }
+TOKEN_BLACKLIST_SYNC = config('TOKEN_BLACKLIST_SYNC', default=5, cast=int)
+TOKEN_FLUSH_INTERVAL = config('TOKEN_FLUSH_INTERVAL', default=2, cast=int)
+TOKEN_FLUSH_BATCH = config('TOKEN_FLUSH_BATCH', default=500, cast=int)
+
+# Password hashing pool for the async auth views; 0 workers means one per CPU.
+AUTH_HASH_WORKERS = config('AUTH_HASH_WORKERS', default=0, cast=int)
+AUTH_HASH_MAX_PENDING = config('AUTH_HASH_MAX_PENDING', default=64, cast=int)
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -179,3 +210,7 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Per-user data exports written by build_data_exports, purged after DATA_EXPORT_TTL_DAYS.
+DATA_EXPORT_DIR = Path(config('DATA_EXPORT_DIR', default=str(BASE_DIR / 'exports')))
+DATA_EXPORT_TTL_DAYS = config('DATA_EXPORT_TTL_DAYS', default=7, cast=int)
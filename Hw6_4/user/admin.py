@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, Note
+from .models import CustomUser, Note, AccountDeletion, DataExport
 
 
 class CustomUserAdmin(UserAdmin):
@@ -27,5 +27,7 @@ class CustomUserAdmin(UserAdmin):
 
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(Note)
+admin.site.register(AccountDeletion)
+admin.site.register(DataExport)
 
 # Register your models here.
@@ -0,0 +1,155 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import check_password, make_password
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .hashing import HashPoolFull, hash_pool
+from .models import CustomUser
+from .serializers import ChangePasswordSerializer, CustomTokenObtainPairSerializer, RegisterSerializer
+from common.throttling import AuthEmailThrottle, AuthIPThrottle, RegisterIPThrottle
+
+# Async counterparts of RegisterView, CustomTokenObtainPairView and
+# ChangePasswordView for ASGI deployments: password hashing goes to
+# hash_pool, so the event loop keeps serving other endpoints meanwhile.
+
+
+def _response(data, status=200, **kwargs):
+    return JsonResponse(data, status=status, json_dumps_params={'ensure_ascii': False}, **kwargs)
+
+
+def _busy():
+    return _response(
+        {'detail': 'Too many authentication requests, try again shortly.'},
+        status=503, headers={'Retry-After': '1'},
+    )
+
+
+def _throttled(checks):
+    """429 response for the first (throttle, key) pair over its rate, else None."""
+    for throttle, key in checks:
+        if key is not None and not throttle.allow(key):
+            wait = throttle.wait()
+            return _response(
+                {'detail': f'Request was throttled. Expected available in {int(wait) + 1} seconds.'},
+                status=429, headers={'Retry-After': str(int(wait) + 1)},
+            )
+    return None
+
+
+def _json_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def _authenticate(request):
+    """(user, None) for a valid bearer token, else (None, error response)."""
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except APIException as exc:
+        detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+        return None, _response(detail, status=exc.status_code)
+    if result is None:
+        return None, _response({'detail': 'Authentication credentials were not provided.'}, status=401)
+    return result[0], None
+
+
+@csrf_exempt
+@require_POST
+async def register(request):
+    throttle = RegisterIPThrottle()
+    if rejected := _throttled([(throttle, throttle.get_key(request))]):
+        return rejected
+    data = _json_body(request)
+    if data is None:
+        return _response({'detail': 'Invalid JSON body.'}, status=400)
+    serializer = RegisterSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return _response(serializer.errors, status=400)
+    fields = dict(serializer.validated_data)
+    try:
+        fields['password'] = await hash_pool.run(make_password, fields['password'])
+    except HashPoolFull:
+        return _busy()
+    fields['email'] = CustomUser.objects.normalize_email(fields['email'])
+    user = CustomUser(**fields)
+    await user.asave()
+    return _response(RegisterSerializer(user).data, status=201)
+
+
+@csrf_exempt
+@require_POST
+async def token_obtain(request):
+    data = _json_body(request)
+    if data is None:
+        return _response({'detail': 'Invalid JSON body.'}, status=400)
+    missing = {
+        field: ['This field is required.']
+        for field in ('email', 'password') if not isinstance(data.get(field), str) or not data[field]
+    }
+    if missing:
+        return _response(missing, status=400)
+    ip_throttle = AuthIPThrottle()
+    if rejected := _throttled([
+        (ip_throttle, ip_throttle.get_key(request)),
+        (AuthEmailThrottle(), data['email'].strip().lower()),
+    ]):
+        return rejected
+    user = await CustomUser.objects.filter(email=data['email']).afirst()
+    try:
+        if user is None:
+            # Hash anyway so unknown emails cost as much as wrong passwords.
+            await hash_pool.run(make_password, data['password'])
+            valid = False
+        else:
+            valid = await hash_pool.run(check_password, data['password'], user.password)
+    except HashPoolFull:
+        return _busy()
+    if not valid or not user.is_active:
+        return _response({'detail': 'No active account found with the given credentials'}, status=401)
+    # Issuing queues the OutstandingToken row: ORM territory, so off the event loop.
+    refresh = await sync_to_async(CustomTokenObtainPairSerializer.get_token)(user)
+    return _response({
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+        'user': {'id': user.id, 'email': user.email, 'role': user.role},
+    })
+
+
+@csrf_exempt
+@require_POST
+async def change_password(request):
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    data = _json_body(request)
+    if data is None:
+        return _response({'detail': 'Invalid JSON body.'}, status=400)
+    serializer = ChangePasswordSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return _response(serializer.errors, status=400)
+    try:
+        if not await hash_pool.run(check_password, serializer.validated_data['old_password'], user.password):
+            return _response({'error': 'Неверный старый пароль'}, status=400)
+        user.password = await hash_pool.run(make_password, serializer.validated_data['new_password'])
+    except HashPoolFull:
+        return _busy()
+    await user.asave(update_fields=['password'])
+    return _response({'status': 'Пароль изменён'})
+
+
+@require_GET
+async def hash_metrics(request):
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    if not (user.is_staff or user.role == 'admin'):
+        return _response({'detail': 'You do not have permission to perform this action.'}, status=403)
+    return _response(hash_pool.stats())
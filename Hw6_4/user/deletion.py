@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+
+from common import deletion as common
+from common.deletion import BATCH_SIZE
+
+from .models import AccountDeletion
+
+
+def request_deletion(user):
+    """Deactivate the user right away and queue their data for the background job."""
+    return common.request_deletion(AccountDeletion, user, email=user.email)
+
+
+def process_deletion(deletion, batch_size=BATCH_SIZE, pause=0.0):
+    return common.process_deletion(deletion, get_user_model(), batch_size, pause)
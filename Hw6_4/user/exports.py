@@ -0,0 +1,16 @@
+from common import exports as common
+from common.exports import rows
+
+from .models import Note
+
+
+def sections(user):
+    """(file name, rows) pairs that make up a user's export, each rows iterable lazy."""
+    return [
+        ('profile.jsonl', rows(type(user)._base_manager.filter(pk=user.pk))),
+        ('notes.jsonl', rows(Note.objects.filter(owner=user))),
+    ]
+
+
+def build_export(export):
+    return common.build_export(export, sections)
@@ -0,0 +1,91 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+class HashPoolFull(Exception):
+    pass
+
+
+class HashPool:
+    """Bounded thread pool for password hashing, with admission control and queue metrics.
+
+    PBKDF2 runs in hashlib with the GIL released, so a few threads keep the
+    CPUs busy while the event loop goes on serving other requests. At most
+    `max_pending` hashes may be running or queued; past that, `run` raises
+    HashPoolFull straight away instead of letting the queue (and latency)
+    grow without bound, so a burst of logins only slows down auth.
+    """
+
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+            return self._executor
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HashPoolFull
+            self._pending += 1
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+            try:
+                return func(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._wait_total += started - submitted
+                    self._wait_max = max(self._wait_max, started - submitted)
+                    self._run_total += finished - started
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), job)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self):
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'running': self._running,
+                'queued': self._pending - self._running,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'avg_wait_ms': round(self._wait_total / completed * 1000, 2),
+                'max_wait_ms': round(self._wait_max * 1000, 2),
+                'avg_hash_ms': round(self._run_total / completed * 1000, 2),
+            }
+
+
+hash_pool = HashPool(
+    workers=getattr(settings, 'AUTH_HASH_WORKERS', None) or os.cpu_count() or 1,
+    max_pending=getattr(settings, 'AUTH_HASH_MAX_PENDING', 64),
+)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0004_account_deletion_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataexport',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
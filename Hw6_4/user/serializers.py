@@ -1,7 +1,8 @@
 from rest_framework import serializers
-from .models import CustomUser, Note
+from .models import CustomUser, DataExport, Note
 from django.contrib.auth.password_validation import validate_password
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from common.tokens import CachedRefreshToken
 
 
 
@@ -39,6 +40,8 @@ class ChangePasswordSerializer(serializers.Serializer):
     
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+        token_class = CachedRefreshToken
+
         @classmethod
         def get_token(cls, user):
             token = super().get_token(user)
@@ -57,6 +60,10 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
             return data
         
 
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = CachedRefreshToken
+
+
 class ProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
@@ -67,4 +74,10 @@ class NoteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Note
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class DataExportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DataExport
+        fields = ('id', 'status', 'size', 'rows', 'error', 'requested_at', 'finished_at')
+        read_only_fields = fields
@@ -1,3 +1,59 @@
-from django.test import TestCase
+import asyncio
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from common.tokens import token_writer
+from .models import CustomUser
+
+
+class AsyncTokenObtainTests(TransactionTestCase):
+    def setUp(self):
+        CustomUser.objects.create_user(email='user@example.com', password='pw')
+
+    async def test_full_batch_is_written_off_the_event_loop(self):
+        # With a batch of one, every issued token fills the queue.
+        with mock.patch.object(token_writer, 'batch_size', 1), mock.patch.object(token_writer, 'interval', 60):
+            response = await self.async_client.post(
+                reverse('async_token_obtain_pair'), {'email': 'user@example.com', 'password': 'pw'},
+                content_type='application/json',
+            )
+            self.assertEqual(response.status_code, 200)
+            for _ in range(100):
+                if await OutstandingToken.objects.filter(user__email='user@example.com').aexists():
+                    break
+                await asyncio.sleep(0.05)
+            else:
+                self.fail("The writer thread did not write the token.")
+
+
+class AsyncChangePasswordTests(TransactionTestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='user@example.com', password='old-password')
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+
+    async def change(self, new_password):
+        return await self.async_client.post(
+            reverse('async_change_password'), {'old_password': 'old-password', 'new_password': new_password},
+            content_type='application/json', headers={'Authorization': self.auth},
+        )
+
+    async def test_weak_password_is_a_400(self):
+        response = await self.change('123')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('new_password', response.json())
+
+    async def test_password_is_changed(self):
+        response = await self.change('a-much-better-passphrase')
+        self.assertEqual(response.status_code, 200)
+        await self.user.arefresh_from_db()
+        self.assertTrue(self.user.check_password('a-much-better-passphrase'))
+
+
+class TokenObtainTests(TestCase):
+    def test_json_array_body_is_a_400(self):
+        response = self.client.post(reverse('token_obtain_pair'), '[{"email": "a@example.com"}]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
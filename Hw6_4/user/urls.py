@@ -3,10 +3,11 @@ from django.shortcuts import render
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
-    RegisterView, CustomTokenObtainPairView, ProfileView,
+    RegisterView, CustomTokenObtainPairView, ProfileView, DataExportView, DataExportDownloadView,
     ChangePasswordView, LogoutView, NoteViewSet
 )
 from rest_framework_simplejwt.views import TokenRefreshView
+from . import async_views
 
 router = DefaultRouter()
 router.register('notes', NoteViewSet, basename='notes')
@@ -19,8 +20,14 @@ urlpatterns = [
     path('token/', CustomTokenObtainPairView.as_view(), name ='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name= 'refresh_token'),
     path('profile/', ProfileView.as_view(), name= 'profile'),
+    path('exports/', DataExportView.as_view(), name='data_exports'),
+    path('exports/<int:pk>/download/', DataExportDownloadView.as_view(), name='data_export_download'),
     path('change-password/', ChangePasswordView.as_view(),name ='change_password'),
     path('logout/', LogoutView.as_view(), name= 'logout'),
+    path('async/register/', async_views.register, name='async_register'),
+    path('async/token/', async_views.token_obtain, name='async_token_obtain_pair'),
+    path('async/change-password/', async_views.change_password, name='async_change_password'),
+    path('async/metrics/', async_views.hash_metrics, name='async_hash_metrics'),
     path('', include(router.urls)), 
     path("auth/", include("social_django.urls"), name="social"),
     path("login/", login_view, name='login'),
@@ -1,16 +1,20 @@
 # User/views.py
-from rest_framework import generics, permissions, viewsets
+from rest_framework import generics, permissions, status, viewsets
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
-from .models import Note
+from common import views as common
+from common.views import DeferredDeletionMixin
+from .deletion import request_deletion
+from .models import DataExport, Note
 from .serializers import (
     RegisterSerializer, CustomTokenObtainPairSerializer, ProfileSerializer,
-    ChangePasswordSerializer, NoteSerializer
+    ChangePasswordSerializer, NoteSerializer, DataExportSerializer
 )
 from .permissions import IsOwnerOrAdminPermission
+from common.throttling import AuthEmailThrottle, AuthIPThrottle, RegisterIPThrottle
+from common.tokens import CachedRefreshToken
 
 User = get_user_model()
 
@@ -18,13 +22,17 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    authentication_classes = ()
+    throttle_classes = [RegisterIPThrottle]
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [AuthIPThrottle, AuthEmailThrottle]
 
 
-class ProfileView(generics.RetrieveUpdateAPIView):
+class ProfileView(DeferredDeletionMixin, generics.RetrieveUpdateDestroyAPIView):
+    request_deletion = staticmethod(request_deletion)
     serializer_class = ProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -32,6 +40,15 @@ class ProfileView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
+class DataExportView(common.DataExportView):
+    queue = DataExport
+    serializer_class = DataExportSerializer
+
+
+class DataExportDownloadView(common.DataExportDownloadView):
+    queue = DataExport
+
+
 class ChangePasswordView(generics.UpdateAPIView):
     serializer_class = ChangePasswordSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -53,7 +70,7 @@ class LogoutView(generics.GenericAPIView):
     def post(self, request):
         try:
             refresh_token = request.data["refresh"]
-            token = RefreshToken(refresh_token)
+            token = CachedRefreshToken(refresh_token)
             token.blacklist()
             return Response({"status": "Вы вышли"})
         except Exception:
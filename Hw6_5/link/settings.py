@@ -11,12 +11,15 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 ""
+import sys
 import os
 from pathlib import Path
 from decouple import config, Csv
 from datetime import timedelta
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Apps shared by every project in this repository (the common app) live at its root.
+sys.path.append(str(BASE_DIR.parent))
 
 
 # Quick-start development settings - unsuitable for production
@@ -46,6 +49,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt.token_blacklist',
     'social_django',
     'user',
+    'common',
 
 ]
 
@@ -124,6 +128,44 @@ DATABASES = {
     }
 }
 
+# Links and their click tables can be split by owner across LINK_SHARD_COUNT
+# SQLite files (links_0 ... links_N-1); 0 keeps everything in the default
+# database. Each shard is migrated with `migrate --database links_<n>`.
+LINK_SHARD_COUNT = config('LINK_SHARD_COUNT', default=0, cast=int)
+LINK_SHARD_DIR = Path(config('LINK_SHARD_DIR', default=str(BASE_DIR)))
+for shard in range(LINK_SHARD_COUNT):
+    DATABASES[f'links_{shard}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': LINK_SHARD_DIR / f'links_{shard}.sqlite3',
+        'OPTIONS': {'timeout': 20},
+    }
+DATABASE_ROUTERS = ['user.sharding.LinkShardRouter'] if LINK_SHARD_COUNT else []
+
+
+# Use a shared backend (Redis, Memcached) in production: the short code filter
+# is only used when new links published by one worker reach all the others.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+LINK_CACHE_SIZE = config('LINK_CACHE_SIZE', default=100000, cast=int)
+LINK_CACHE_LOCAL_TTL = config('LINK_CACHE_LOCAL_TTL', default=5, cast=int)
+LINK_CACHE_TIMEOUT = config('LINK_CACHE_TIMEOUT', default=3600, cast=int)
+LINK_NEGATIVE_CACHE_TTL = config('LINK_NEGATIVE_CACHE_TTL', default=30, cast=int)
+LINK_BLOOM_CAPACITY = config('LINK_BLOOM_CAPACITY', default=1000000, cast=int)
+LINK_BLOOM_ERROR_RATE = config('LINK_BLOOM_ERROR_RATE', default=0.01, cast=float)
+LINK_BLOOM_REFRESH = config('LINK_BLOOM_REFRESH', default=30, cast=int)
+LINK_BLOOM_REBUILD = config('LINK_BLOOM_REBUILD', default=1800, cast=int)
+CLICK_FLUSH_INTERVAL = config('CLICK_FLUSH_INTERVAL', default=5, cast=int)
+CLICK_MAX_PENDING_EVENTS = config('CLICK_MAX_PENDING_EVENTS', default=100000, cast=int)
+CLICK_RAW_RETENTION_DAYS = config('CLICK_RAW_RETENTION_DAYS', default=30, cast=int)
+BULK_LINK_MAX_ITEMS = config('BULK_LINK_MAX_ITEMS', default=10000, cast=int)
+CLICK_ENRICH_CACHE_SIZE = config('CLICK_ENRICH_CACHE_SIZE', default=200000, cast=int)
+CLICK_ENRICH_POOL_THRESHOLD = config('CLICK_ENRICH_POOL_THRESHOLD', default=2000, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -156,7 +198,12 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     "BLACKLIST_AFTER_ROTATION": True,
     "ROTATE_REFRESH_TOKENS": True,
+    'TOKEN_OBTAIN_SERIALIZER': 'user.serializers.CachedTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'user.serializers.CachedTokenRefreshSerializer',
 }
+TOKEN_BLACKLIST_SYNC = config('TOKEN_BLACKLIST_SYNC', default=5, cast=int)
+TOKEN_FLUSH_INTERVAL = config('TOKEN_FLUSH_INTERVAL', default=2, cast=int)
+TOKEN_FLUSH_BATCH = config('TOKEN_FLUSH_BATCH', default=500, cast=int)
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -179,3 +226,7 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Per-user data exports written by build_data_exports, purged after DATA_EXPORT_TTL_DAYS.
+DATA_EXPORT_DIR = Path(config('DATA_EXPORT_DIR', default=str(BASE_DIR / 'exports')))
+DATA_EXPORT_TTL_DAYS = config('DATA_EXPORT_TTL_DAYS', default=7, cast=int)
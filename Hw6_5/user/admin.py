@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, Link
+from .models import CustomUser, Link, ClickEvent, HourlyClickRollup, DailyClickRollup, AccountDeletion, DataExport
 
 
 class CustomUserAdmin(UserAdmin):
@@ -27,5 +27,10 @@ class CustomUserAdmin(UserAdmin):
 
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(Link)
+admin.site.register(ClickEvent)
+admin.site.register(HourlyClickRollup)
+admin.site.register(DailyClickRollup)
+admin.site.register(AccountDeletion)
+admin.site.register(DataExport)
 
 # Register your models here.
@@ -0,0 +1,146 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import ClickEvent, HourlyClickRollup, DailyClickRollup, RollupCursor
+from .sharding import shard_aliases
+
+
+BATCH_SIZE = 10_000
+ROLLUPS = {
+    'hour': HourlyClickRollup,
+    'day': DailyClickRollup,
+}
+
+
+def truncate(value, granularity):
+    value = value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if granularity == 'day' else value
+
+
+def aggregate(events):
+    counts = Counter()
+    for _, link_id, created_at, referrer, browser, os, device in events:
+        for granularity in ROLLUPS:
+            bucket = truncate(created_at, granularity)
+            counts[granularity, link_id, bucket, '', ''] += 1
+            counts[granularity, link_id, bucket, 'referrer', referrer] += 1
+            counts[granularity, link_id, bucket, 'browser', browser] += 1
+            counts[granularity, link_id, bucket, 'os', os] += 1
+            counts[granularity, link_id, bucket, 'device', device] += 1
+    return counts
+
+
+def apply_counts(counts, using='default'):
+    """Add aggregated counts to the rollup tables (update existing rows, insert the rest)."""
+    for granularity, model in ROLLUPS.items():
+        rows = {key[1:]: n for key, n in counts.items() if key[0] == granularity}
+        if not rows:
+            continue
+        existing = model.objects.using(using).filter(
+            link_id__in={key[0] for key in rows},
+            bucket__in={key[1] for key in rows},
+        )
+        increments = []
+        for rollup_id, link_id, bucket, dimension, value in existing.values_list('id', 'link_id', 'bucket', 'dimension', 'value'):
+            key = (link_id, bucket, dimension, value)
+            if key in rows:
+                increments.append((rows.pop(key), rollup_id))
+        if increments:
+            # executemany with an in-place increment; bulk_update builds a CASE per row.
+            quote = connections[using].ops.quote_name
+            table = quote(model._meta.db_table)
+            with connections[using].cursor() as cursor:
+                cursor.executemany(
+                    f"UPDATE {table} SET {quote('clicks')} = {quote('clicks')} + %s WHERE {quote('id')} = %s",
+                    increments,
+                )
+        model.objects.using(using).bulk_create(
+            [
+                model(link_id=link_id, bucket=bucket, dimension=dimension, value=value, clicks=n)
+                for (link_id, bucket, dimension, value), n in rows.items()
+            ],
+            batch_size=500,
+        )
+
+
+def rollup_clicks(batch_size=BATCH_SIZE, using=None):
+    """Fold enriched click events past the cursor into hourly and daily rollups, per shard."""
+    if using is None:
+        return sum(rollup_clicks(batch_size, alias) for alias in shard_aliases())
+    processed = 0
+    while True:
+        with transaction.atomic(using=using):
+            cursor, _ = RollupCursor.objects.using(using).select_for_update().get_or_create(name='clicks')
+            # Everything up to the enrich cursor has been enriched; newer events wait for it.
+            enriched_up_to = (
+                RollupCursor.objects.using(using).filter(name='enrich').values_list('last_event_id', flat=True).first() or 0
+            )
+            events = list(
+                ClickEvent.objects.using(using).filter(id__gt=cursor.last_event_id, id__lte=enriched_up_to).order_by('id')
+                .values_list('id', 'link_id', 'created_at', 'referrer_domain', 'browser', 'os', 'device')[:batch_size]
+            )
+            if not events:
+                return processed
+            apply_counts(aggregate(events), using)
+            cursor.last_event_id = events[-1][0]
+            cursor.save(update_fields=['last_event_id'])
+        processed += len(events)
+
+
+def enrich_backlog(using=None):
+    """Click events past the enrich cursor, which rollup_clicks leaves until enrich_clicks reaches them."""
+    if using is None:
+        return sum(enrich_backlog(alias) for alias in shard_aliases())
+    enriched_up_to = (
+        RollupCursor.objects.using(using).filter(name='enrich').values_list('last_event_id', flat=True).first() or 0
+    )
+    return ClickEvent.objects.using(using).filter(id__gt=enriched_up_to).count()
+
+
+def compact_events(retention_days=None, batch_size=BATCH_SIZE, using=None):
+    """Delete raw events that are both rolled up and older than the retention window."""
+    if using is None:
+        return sum(compact_events(retention_days, batch_size, alias) for alias in shard_aliases())
+    if retention_days is None:
+        retention_days = getattr(settings, 'CLICK_RAW_RETENTION_DAYS', 30)
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    events = ClickEvent.objects.using(using)
+    last_event_id = RollupCursor.objects.using(using).filter(name='clicks').values_list('last_event_id', flat=True).first() or 0
+    deleted = 0
+    while True:
+        ids = list(
+            events.filter(id__lte=last_event_id, created_at__lt=cutoff)
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += events.filter(id__in=ids).delete()[0]
+
+
+def link_analytics(link, granularity, start, end, top=20):
+    model = ROLLUPS[granularity]
+    rows = model.objects.using(link._state.db).filter(link=link, bucket__gte=start, bucket__lt=end)
+    series = rows.filter(dimension='').order_by('bucket').values_list('bucket', 'clicks')
+
+    def breakdown(dimension):
+        return [
+            {'value': row['value'], 'clicks': row['total']}
+            for row in rows.filter(dimension=dimension).values('value')
+            .annotate(total=Sum('clicks')).order_by('-total')[:top]
+        ]
+
+    return {
+        'granularity': granularity,
+        'start': start,
+        'end': end,
+        'series': [{'bucket': bucket, 'clicks': clicks} for bucket, clicks in series],
+        'referrers': breakdown('referrer'),
+        'browsers': breakdown('browser'),
+        'operating_systems': breakdown('os'),
+        'devices': breakdown('device'),
+    }
@@ -0,0 +1,185 @@
+import logging
+import math
+import threading
+import time
+from datetime import timedelta
+from hashlib import blake2b
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+# How far back each refresh looks past the previous one: covers transactions
+# that committed after it ran and clock drift between app servers.
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, using blake2b double hashing."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+class CodeFilter:
+    """Per-worker filter of every short code, used to reject unknown codes without a query.
+
+    The first lookup starts a background build from a streamed values_list;
+    until it finishes every code is treated as "maybe present". Links saved in
+    this worker are added directly, and every `refresh` seconds a background
+    pass picks up links created elsewhere by created_at on each shard (not by id: with
+    sharding, ids come from per-worker blocks and arrive out of order). Private
+    codes are included too, so flipping is_public never needs a rebuild. Every
+    `rebuild` seconds the filter is rebuilt from scratch to drop deleted codes.
+    """
+
+    def __init__(self, capacity, error_rate, refresh, rebuild):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh = refresh
+        self.rebuild = rebuild
+        self._filter = None
+        self._since = None
+        self._next_refresh = 0.0
+        self._next_rebuild = 0.0
+        self._lock = threading.Lock()
+        self._building = False
+        self._refreshing = False
+
+    @property
+    def ready(self):
+        return self._filter is not None
+
+    def might_contain(self, short_code):
+        bloom = self._filter
+        if bloom is None:
+            self._start_build()
+            return True
+        if time.monotonic() >= self._next_rebuild:
+            self._start_build()
+        elif time.monotonic() >= self._next_refresh:
+            self._start_refresh()
+        return short_code in bloom
+
+    def add(self, short_code):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(short_code)
+
+    def _start_build(self):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self.build, name='link-bloom-build', daemon=True).start()
+
+    def _start_refresh(self):
+        # Lookups never wait for the refresh queries; they use the filter as it is.
+        with self._lock:
+            if self._building or self._refreshing or time.monotonic() < self._next_refresh:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name='link-bloom-refresh', daemon=True).start()
+
+    def _background_refresh(self):
+        from .sharding import shard_aliases
+
+        try:
+            self._refresh(force=True)
+        finally:
+            with self._lock:
+                self._refreshing = False
+            self._close(shard_aliases())
+
+    def build(self):
+        from .models import Link
+        from .sharding import shard_aliases
+
+        aliases = shard_aliases()
+        started = timezone.now()
+        try:
+            total = sum(Link.objects.using(alias).count() for alias in aliases)
+            bloom = BloomFilter(max(self.capacity, total * 2), self.error_rate)
+            for alias in aliases:
+                rows = Link.objects.using(alias).order_by().values_list('short_code', flat=True)
+                for short_code in rows.iterator(chunk_size=10_000):
+                    bloom.add(short_code)
+        except DatabaseError:
+            logger.exception("Building the short code filter failed.")
+            with self._lock:
+                self._building = False
+            self._close(aliases)
+            return
+        with self._lock:
+            self._filter, self._since = bloom, started
+            self._next_refresh = time.monotonic() + self.refresh
+            self._next_rebuild = time.monotonic() + self.rebuild
+            self._building = False
+        # Links saved while the build was streaming are caught by this pass.
+        self._refresh(force=True)
+        self._close(aliases)
+
+    def _close(self, aliases):
+        # The build runs in its own thread, which owns its own connections.
+        for alias in aliases:
+            connections[alias].close()
+
+    def _refresh(self, force=False):
+        from .models import Link
+        from .sharding import shard_aliases
+
+        with self._lock:
+            if not force and (self._building or time.monotonic() < self._next_refresh):
+                return
+            self._next_refresh = time.monotonic() + self.refresh
+            since = self._since
+        now = timezone.now()
+        try:
+            codes = [
+                code
+                for alias in shard_aliases()
+                for code in Link.objects.using(alias).filter(created_at__gte=since - REFRESH_OVERLAP)
+                .order_by().values_list('short_code', flat=True)
+            ]
+        except DatabaseError:
+            logger.exception("Refreshing the short code filter failed.")
+            return
+        with self._lock:
+            for short_code in codes:
+                # The overlap sees recent codes twice; count only new ones toward capacity.
+                if short_code not in self._filter:
+                    self._filter.add(short_code)
+            self._since = max(self._since, now)
+            rebuild = self._filter.count > self._filter.capacity
+        if rebuild:
+            self._start_build()
+
+
+code_filter = CodeFilter(
+    capacity=getattr(settings, 'LINK_BLOOM_CAPACITY', 1_000_000),
+    error_rate=getattr(settings, 'LINK_BLOOM_ERROR_RATE', 0.01),
+    refresh=getattr(settings, 'LINK_BLOOM_REFRESH', 30),
+    rebuild=getattr(settings, 'LINK_BLOOM_REBUILD', 1800),
+)
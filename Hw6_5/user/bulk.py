@@ -0,0 +1,180 @@
+import csv
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .dedupe import url_hash
+from .link_cache import publish
+from .models import Link
+from .shortcodes import allocator
+
+
+BATCH_SIZE = 1000
+URL_MAX_LENGTH = Link._meta.get_field('target_url').max_length
+TITLE_MAX_LENGTH = Link._meta.get_field('title').max_length
+FORMATS = ('csv', 'jsonl')
+
+validate_url = URLValidator()
+TRUE_VALUES = ('1', 'true', 'yes', 'y')
+
+
+def parse_flag(value, default=False):
+    """Read a boolean from JSON, CSV or a query string; only 1/true/yes/y spell true, so "false" is False."""
+    if value is None or value == '':
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_VALUES
+    return bool(value)
+
+
+def _text(row, *keys):
+    for key in keys:
+        value = row.get(key)
+        if value not in (None, ''):
+            if not isinstance(value, str):
+                raise ValidationError(f"{key} must be a string.")
+            return value.strip()
+    return ''
+
+
+def clean_row(row, default_public=False):
+    """Return (target_url, title, is_public, expires_at, max_clicks) or raise ValidationError."""
+    if isinstance(row, ValidationError):
+        raise row
+    if isinstance(row, str):
+        row = {'target_url': row}
+    if not isinstance(row, dict):
+        raise ValidationError("Each item must be a URL or an object with target_url.")
+    url = _text(row, 'target_url', 'url')
+    if not url:
+        raise ValidationError("target_url is required.")
+    if len(url) > URL_MAX_LENGTH:
+        raise ValidationError(f"target_url is longer than {URL_MAX_LENGTH} characters.")
+    validate_url(url)
+    title = _text(row, 'title')
+    if len(title) > TITLE_MAX_LENGTH:
+        raise ValidationError(f"title is longer than {TITLE_MAX_LENGTH} characters.")
+    is_public = parse_flag(row.get('is_public'), default_public)
+    expires_at = row.get('expires_at') or None
+    if expires_at is not None:
+        try:
+            expires_at = parse_datetime(str(expires_at).strip())
+        except ValueError:
+            expires_at = None
+        if expires_at is None:
+            raise ValidationError("expires_at must be an ISO 8601 datetime.")
+        if timezone.is_naive(expires_at):
+            expires_at = timezone.make_aware(expires_at)
+    max_clicks = row.get('max_clicks')
+    if max_clicks in (None, ''):
+        max_clicks = None
+    else:
+        try:
+            max_clicks = int(max_clicks)
+        except (TypeError, ValueError):
+            raise ValidationError("max_clicks must be a positive integer.")
+        if max_clicks < 1:
+            raise ValidationError("max_clicks must be a positive integer.")
+    return url, title, is_public, expires_at, max_clicks
+
+
+def validate_rows(rows, default_public=False, start=0):
+    cleaned, errors = [], []
+    for index, row in enumerate(rows, start):
+        try:
+            cleaned.append(clean_row(row, default_public))
+        except ValidationError as exc:
+            errors.append({'index': index, 'error': ' '.join(exc.messages)})
+    return cleaned, errors
+
+
+def create_links(owner, cleaned, batch_size=BATCH_SIZE, reuse=False):
+    """Insert already validated rows.
+
+    Returns (created, reused) lists of (target_url, short_code) pairs; with
+    reuse, rows whose URL the owner already has a live link for (or that
+    repeat an earlier row) get that link's code instead of a new link.
+    """
+    if not cleaned:
+        return [], []
+    digests = [url_hash(row[0]) for row in cleaned]
+    manager = Link.objects.for_owner(owner)
+    for attempt in range(2):
+        try:
+            with transaction.atomic(using=manager.db):
+                return _create_links(manager, owner, cleaned, digests, batch_size, reuse)
+        except IntegrityError:
+            # A concurrent create claimed one of the URLs; re-read and retry once.
+            if attempt:
+                raise
+
+
+def _create_links(manager, owner, cleaned, digests, batch_size, reuse):
+    canonical, stale = {}, []
+    unique = list(set(digests))
+    for start in range(0, len(unique), batch_size):
+        existing = manager.filter(owner=owner, url_hash__in=unique[start:start + batch_size]).only(
+            'id', 'url_hash', 'short_code', 'clicks', 'expires_at', 'max_clicks',
+        )
+        for link in existing:
+            if reuse and link.is_expired():
+                stale.append(link.pk)
+            else:
+                canonical[link.url_hash] = link
+    if stale:
+        manager.filter(pk__in=stale).update(url_hash=None)
+
+    links, reused = [], []
+    for (url, title, is_public, expires_at, max_clicks), digest in zip(cleaned, digests):
+        if reuse and digest in canonical:
+            reused.append((url, canonical[digest]))
+            continue
+        link = Link(
+            owner=owner, target_url=url, title=title, is_public=is_public,
+            expires_at=expires_at, max_clicks=max_clicks,
+            url_hash=None if digest in canonical else digest,
+        )
+        canonical.setdefault(digest, link)
+        links.append(link)
+    # One reservation covers the whole import instead of one per link.
+    for link, code in zip(links, allocator.allocate(len(links))):
+        link.short_code = code
+    manager.bulk_create(links, batch_size=batch_size)
+    # bulk_create sends no post_save, so publish the new codes here.
+    transaction.on_commit(lambda: publish(links), using=manager.db)
+    return [(link.target_url, link.short_code) for link in links], [(url, link.short_code) for url, link in reused]
+
+
+def read_rows(stream, fmt):
+    """Yield rows from a text stream of CSV (with a header) or JSON lines."""
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield row
+        return
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield ValidationError("Invalid JSON line.")
+
+
+def import_links(owner, stream, fmt, default_public=False, batch_size=BATCH_SIZE, reuse=False):
+    """Import a file in batches so memory stays bounded; yields (created, reused, errors) per batch."""
+    rows = read_rows(stream, fmt)
+    start = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        cleaned, errors = validate_rows(batch, default_public, start)
+        created, reused = create_links(owner, cleaned, batch_size, reuse)
+        yield created, reused, errors
+        start += len(batch)
@@ -0,0 +1,137 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+FLUSH_CHUNK = 500
+
+
+class ClickBuffer:
+    """Per-worker click counts and raw click events, written in one transaction per shard per flush.
+
+    Redirects only touch in-memory structures; a daemon thread flushes every
+    `interval` seconds and once more at interpreter exit, so at most one
+    interval of clicks can be lost if the worker is killed. Past
+    `max_events` unflushed events, further events are dropped (and
+    counted) while click totals keep counting.
+    """
+
+    def __init__(self, interval, max_events):
+        self.interval = interval
+        self.max_events = max_events
+        self.dropped_events = 0
+        self._counts = Counter()
+        self._events = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def record(self, link_id, referrer='', user_agent='', db='default'):
+        # Keyed by (database, id): each shard is flushed in its own transaction.
+        event = ((db, link_id), timezone.now(), referrer[:512], user_agent[:512])
+        with self._lock:
+            self._counts[db, link_id] += 1
+            if len(self._events) < self.max_events:
+                self._events.append(event)
+            else:
+                self.dropped_events += 1
+        if self._thread is None:
+            self._start()
+
+    def pending(self, link_id, db='default'):
+        with self._lock:
+            return self._counts.get((db, link_id), 0)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='click-flusher', daemon=True)
+            self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        # Nothing restarts this thread, so no error may end the loop.
+        while not self._stopped.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Click flush failed, will retry.")
+
+    def flush(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            events, self._events = self._events, []
+        if not counts:
+            return 0
+        failed = None
+        for db in {db for db, _ in counts}:
+            shard_counts = {link_id: n for (alias, link_id), n in counts.items() if alias == db}
+            shard_events = [(key[1], *rest) for key, *rest in events if key[0] == db]
+            try:
+                self._flush_shard(db, shard_counts, shard_events)
+            except Exception as exc:
+                # The shard's transaction rolled back: only its clicks go back in the buffer.
+                with self._lock:
+                    self._counts.update({(db, link_id): n for link_id, n in shard_counts.items()})
+                    requeue = [((db, link_id), *rest) for link_id, *rest in shard_events]
+                    self._events[:0] = requeue[:max(self.max_events - len(self._events), 0)]
+                failed = exc
+                continue
+            try:
+                self._invalidate_exhausted(db, list(shard_counts))
+            except Exception:
+                # The clicks are committed already, so they must not go back in the buffer.
+                logger.exception("Invalidating exhausted links failed.")
+        if failed is not None:
+            raise failed
+        return sum(counts.values())
+
+    def _flush_shard(self, db, counts, events):
+        from .models import ClickEvent, Link
+
+        items = list(counts.items())
+        with transaction.atomic(using=db):
+            for start in range(0, len(items), FLUSH_CHUNK):
+                chunk = items[start:start + FLUSH_CHUNK]
+                increment = Case(*[When(pk=pk, then=Value(n)) for pk, n in chunk], default=Value(0))
+                Link.objects.using(db).filter(pk__in=[pk for pk, _ in chunk]).update(clicks=F('clicks') + increment)
+            # Links deleted (or moved to another shard) since the click was recorded would break the FK.
+            existing = set(Link.objects.using(db).filter(pk__in=counts).values_list('pk', flat=True))
+            ClickEvent.objects.using(db).bulk_create(
+                [
+                    ClickEvent(link_id=link_id, created_at=created_at, referrer=referrer, user_agent=user_agent)
+                    for link_id, created_at, referrer, user_agent in events if link_id in existing
+                ],
+                batch_size=FLUSH_CHUNK,
+            )
+
+    def _invalidate_exhausted(self, db, link_ids):
+        # Cached entries carry the click total from load time; drop the ones that
+        # just reached max_clicks so every worker reloads them as exhausted.
+        from .link_cache import invalidate
+        from .models import Link
+
+        for start in range(0, len(link_ids), FLUSH_CHUNK):
+            exhausted = Link.objects.using(db).filter(
+                pk__in=link_ids[start:start + FLUSH_CHUNK], max_clicks__isnull=False, clicks__gte=F('max_clicks'),
+            ).values_list('short_code', flat=True)
+            for short_code in exhausted:
+                invalidate(short_code)
+
+    def stop(self):
+        self._stopped.set()
+        self.flush()
+
+
+click_buffer = ClickBuffer(
+    interval=getattr(settings, 'CLICK_FLUSH_INTERVAL', 5),
+    max_events=getattr(settings, 'CLICK_MAX_PENDING_EVENTS', 100_000),
+)
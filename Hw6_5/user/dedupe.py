@@ -0,0 +1,63 @@
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+from django.db import IntegrityError, transaction
+
+from .shortcodes import allocator
+
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """Lower-case scheme and host, drop default ports and fragments; path and query are kept as is."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host
+    if parts.username:
+        userinfo = parts.username + (f':{parts.password}' if parts.password else '')
+        netloc = f'{userinfo}@{netloc}'
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{port}'
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+def url_hash(url):
+    return hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+
+def create_link(owner, reuse=False, **fields):
+    """Create a link, or with reuse return the owner's live link for the same URL.
+
+    Only one link per (owner, normalized URL) carries url_hash; it is the one
+    reuse lookups find. An expired canonical link hands the hash over to the
+    new one. Returns (link, created).
+    """
+    from .models import Link
+
+    links = Link.objects.for_owner(owner)
+    digest = url_hash(fields['target_url'])
+    for _ in range(2):
+        canonical = links.filter(owner=owner, url_hash=digest).first()
+        if reuse and canonical is not None and not canonical.is_expired():
+            return canonical, False
+        if not fields.get('short_code'):
+            # Taken before the transaction: inside one the allocator cannot use
+            # this worker's reserved block and would reserve a number per link.
+            fields['short_code'] = allocator.allocate()[0]
+        try:
+            with transaction.atomic(using=links.db):
+                if reuse and canonical is not None:
+                    links.filter(pk=canonical.pk).update(url_hash=None)
+                    canonical = None
+                link = links.create(owner=owner, url_hash=None if canonical else digest, **fields)
+            return link, True
+        except IntegrityError:
+            # Another request claimed this URL between the lookup and the insert.
+            continue
+    return links.create(owner=owner, **fields), True
@@ -0,0 +1,125 @@
+import re
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .link_cache import LRUCache
+from .models import ClickEvent, RollupCursor
+from .sharding import shard_aliases
+
+
+BATCH_SIZE = 10_000
+POOL_CHUNK = 256
+
+BOT = re.compile(r'bot|crawl|spider|slurp|preview|monitor', re.I)
+BROWSERS = [
+    ('Edge', re.compile(r'Edg(e|A|iOS)?/')),
+    ('Opera', re.compile(r'OPR/|Opera')),
+    ('Samsung Internet', re.compile(r'SamsungBrowser/')),
+    ('Yandex', re.compile(r'YaBrowser/')),
+    ('Chrome', re.compile(r'Chrome/|CriOS/|Chromium/')),
+    ('Firefox', re.compile(r'Firefox/|FxiOS/')),
+    ('Safari', re.compile(r'Version/[\d.]+.*Safari/')),
+    ('Internet Explorer', re.compile(r'MSIE |Trident/')),
+    ('curl', re.compile(r'^curl/')),
+    ('Python', re.compile(r'python-requests|aiohttp|urllib', re.I)),
+]
+SYSTEMS = [
+    ('Windows', re.compile(r'Windows')),
+    ('Android', re.compile(r'Android')),
+    ('iOS', re.compile(r'iPhone|iPad|iPod')),
+    ('macOS', re.compile(r'Mac OS X|Macintosh')),
+    ('Chrome OS', re.compile(r'CrOS')),
+    ('Linux', re.compile(r'Linux|X11')),
+]
+TABLET = re.compile(r'iPad|Tablet|Kindle|Silk/')
+MOBILE = re.compile(r'Mobi|iPhone|iPod|Android')
+
+
+def parse_user_agent(user_agent):
+    """Return (browser, os, device) families for a raw User-Agent string."""
+    if not user_agent:
+        return '', '', ''
+    if BOT.search(user_agent):
+        return 'Bot', 'Other', 'bot'
+    browser = next((name for name, pattern in BROWSERS if pattern.search(user_agent)), 'Other')
+    system = next((name for name, pattern in SYSTEMS if pattern.search(user_agent)), 'Other')
+    if TABLET.search(user_agent) or (system == 'Android' and 'Mobile' not in user_agent):
+        device = 'tablet'
+    elif MOBILE.search(user_agent):
+        device = 'mobile'
+    elif system in ('Windows', 'macOS', 'Linux', 'Chrome OS'):
+        device = 'desktop'
+    else:
+        device = 'other'
+    return browser, system, device
+
+
+def parse_referrer(referrer):
+    if not referrer:
+        return ''
+    try:
+        host = urlsplit(referrer).hostname or ''
+    except ValueError:
+        return ''
+    return host[4:] if host.startswith('www.') else host
+
+
+# Raw strings repeat heavily, so parsed values are kept per worker and only
+# strings not seen recently are parsed (in the pool for large batches).
+user_agent_cache = LRUCache(maxsize=getattr(settings, 'CLICK_ENRICH_CACHE_SIZE', 200_000), ttl=float('inf'))
+referrer_cache = LRUCache(maxsize=getattr(settings, 'CLICK_ENRICH_CACHE_SIZE', 200_000), ttl=float('inf'))
+
+
+def resolve(values, cache, parser, pool=None):
+    resolved, missing = {}, []
+    for value in set(values):
+        cached = cache.get(value)
+        if cached is None:
+            missing.append(value)
+        else:
+            resolved[value] = cached
+    if pool is not None and len(missing) >= getattr(settings, 'CLICK_ENRICH_POOL_THRESHOLD', 2000):
+        parsed = pool.map(parser, missing, chunksize=POOL_CHUNK)
+    else:
+        parsed = map(parser, missing)
+    for value, result in zip(missing, parsed):
+        cache.set(value, result)
+        resolved[value] = result
+    return resolved
+
+
+def save_enriched(rows, using='default'):
+    # executemany keeps large backlogs cheap; bulk_update builds a CASE per column per row.
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = ', '.join(f'{quote(name)} = %s' for name in ('referrer_domain', 'browser', 'os', 'device', 'enriched'))
+    sql = f"UPDATE {quote(ClickEvent._meta.db_table)} SET {columns} WHERE {quote('id')} = %s"
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def enrich_clicks(batch_size=BATCH_SIZE, pool=None, using=None):
+    """Parse referrer and user agent for click events past the enrich cursor, per shard."""
+    if using is None:
+        return sum(enrich_clicks(batch_size, pool, alias) for alias in shard_aliases())
+    processed = 0
+    while True:
+        with transaction.atomic(using=using):
+            cursor, _ = RollupCursor.objects.using(using).select_for_update().get_or_create(name='enrich')
+            events = list(
+                ClickEvent.objects.using(using).filter(id__gt=cursor.last_event_id).order_by('id')
+                .values_list('id', 'referrer', 'user_agent')[:batch_size]
+            )
+            if not events:
+                return processed
+            agents = resolve([event[2] for event in events], user_agent_cache, parse_user_agent, pool)
+            referrers = resolve([event[1] for event in events], referrer_cache, parse_referrer)
+            save_enriched([
+                (referrers[referrer][:255], *agents[user_agent], True, event_id)
+                for event_id, referrer, user_agent in events
+            ], using)
+            cursor.last_event_id = events[-1][0]
+            cursor.save(update_fields=['last_event_id'])
+        processed += len(events)
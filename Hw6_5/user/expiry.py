@@ -0,0 +1,47 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Link
+from .sharding import shard_aliases
+
+
+BATCH_SIZE = 500
+ARCHIVE_FIELDS = ('id', 'owner_id', 'target_url', 'short_code', 'title', 'is_public', 'created_at', 'clicks', 'expires_at', 'max_clicks')
+
+
+def sweep_expired(batch_size=BATCH_SIZE, grace=timedelta(0), archive=None, pause=0.0, limit=None):
+    """Delete links whose expires_at passed, one short transaction per batch.
+
+    Batches are picked through the expires_at index, so each delete only
+    touches batch_size links (plus their click rows) and writers get the
+    table back between batches. Rows are written as JSON lines to
+    `archive` before they are deleted.
+    """
+    cutoff = timezone.now() - grace
+    deleted = 0
+    for alias in shard_aliases():
+        links = Link.objects.using(alias)
+        while limit is None or deleted < limit:
+            size = batch_size if limit is None else min(batch_size, limit - deleted)
+            with transaction.atomic(using=alias):
+                ids = list(
+                    links.filter(expires_at__lt=cutoff)
+                    .order_by('expires_at').values_list('id', flat=True)[:size]
+                )
+                if not ids:
+                    break
+                batch = links.filter(id__in=ids)
+                if archive is not None:
+                    for row in batch.values(*ARCHIVE_FIELDS):
+                        archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+                # Model delete() sends post_delete, which drops the cached redirect entries.
+                batch.delete()
+            deleted += len(ids)
+            if pause:
+                time.sleep(pause)
+    return deleted
@@ -0,0 +1,23 @@
+from common import exports as common
+from common.exports import rows
+
+from .models import Link
+from .sharding import storage_aliases
+
+
+def _links(user):
+    # Legacy links on default and the ones on the owner's shard alike.
+    for alias in storage_aliases():
+        yield from rows(Link.objects.using(alias).filter(owner_id=user.pk))
+
+
+def sections(user):
+    """(file name, rows) pairs that make up a user's export, each rows iterable lazy."""
+    return [
+        ('profile.jsonl', rows(type(user)._base_manager.filter(pk=user.pk))),
+        ('links.jsonl', _links(user)),
+    ]
+
+
+def build_export(export):
+    return common.build_export(export, sections)
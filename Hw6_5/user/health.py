@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+import aiohttp
+from asgiref.sync import sync_to_async
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Link
+from .sharding import shard_aliases
+
+
+CONCURRENCY = 200
+PER_HOST = 8
+TIMEOUT = 10
+BATCH_SIZE = 1000
+MAX_REDIRECTS = 10
+FINAL_URL_MAX_LENGTH = Link._meta.get_field('final_url').max_length
+USER_AGENT = 'Hw6_5-link-checker/1.0'
+
+logger = logging.getLogger(__name__)
+
+
+async def check_url(session, url):
+    """Return (is_alive, status, final_url); HEAD first, GET when the server refuses HEAD."""
+    try:
+        for method in ('HEAD', 'GET'):
+            async with session.request(method, url, allow_redirects=True, max_redirects=MAX_REDIRECTS) as response:
+                if method == 'HEAD' and response.status in (405, 501):
+                    continue
+                return response.status < 400, response.status, str(response.url)[:FINAL_URL_MAX_LENGTH]
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        pass
+    return False, None, ''
+
+
+async def check_urls(items, on_results, concurrency=CONCURRENCY, per_host=PER_HOST, timeout=TIMEOUT, batch_size=BATCH_SIZE):
+    """Check (id, url) pairs from an async iterable, passing result batches to on_results.
+
+    The connector caps open connections overall and per host, the queue
+    bounds how far the producer runs ahead, and results are handed over
+    batch_size at a time as (id, checked_at, is_alive, status, final_url).
+    """
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    results = []
+    lock = asyncio.Lock()
+
+    async def flush():
+        async with lock:
+            batch, results[:] = results[:], []
+        if batch:
+            await on_results(batch)
+
+    async def worker(session):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            link_id, url = item
+            try:
+                is_alive, status, final_url = await check_url(session, url)
+            except Exception:
+                # One URL the client chokes on must not end the whole run; it is recorded as dead.
+                logger.exception("Checking %s failed.", url)
+                is_alive, status, final_url = False, None, ''
+            results.append((link_id, timezone.now(), is_alive, status, final_url))
+            if len(results) >= batch_size:
+                await flush()
+
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=min(timeout, 5))
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=client_timeout, headers={'User-Agent': USER_AGENT},
+    ) as session:
+        workers = [asyncio.create_task(worker(session)) for _ in range(concurrency)]
+        async for item in items:
+            await queue.put(item)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    await flush()
+
+
+def due_links(stale_after, dead_recheck_after, using='default'):
+    now = timezone.now()
+    return Link.objects.using(using).filter(
+        Q(last_checked_at__isnull=True)
+        | Q(is_alive=True, last_checked_at__lt=now - stale_after)
+        | Q(is_alive=False, last_checked_at__lt=now - dead_recheck_after)
+    )
+
+
+def fetch_page(queryset, after_id, size):
+    rows = queryset.filter(id__gt=after_id).order_by('id').values_list('id', 'target_url')[:size]
+    # Ids are tagged with the shard so results can be written back to it.
+    return [((queryset.db, link_id), url) for link_id, url in rows]
+
+
+def save_results(batch):
+    # executemany keeps 1M-row runs cheap; bulk_update builds a CASE per column per row.
+    for using in {key[0] for key, *_ in batch}:
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        columns = ', '.join(f'{quote(name)} = %s' for name in ('last_checked_at', 'is_alive', 'last_status', 'final_url'))
+        sql = f"UPDATE {quote(Link._meta.db_table)} SET {columns} WHERE {quote('id')} = %s"
+        params = [
+            (connection.ops.adapt_datetimefield_value(checked_at), is_alive, status, final_url, link_id)
+            for (db, link_id), checked_at, is_alive, status, final_url in batch if db == using
+        ]
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+
+
+def run_checks(stale_after=timedelta(hours=24), dead_recheck_after=timedelta(days=7), limit=None,
+               concurrency=CONCURRENCY, per_host=PER_HOST, timeout=TIMEOUT, batch_size=BATCH_SIZE):
+    """Check every due link once; returns counts and throughput."""
+    stats = {'checked': 0, 'alive': 0, 'dead': 0}
+    fetch = sync_to_async(fetch_page, thread_sensitive=True)
+    save = sync_to_async(save_results, thread_sensitive=True)
+
+    async def items():
+        produced = 0
+        for alias in shard_aliases():
+            queryset = due_links(stale_after, dead_recheck_after, alias)
+            after_id = 0
+            while limit is None or produced < limit:
+                size = batch_size if limit is None else min(batch_size, limit - produced)
+                page = await fetch(queryset, after_id, size)
+                if not page:
+                    break
+                for item in page:
+                    yield item
+                produced += len(page)
+                after_id = page[-1][0][1]
+
+    async def on_results(batch):
+        await save(batch)
+        stats['checked'] += len(batch)
+        alive = sum(1 for row in batch if row[2])
+        stats['alive'] += alive
+        stats['dead'] += len(batch) - alive
+
+    started = time.perf_counter()
+    asyncio.run(check_urls(items(), on_results, concurrency, per_host, timeout, batch_size))
+    elapsed = time.perf_counter() - started
+    stats['seconds'] = round(elapsed, 2)
+    stats['per_second'] = round(stats['checked'] / max(elapsed, 1e-9), 1)
+    return stats
@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+
+from .bloom import code_filter
+
+
+# Bump when LinkEntry changes shape so entries pickled by older code are ignored.
+ENTRY_VERSION = 4
+# Cached in place of an entry for codes the database does not have.
+MISSING = 'missing'
+
+
+class LinkEntry(NamedTuple):
+    id: int
+    target_url: str
+    is_public: bool
+    expires_at: Optional[datetime]
+    max_clicks: Optional[int]
+    clicks: int
+    db: str = 'default'
+
+    def is_expired(self, now=None, pending=0):
+        if self.expires_at is not None and self.expires_at <= (now or timezone.now()):
+            return True
+        return self.max_clicks is not None and self.clicks + pending >= self.max_clicks
+
+
+ROW_FIELDS = LinkEntry._fields[:-1]
+
+
+class LRUCache:
+    """Small thread-safe LRU with a per-entry TTL, local to one worker process."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# The local TTL bounds how long another worker's save/delete can go unseen here.
+local_cache = LRUCache(
+    maxsize=getattr(settings, 'LINK_CACHE_SIZE', 100_000),
+    ttl=getattr(settings, 'LINK_CACHE_LOCAL_TTL', 5),
+)
+
+
+def cache_key(short_code):
+    return f'link:{short_code}'
+
+
+def load_entry(short_code):
+    from .models import Link
+
+    from .sharding import shard_aliases
+
+    # Codes do not say which shard holds them; the code filter keeps this
+    # walk to real links and rare false positives.
+    for alias in shard_aliases():
+        row = Link.objects.using(alias).filter(short_code=short_code).values_list(*ROW_FIELDS).first()
+        if row:
+            return LinkEntry(*row, alias)
+    return None
+
+
+def entry_timeout(entry):
+    # Never keep an entry in the shared cache past the link's own expiry.
+    timeout = getattr(settings, 'LINK_CACHE_TIMEOUT', 3600)
+    if entry.expires_at is not None:
+        timeout = max(1, min(timeout, int((entry.expires_at - timezone.now()).total_seconds()) + 1))
+    return timeout
+
+
+def cache_is_shared():
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def filter_enabled():
+    # A filter miss is only a definite 404 if publish() reached every worker,
+    # i.e. the cache is shared. With a per-process cache another worker's new
+    # link stays invisible here until the next refresh, so it is not consulted.
+    return cache_is_shared()
+
+
+def get_link(short_code):
+    """Resolve a short code: worker LRU, shared cache, code filter, then the database.
+
+    Misses are remembered as MISSING for LINK_NEGATIVE_CACHE_TTL seconds, and
+    with a shared cache, codes the filter has definitely never seen are
+    rejected without a query.
+    """
+    entry = local_cache.get(short_code)
+    if entry is not None:
+        return None if entry == MISSING else entry
+    key = cache_key(short_code)
+    entry = cache.get(key, version=ENTRY_VERSION)
+    if entry is None:
+        if filter_enabled() and not code_filter.might_contain(short_code):
+            return None
+        entry = load_entry(short_code)
+        if entry is None:
+            remember_missing(short_code)
+            return None
+        cache.set(key, entry, entry_timeout(entry), version=ENTRY_VERSION)
+    elif entry == MISSING:
+        local_cache.set(short_code, MISSING)
+        return None
+    local_cache.set(short_code, entry)
+    return entry
+
+
+def remember_missing(short_code):
+    local_cache.set(short_code, MISSING)
+    cache.set(cache_key(short_code), MISSING, getattr(settings, 'LINK_NEGATIVE_CACHE_TTL', 30), version=ENTRY_VERSION)
+
+
+def publish(links):
+    """Cache entries for new or changed links so other workers find them before their filter refreshes."""
+    by_timeout = defaultdict(dict)
+    for link in links:
+        entry = LinkEntry(*(getattr(link, field) for field in ROW_FIELDS), link._state.db or 'default')
+        code_filter.add(link.short_code)
+        local_cache.delete(link.short_code)
+        by_timeout[entry_timeout(entry)][cache_key(link.short_code)] = entry
+    for timeout, entries in by_timeout.items():
+        cache.set_many(entries, timeout, version=ENTRY_VERSION)
+
+
+def invalidate(short_code):
+    local_cache.delete(short_code)
+    cache.delete(cache_key(short_code), version=ENTRY_VERSION)
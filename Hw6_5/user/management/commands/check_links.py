@@ -0,0 +1,40 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from user.health import BATCH_SIZE, CONCURRENCY, PER_HOST, TIMEOUT, run_checks
+
+
+class Command(BaseCommand):
+    help = "Check link targets for reachability and record status and final redirect URL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-after', type=float, default=24, help="Recheck live links after this many hours.")
+        parser.add_argument('--dead-recheck-after', type=float, default=168, help="Recheck dead links after this many hours.")
+        parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+        parser.add_argument('--per-host', type=int, default=PER_HOST)
+        parser.add_argument('--timeout', type=float, default=TIMEOUT)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--limit', type=int)
+        parser.add_argument('--loop', action='store_true', help="Keep running, one pass every --interval seconds.")
+        parser.add_argument('--interval', type=int, default=3600)
+
+    def handle(self, *args, **options):
+        while True:
+            stats = run_checks(
+                stale_after=timedelta(hours=options['stale_after']),
+                dead_recheck_after=timedelta(hours=options['dead_recheck_after']),
+                limit=options['limit'],
+                concurrency=options['concurrency'],
+                per_host=options['per_host'],
+                timeout=options['timeout'],
+                batch_size=options['batch_size'],
+            )
+            self.stdout.write(
+                f"Checked {stats['checked']} links ({stats['alive']} alive, {stats['dead']} dead) "
+                f"in {stats['seconds']}s, {stats['per_second']}/s."
+            )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,43 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from user.analytics import compact_events, rollup_clicks
+from user.enrichment import BATCH_SIZE, enrich_clicks
+
+
+class Command(BaseCommand):
+    help = "Parse referrer and user agent of new click events, then refresh the analytics rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Parser processes for large backlogs; 1 parses inline.")
+        parser.add_argument('--no-rollup', action='store_true')
+        parser.add_argument('--no-compact', action='store_true')
+        parser.add_argument('--loop', action='store_true', help="Keep running, one pass every --interval seconds.")
+        parser.add_argument('--interval', type=int, default=15)
+
+    def handle(self, *args, **options):
+        pool = None
+        if options['workers'] > 1:
+            pool = ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup)
+        try:
+            while True:
+                started = time.perf_counter()
+                enriched = enrich_clicks(batch_size=options['batch_size'], pool=pool)
+                message = f"Enriched {enriched} click events"
+                if not options['no_rollup']:
+                    message += f", rolled up {rollup_clicks(batch_size=options['batch_size'])}"
+                    if not options['no_compact']:
+                        message += f", deleted {compact_events(batch_size=options['batch_size'])} old raw events"
+                self.stdout.write(f"{message} in {time.perf_counter() - started:.2f}s.")
+                if not options['loop']:
+                    return
+                time.sleep(options['interval'])
+        finally:
+            if pool is not None:
+                pool.shutdown()
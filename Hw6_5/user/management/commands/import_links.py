@@ -0,0 +1,57 @@
+import csv
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from user.bulk import BATCH_SIZE, FORMATS, import_links
+from user.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Bulk import links from a CSV (target_url,title,is_public,expires_at,max_clicks header) or JSON lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or - for stdin.")
+        parser.add_argument('--owner', required=True, help="Email of the user who will own the links.")
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--public', action='store_true', help="Make links public unless a row says otherwise.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--output', help="Write target_url,short_code pairs to this CSV file.")
+        parser.add_argument('--reuse', action='store_true', help="Reuse the owner's existing link for a URL instead of creating another.")
+
+    def handle(self, *args, **options):
+        try:
+            owner = CustomUser.objects.get(email=options['owner'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"User {options['owner']} does not exist.")
+        path = options['path']
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in FORMATS:
+            raise CommandError("Use --format csv or --format jsonl.")
+
+        source = sys.stdin if path == '-' else open(path, encoding='utf-8-sig', newline='')
+        output = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else None
+        writer = csv.writer(output) if output else None
+        if writer:
+            writer.writerow(['target_url', 'short_code'])
+        created = reused = failed = 0
+        try:
+            batches = import_links(owner, source, fmt, options['public'], options['batch_size'], options['reuse'])
+            for created_pairs, reused_pairs, errors in batches:
+                created += len(created_pairs)
+                reused += len(reused_pairs)
+                failed += len(errors)
+                if writer:
+                    writer.writerows(created_pairs)
+                    writer.writerows(reused_pairs)
+                for error in errors:
+                    self.stderr.write(f"row {error['index']}: {error['error']}")
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if output:
+                output.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created} links, reused {reused} existing links, skipped {failed} invalid rows."
+        ))
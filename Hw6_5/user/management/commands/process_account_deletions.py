@@ -0,0 +1,8 @@
+from common.management.base import ProcessAccountDeletionsCommand
+from user.deletion import process_deletion
+from user.models import AccountDeletion
+
+
+class Command(ProcessAccountDeletionsCommand):
+    queue = AccountDeletion
+    process = staticmethod(process_deletion)
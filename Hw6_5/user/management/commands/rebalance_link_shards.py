@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from user.models import Link, LinkShardAssignment
+from user.sharding import (
+    assignment_staleness, bump_assignment, hashed_shard, move_owner_links, shard_aliases, shard_for_owner,
+    sharding_enabled, storage_aliases,
+)
+
+
+class Command(BaseCommand):
+    help = "Move owners' links to their shard, optionally pinning one owner to a given shard first."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', type=int, help="Only this owner id.")
+        parser.add_argument('--to', help="Pin --owner to this shard alias (e.g. links_2).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument(
+            '--settle', type=float,
+            help="Seconds to wait before sweeping the old shards again for links other workers still "
+                 "routed there (default: how long a worker may keep a stale assignment).",
+        )
+
+    def handle(self, *args, **options):
+        if not sharding_enabled():
+            raise CommandError("Sharding is disabled; set LINK_SHARD_COUNT first.")
+        owner_id = options['owner']
+        moves = []
+        if options['to']:
+            if owner_id is None:
+                raise CommandError("--to needs --owner.")
+            if options['to'] not in shard_aliases():
+                raise CommandError(f"Unknown shard {options['to']}; use one of {', '.join(shard_aliases())}.")
+            if not options['dry_run']:
+                previous = shard_for_owner(owner_id)
+                if options['to'] == hashed_shard(owner_id):
+                    LinkShardAssignment.objects.filter(owner_id=owner_id).delete()
+                else:
+                    LinkShardAssignment.objects.update_or_create(owner_id=owner_id, defaults={'shard': options['to']})
+                bump_assignment(owner_id)
+                if previous != options['to']:
+                    # Swept again below even if the owner has no links there yet.
+                    moves.append((owner_id, previous, options['to']))
+
+        for alias in storage_aliases():
+            owners = Link.objects.using(alias).order_by().values_list('owner_id', flat=True).distinct()
+            if owner_id is not None:
+                owners = owners.filter(owner_id=owner_id)
+            for owner in owners:
+                target = options['to'] if options['to'] and owner == owner_id else shard_for_owner(owner)
+                if target != alias and (owner, alias, target) not in moves:
+                    moves.append((owner, alias, target))
+
+        total = 0
+        for owner, source, target in moves:
+            if options['dry_run']:
+                self.stdout.write(f"owner {owner}: {source} -> {target}")
+                continue
+            moved = move_owner_links(owner, source, target, batch_size=options['batch_size'])
+            total += moved
+            self.stdout.write(f"owner {owner}: moved {moved} links {source} -> {target}")
+
+        if moves and not options['dry_run']:
+            # Workers that still had the old assignment cached may have written to
+            # the source while it was being emptied; pick those links up as well.
+            settle = options['settle'] if options['settle'] is not None else assignment_staleness()
+            time.sleep(settle)
+            for owner, source, target in moves:
+                swept = move_owner_links(owner, source, target, batch_size=options['batch_size'])
+                total += swept
+                if swept:
+                    self.stdout.write(f"owner {owner}: swept {swept} links written to {source} during the move")
+        self.stdout.write(self.style.SUCCESS(f"{len(moves)} owner moves, {total} links moved."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from user.analytics import compact_events, enrich_backlog, rollup_clicks
+from user.enrichment import enrich_clicks
+
+
+class Command(BaseCommand):
+    help = "Enrich new click events, aggregate them into hourly/daily rollups and compact old raw rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--no-enrich', action='store_true',
+                            help="Leave enrichment to enrich_clicks; events it has not reached are not rolled up yet.")
+        parser.add_argument('--no-compact', action='store_true')
+        parser.add_argument('--retention-days', type=int)
+
+    def handle(self, *args, **options):
+        # Rollups only take enriched events, so enrich first unless enrich_clicks runs on its own.
+        if not options['no_enrich']:
+            enriched = enrich_clicks(batch_size=options['batch_size'])
+            self.stdout.write(f"Enriched {enriched} click events.")
+        processed = rollup_clicks(batch_size=options['batch_size'])
+        self.stdout.write(f"Rolled up {processed} click events.")
+        backlog = enrich_backlog()
+        if backlog:
+            self.stderr.write(self.style.WARNING(
+                f"{backlog} click events are not enriched yet and were not rolled up; run enrich_clicks."
+            ))
+        if not options['no_compact']:
+            deleted = compact_events(retention_days=options['retention_days'], batch_size=options['batch_size'])
+            self.stdout.write(f"Deleted {deleted} raw click events.")
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from user.expiry import BATCH_SIZE, sweep_expired
+
+
+class Command(BaseCommand):
+    help = "Delete expired links in small batches, optionally archiving them as JSON lines first."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--grace-hours', type=int, default=0, help="Keep links this long after they expire.")
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches.")
+        parser.add_argument('--limit', type=int, help="Stop after deleting this many links.")
+        parser.add_argument('--archive', help="Append deleted rows to this JSON lines file.")
+
+    def handle(self, *args, **options):
+        archive = open(options['archive'], 'a', encoding='utf-8') if options['archive'] else None
+        try:
+            deleted = sweep_expired(
+                batch_size=options['batch_size'],
+                grace=timedelta(hours=options['grace_hours']),
+                archive=archive,
+                pause=options['pause'],
+                limit=options['limit'],
+            )
+        finally:
+            if archive:
+                archive.close()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired links."))
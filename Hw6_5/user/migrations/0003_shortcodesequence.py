@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_link_delete_note'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShortCodeSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('next_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_shortcodesequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='link',
+            name='clicks',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
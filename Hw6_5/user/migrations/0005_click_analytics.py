@@ -0,0 +1,59 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0004_link_clicks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCursor',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ClickEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('referrer', models.CharField(blank=True, max_length=512)),
+                ('user_agent', models.CharField(blank=True, max_length=512)),
+                ('link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='click_events', to='user.link')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyClickRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('dimension', models.CharField(blank=True, choices=[('', 'Total'), ('referrer', 'Referrer'), ('agent', 'User agent')], max_length=10)),
+                ('value', models.CharField(blank=True, max_length=255)),
+                ('clicks', models.PositiveBigIntegerField(default=0)),
+                ('link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(class)ss', to='user.link')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('link', 'dimension', 'bucket', 'value'), name='unique_daily_click_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlyClickRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('dimension', models.CharField(blank=True, choices=[('', 'Total'), ('referrer', 'Referrer'), ('agent', 'User agent')], max_length=10)),
+                ('value', models.CharField(blank=True, max_length=255)),
+                ('clicks', models.PositiveBigIntegerField(default=0)),
+                ('link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(class)ss', to='user.link')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('link', 'dimension', 'bucket', 'value'), name='unique_hourly_click_rollup')],
+            },
+        ),
+    ]
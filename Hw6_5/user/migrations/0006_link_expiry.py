@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0005_click_analytics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='link',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='max_clicks',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:27
+
+from django.db import migrations, models
+
+from user.dedupe import url_hash
+
+
+def backfill_url_hash(apps, schema_editor):
+    # The oldest link per (owner, normalized URL) becomes the canonical one.
+    # Plain executemany: bulk_update's CASE expressions are far slower on large tables.
+    Link = apps.get_model('user', 'Link')
+    quote = schema_editor.quote_name
+    sql = f"UPDATE {quote(Link._meta.db_table)} SET {quote('url_hash')} = %s WHERE {quote('id')} = %s"
+    seen, batch = set(), []
+    rows = Link.objects.order_by('id').values_list('id', 'owner_id', 'target_url')
+    with schema_editor.connection.cursor() as cursor:
+        for link_id, owner_id, target_url in rows.iterator(chunk_size=2000):
+            key = (owner_id, url_hash(target_url))
+            if key in seen:
+                continue
+            seen.add(key)
+            batch.append((key[1], link_id))
+            if len(batch) >= 1000:
+                cursor.executemany(sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0006_link_expiry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='link',
+            name='url_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_url_hash, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='link',
+            constraint=models.UniqueConstraint(fields=('owner', 'url_hash'), name='unique_owner_url_hash'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0007_link_url_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='link',
+            name='final_url',
+            field=models.URLField(blank=True, max_length=2000),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='is_alive',
+            field=models.BooleanField(null=True),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='last_checked_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='last_status',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0008_link_health'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='link',
+            index=models.Index(fields=['owner', '-created_at'], name='link_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='link',
+            index=models.Index(fields=['is_public', '-created_at'], name='link_public_created_idx'),
+        ),
+    ]
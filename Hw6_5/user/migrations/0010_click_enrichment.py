@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0009_link_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clickevent',
+            name='browser',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='clickevent',
+            name='device',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='clickevent',
+            name='enriched',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='clickevent',
+            name='os',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='clickevent',
+            name='referrer_domain',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='dailyclickrollup',
+            name='dimension',
+            field=models.CharField(blank=True, choices=[('', 'Total'), ('referrer', 'Referrer'), ('browser', 'Browser'), ('os', 'Operating system'), ('device', 'Device'), ('agent', 'User agent (raw, before enrichment)')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='hourlyclickrollup',
+            name='dimension',
+            field=models.CharField(blank=True, choices=[('', 'Total'), ('referrer', 'Referrer'), ('browser', 'Browser'), ('os', 'Operating system'), ('device', 'Device'), ('agent', 'User agent (raw, before enrichment)')], max_length=10),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0010_click_enrichment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkShardAssignment',
+            fields=[
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='link_shard', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('shard', models.CharField(max_length=50)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='link',
+            name='owner',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='links', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0013_data_export'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='link',
+            name='owner',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='links', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='link',
+            index=models.Index(fields=['created_at'], name='link_created_idx'),
+        ),
+    ]
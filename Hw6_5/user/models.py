@@ -1,7 +1,9 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
 from django.utils import timezone
-import string, random
+from .shortcodes import allocator
+from .dedupe import url_hash
+from .sharding import link_ids, shard_for_owner, sharding_enabled
 
 
 class CustomUserManager(BaseUserManager):
@@ -47,19 +49,193 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         return self.email
 
 
+class ShortCodeSequence(models.Model):
+    name = models.CharField(max_length=50, primary_key=True)
+    next_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
+
+
+class LinkManager(models.Manager):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        missing = [obj for obj in objs if not obj.short_code]
+        for obj, code in zip(missing, allocator.allocate(len(missing))):
+            obj.short_code = code
+        if sharding_enabled():
+            without_id = [obj for obj in objs if obj.pk is None]
+            for obj, link_id in zip(without_id, link_ids.numbers(len(without_id))):
+                obj.pk = link_id
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def for_owner(self, owner):
+        # A manager (not a queryset) so bulk_create above still applies.
+        return self.db_manager(shard_for_owner(owner.pk if isinstance(owner, models.Model) else owner))
+
+
+class LinkShardAssignment(models.Model):
+    # Pins an owner's links to a shard instead of the hashed default.
+    owner = models.OneToOneField(CustomUser, primary_key=True, related_name='link_shard', on_delete=models.CASCADE)
+    shard = models.CharField(max_length=50)
+
+    def __str__(self):
+        return f"{self.owner_id} -> {self.shard}"
+
+
 class Link(models.Model):
-    owner = models.ForeignKey(CustomUser, related_name='links', on_delete=models.CASCADE)
+    # No database constraint: once sharding is turned on, links live in another
+    # database than users. Deleting a user still cascades through the ORM.
+    owner = models.ForeignKey(CustomUser, related_name='links', on_delete=models.CASCADE, db_constraint=False)
     target_url = models.URLField()
     short_code = models.CharField(max_length=8, unique=True, blank=True)
     title = models.CharField(max_length=100, blank=True)
     is_public = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    clicks = models.PositiveBigIntegerField(default=0)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    max_clicks = models.PositiveBigIntegerField(null=True, blank=True)
+    # sha256 of the normalized target_url, set only on the owner's canonical link for that URL.
+    url_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    last_checked_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    is_alive = models.BooleanField(null=True)
+    last_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    final_url = models.URLField(max_length=2000, blank=True)
+
+    objects = LinkManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'url_hash'], name='unique_owner_url_hash'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', '-created_at'], name='link_owner_created_idx'),
+            models.Index(fields=['is_public', '-created_at'], name='link_public_created_idx'),
+            # The code filter's refresh picks up new links by creation time.
+            models.Index(fields=['created_at'], name='link_created_idx'),
+        ]
 
     def save(self, *args, **kwargs):
+        if self.pk is None and sharding_enabled():
+            self.pk = link_ids.numbers()[0]
         if not self.short_code:
-            self.short_code = ''.join(random.choices(string.ascii_letters + string.digits, k=6))
+            self.short_code = allocator.allocate()[0]
+        if self.url_hash and self.url_hash != url_hash(self.target_url):
+            # Retargeted links stop being the canonical link for their old URL.
+            self.url_hash = None
         super().save(*args, **kwargs)
 
+    def is_expired(self, now=None):
+        if self.expires_at is not None and self.expires_at <= (now or timezone.now()):
+            return True
+        return self.max_clicks is not None and self.clicks >= self.max_clicks
+
     def __str__(self):
         return f"{self.short_code} -> {self.target_url}"
-# Create your models here.
+
+
+class ClickEvent(models.Model):
+    link = models.ForeignKey(Link, related_name='click_events', on_delete=models.CASCADE)
+    created_at = models.DateTimeField(db_index=True)
+    referrer = models.CharField(max_length=512, blank=True)
+    user_agent = models.CharField(max_length=512, blank=True)
+    # Filled in by enrich_clicks, off the redirect path.
+    referrer_domain = models.CharField(max_length=255, blank=True)
+    browser = models.CharField(max_length=50, blank=True)
+    os = models.CharField(max_length=50, blank=True)
+    device = models.CharField(max_length=20, blank=True)
+    enriched = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.link_id} @ {self.created_at}"
+
+
+class ClickRollup(models.Model):
+    DIMENSION_CHOICES = (
+        ('', 'Total'),
+        ('referrer', 'Referrer'),
+        ('browser', 'Browser'),
+        ('os', 'Operating system'),
+        ('device', 'Device'),
+        ('agent', 'User agent (raw, before enrichment)'),
+    )
+    link = models.ForeignKey(Link, related_name='%(class)ss', on_delete=models.CASCADE)
+    bucket = models.DateTimeField()
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES, blank=True)
+    value = models.CharField(max_length=255, blank=True)
+    clicks = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.link_id} {self.bucket} {self.dimension}={self.value}: {self.clicks}"
+
+
+class HourlyClickRollup(ClickRollup):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['link', 'dimension', 'bucket', 'value'], name='unique_hourly_click_rollup'),
+        ]
+
+
+class DailyClickRollup(ClickRollup):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['link', 'dimension', 'bucket', 'value'], name='unique_daily_click_rollup'),
+        ]
+
+
+class RollupCursor(models.Model):
+    name = models.CharField(max_length=50, primary_key=True)
+    last_event_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_event_id}"
+
+
+class AccountDeletion(models.Model):
+    # A plain id rather than a FK: the record has to outlive the user row it tracks.
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    user_id = models.BigIntegerField(unique=True)
+    email = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    step = models.PositiveIntegerField(default=0)
+    progress = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Bumped as the job makes progress; a running record that goes quiet is up for grabs.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.email} ({self.status})"
+
+
+class DataExport(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    user = models.ForeignKey(CustomUser, related_name='data_exports', on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    # Archive name inside DATA_EXPORT_DIR once the build is done.
+    file_name = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    rows = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    # Bumped as the build makes progress; a running export that goes quiet is up for grabs.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"export {self.pk} of {self.user_id} ({self.status})"
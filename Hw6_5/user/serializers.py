@@ -1,5 +1,8 @@
 from rest_framework import serializers
-from .models import CustomUser, Link
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from .models import CustomUser, DataExport, Link
+from .clicks import click_buffer
+from common.tokens import CachedRefreshToken
 from django.contrib.auth.password_validation import validate_password
 
 class UserSerializer(serializers.ModelSerializer):
@@ -21,9 +24,28 @@ class RegisterSerializer(serializers.ModelSerializer):
             last_name=validated_data.get('last_name','')
         )
 
+class DataExportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DataExport
+        fields = ('id', 'status', 'size', 'rows', 'error', 'requested_at', 'finished_at')
+        read_only_fields = fields
+
+class CachedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = CachedRefreshToken
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = CachedRefreshToken
+
 class LinkSerializer(serializers.ModelSerializer):
-    owner = UserSerializer(read_only=True)
+    # Owner id only: serialized from owner_id, so listing never loads users.
+    owner = serializers.PrimaryKeyRelatedField(read_only=True)
+    clicks = serializers.SerializerMethodField()
     class Meta:
         model = Link
-        fields = ('id','owner','target_url','short_code','title','is_public','created_at')
-        read_only_fields = ('short_code','owner')
\ No newline at end of file
+        fields = ('id','owner','target_url','short_code','title','is_public','created_at','clicks','expires_at','max_clicks',
+                  'is_alive','last_status','last_checked_at','final_url')
+        read_only_fields = ('short_code','owner','is_alive','last_status','last_checked_at','final_url')
+
+    def get_clicks(self, obj):
+        # Stored total plus this worker's clicks not flushed yet.
+        return obj.clicks + click_buffer.pending(obj.pk, obj._state.db or 'default')
\ No newline at end of file
@@ -0,0 +1,170 @@
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from .link_cache import LRUCache, cache_is_shared
+from .shortcodes import SequenceAllocator
+
+
+# Models stored on the owner's shard; everything else stays on default.
+SHARDED_MODELS = {'link', 'clickevent', 'hourlyclickrollup', 'dailyclickrollup', 'rollupcursor'}
+
+
+def sharding_enabled():
+    return getattr(settings, 'LINK_SHARD_COUNT', 0) > 0
+
+
+def shard_aliases():
+    count = getattr(settings, 'LINK_SHARD_COUNT', 0)
+    return [f'links_{index}' for index in range(count)] if count else ['default']
+
+
+def hashed_shard(owner_id):
+    aliases = shard_aliases()
+    return aliases[zlib.crc32(str(owner_id).encode()) % len(aliases)]
+
+
+ASSIGNMENT_TTL = 60
+# How long a request that routed just before a pin changed may still write.
+ASSIGNMENT_SETTLE = 5
+
+# Owners pinned by rebalance_link_shards, cached per worker with the version
+# of the owner's assignment in the shared cache, so routing costs no query.
+assignment_cache = LRUCache(maxsize=100_000, ttl=ASSIGNMENT_TTL)
+
+
+def assignment_version_key(owner_id):
+    return f'link-shard-version:{owner_id}'
+
+
+def bump_assignment(owner_id):
+    """Make every worker drop its cached shard for owner_id on its next lookup."""
+    cache.set(assignment_version_key(owner_id), time.time_ns(), None)
+    assignment_cache.delete(owner_id)
+
+
+def assignment_staleness():
+    """Seconds another worker may keep routing an owner to the shard it had before a pin.
+
+    With a shared cache a worker sees the bumped version on its next lookup;
+    otherwise only the local TTL ends its cached assignment.
+    """
+    return ASSIGNMENT_SETTLE if cache_is_shared() else ASSIGNMENT_TTL
+
+
+def shard_for_owner(owner_id):
+    if not sharding_enabled():
+        return 'default'
+    version = cache.get(assignment_version_key(owner_id))
+    cached = assignment_cache.get(owner_id)
+    if cached is not None and cached[1] == version:
+        return cached[0]
+    from .models import LinkShardAssignment
+
+    alias = (
+        LinkShardAssignment.objects.filter(owner_id=owner_id).values_list('shard', flat=True).first()
+        or hashed_shard(owner_id)
+    )
+    assignment_cache.set(owner_id, (alias, version))
+    return alias
+
+
+def fan_out(func, aliases=None):
+    """Run func(alias) on every shard in a thread pool and return the results in alias order."""
+    aliases = aliases or shard_aliases()
+    if len(aliases) == 1:
+        return [func(aliases[0])]
+
+    def run(alias):
+        try:
+            return func(alias)
+        finally:
+            # Connections are per thread; pool threads must not leak them.
+            connections[alias].close()
+
+    with ThreadPoolExecutor(max_workers=len(aliases)) as pool:
+        return list(pool.map(run, aliases))
+
+
+def max_link_id():
+    from .models import Link
+
+    return max((Link.objects.using(alias).order_by('-id').values_list('id', flat=True).first() or 0)
+               for alias in shard_aliases() + ['default'])
+
+
+# Link ids come from one sequence on default so they stay unique across shards.
+link_ids = SequenceAllocator('link-id', initial=lambda: max_link_id() + 1)
+
+
+class LinkShardRouter:
+    def _shard(self, model, instance):
+        if model._meta.app_label != 'user' or model._meta.model_name not in SHARDED_MODELS:
+            # Explicit, or Django would follow link.owner onto the link's shard.
+            return 'default'
+        if instance is not None:
+            if instance._state.db:
+                return instance._state.db
+            if getattr(instance, 'owner_id', None) is not None:
+                return shard_for_owner(instance.owner_id)
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._shard(model, hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self._shard(model, hints.get('instance'))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Link.owner points from a shard to a user on default (no FK constraint).
+        if {obj1._meta.model_name, obj2._meta.model_name} & SHARDED_MODELS:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == 'default':
+            return None
+        return app_label == 'user' and model_name in SHARDED_MODELS
+
+
+def storage_aliases():
+    # Links written before sharding was turned on still sit on default.
+    aliases = shard_aliases()
+    return aliases if aliases == ['default'] else ['default'] + aliases
+
+
+def move_owner_links(owner_id, source, target, batch_size=1000):
+    """Copy an owner's links, rollups and not yet rolled-up clicks to target, then delete them on source.
+
+    Each batch runs in a transaction on both databases; the target commits
+    first, so a failure can leave a batch on both shards but never on
+    neither. Raw clicks that were already rolled up stay behind and are
+    deleted with the source links; their counts live on in the rollups.
+    """
+    from .models import ClickEvent, DailyClickRollup, HourlyClickRollup, Link, RollupCursor
+
+    rolled_up = RollupCursor.objects.using(source).filter(name='clicks').values_list('last_event_id', flat=True).first() or 0
+    moved = 0
+    while True:
+        with transaction.atomic(using=source), transaction.atomic(using=target):
+            links = list(Link.objects.using(source).filter(owner_id=owner_id).order_by('id')[:batch_size])
+            if not links:
+                return moved
+            ids = [link.pk for link in links]
+            Link.objects.db_manager(target).bulk_create(links)
+            for model in (HourlyClickRollup, DailyClickRollup):
+                rollups = list(model.objects.using(source).filter(link_id__in=ids))
+                for rollup in rollups:
+                    rollup.pk = None
+                model.objects.using(target).bulk_create(rollups, batch_size=batch_size)
+            events = list(ClickEvent.objects.using(source).filter(link_id__in=ids, id__gt=rolled_up))
+            for event in events:
+                event.pk = None
+            ClickEvent.objects.using(target).bulk_create(events, batch_size=batch_size)
+            # post_delete drops the cached entries that still point at source.
+            Link.objects.using(source).filter(id__in=ids).delete()
+        moved += len(links)
@@ -0,0 +1,85 @@
+import string
+import threading
+
+from django.db import connection, transaction
+from django.db.models import F
+
+
+ALPHABET = string.digits + string.ascii_letters
+CODE_LENGTH = 7  # legacy random codes are 6 characters, so the two never collide
+CODE_SPACE = len(ALPHABET) ** CODE_LENGTH
+# Multiplier is coprime with 62**7, so n -> (n * MULTIPLIER + OFFSET) % CODE_SPACE
+# is a bijection: distinct sequence numbers always give distinct codes.
+MULTIPLIER = 1_580_030_173
+OFFSET = 912_674_306_551
+BLOCK_SIZE = 1000
+
+
+def encode(number):
+    chars = []
+    for _ in range(CODE_LENGTH):
+        number, rem = divmod(number, len(ALPHABET))
+        chars.append(ALPHABET[rem])
+    return ''.join(reversed(chars))
+
+
+def code_for(sequence_number):
+    return encode((sequence_number * MULTIPLIER + OFFSET) % CODE_SPACE)
+
+
+def reserve(count, name='link', initial=None):
+    """Advance the persistent counter by count and return the first reserved number.
+
+    `initial` is called to seed a counter the first time it is used.
+    """
+    from .models import ShortCodeSequence
+
+    with transaction.atomic():
+        if initial is not None and not ShortCodeSequence.objects.filter(name=name).exists():
+            ShortCodeSequence.objects.get_or_create(name=name, defaults={'next_value': initial()})
+        ShortCodeSequence.objects.get_or_create(name=name)
+        ShortCodeSequence.objects.filter(name=name).update(next_value=F('next_value') + count)
+        end = ShortCodeSequence.objects.values_list('next_value', flat=True).get(name=name)
+    if name == 'link' and end > CODE_SPACE:
+        raise RuntimeError("Short code space exhausted.")
+    return end - count
+
+
+class SequenceAllocator:
+    """Hands out numbers from sequence blocks reserved BLOCK_SIZE at a time per worker."""
+
+    def __init__(self, name, block_size=BLOCK_SIZE, initial=None):
+        self.name = name
+        self.block_size = block_size
+        self.initial = initial
+        self._next = self._end = 0
+        self._lock = threading.Lock()
+
+    def numbers(self, count=1):
+        with self._lock:
+            numbers = list(range(self._next, min(self._end, self._next + count)))
+            self._next += len(numbers)
+            missing = count - len(numbers)
+            if missing:
+                if connection.in_atomic_block:
+                    # A reservation made inside the caller's transaction rolls back
+                    # with it, so only take what this transaction uses.
+                    start = reserve(missing, self.name, self.initial)
+                    numbers.extend(range(start, start + missing))
+                else:
+                    size = max(missing, self.block_size)
+                    start = reserve(size, self.name, self.initial)
+                    numbers.extend(range(start, start + missing))
+                    self._next, self._end = start + missing, start + size
+        return numbers
+
+
+class CodeAllocator(SequenceAllocator):
+    def __init__(self, block_size=BLOCK_SIZE):
+        super().__init__('link', block_size)
+
+    def allocate(self, count=1):
+        return [code_for(number) for number in self.numbers(count)]
+
+
+allocator = CodeAllocator()
@@ -0,0 +1,27 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .link_cache import invalidate, publish
+from .models import CustomUser, Link
+from .sharding import sharding_enabled
+
+
+@receiver(post_save, sender=Link)
+def link_saved(sender, instance, created, using, **kwargs):
+    # Updates overwrite the shared entry rather than delete it: a worker that
+    # missed the entry would fall through to its code filter, which only
+    # learns of links on its next refresh.
+    transaction.on_commit(lambda: publish([instance]), using=using)
+
+
+@receiver(pre_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    # Links on a shard are out of reach of the cascade that runs on default.
+    if sharding_enabled():
+        Link.objects.for_owner(instance).filter(owner_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=Link)
+def link_deleted(sender, instance, **kwargs):
+    invalidate(instance.short_code)
@@ -1,3 +1,367 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from io import StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from tempfile import TemporaryDirectory
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .bloom import BloomFilter, CodeFilter, code_filter
+from .clicks import ClickBuffer
+from .dedupe import create_link
+from .health import run_checks
+from .link_cache import get_link, local_cache
+from .models import ClickEvent, CustomUser, HourlyClickRollup, Link
+from .sharding import assignment_cache, move_owner_links, shard_aliases, shard_for_owner, sharding_enabled
+from .shortcodes import allocator
+
+
+class ClickBufferTests(TestCase):
+    def setUp(self):
+        owner = CustomUser.objects.create_user(email='owner@example.com', password='pw')
+        self.link = Link.objects.create(owner=owner, target_url='https://example.com/')
+        # Tests flush by hand; keep the flusher thread out of the way.
+        patcher = mock.patch.object(ClickBuffer, '_start')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_flush_writes_counts_and_events(self):
+        buffer = ClickBuffer(interval=60, max_events=10)
+        for _ in range(3):
+            buffer.record(self.link.pk, referrer='https://ref.example/', user_agent='test')
+        self.assertEqual(buffer.pending(self.link.pk), 3)
+        self.assertEqual(buffer.flush(), 3)
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.clicks, 3)
+        self.assertEqual(ClickEvent.objects.filter(link=self.link).count(), 3)
+        self.assertEqual(buffer.pending(self.link.pk), 0)
+
+    def test_failed_flush_keeps_clicks_for_the_next_one(self):
+        buffer = ClickBuffer(interval=60, max_events=10)
+        buffer.record(self.link.pk)
+        with mock.patch.object(buffer, '_flush_shard', side_effect=OperationalError('locked')):
+            with self.assertRaises(OperationalError):
+                buffer.flush()
+        self.assertEqual(buffer.pending(self.link.pk), 1)
+        buffer.flush()
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.clicks, 1)
+
+    def test_flusher_thread_survives_unexpected_errors(self):
+        buffer = ClickBuffer(interval=0.01, max_events=10)
+        flushed = threading.Event()
+        errors = [RuntimeError('boom')]
+
+        def flush():
+            if errors:
+                raise errors.pop()
+            flushed.set()
+            return 0
+
+        with mock.patch.object(buffer, 'flush', side_effect=flush), self.assertLogs('user.clicks', 'ERROR'):
+            thread = threading.Thread(target=buffer._run, daemon=True)
+            thread.start()
+            self.assertTrue(flushed.wait(5))
+            buffer._stopped.set()
+            thread.join(5)
+
+
+class LinkAnalyticsTests(TestCase):
+    def setUp(self):
+        owner = CustomUser.objects.create_user(email='owner@example.com', password='pw')
+        self.link = Link.objects.create(owner=owner, target_url='https://example.com/')
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+        self.url = reverse('links-analytics', args=[self.link.pk])
+
+    def test_defaults_to_the_last_thirty_days(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_rejects_bad_datetimes(self):
+        for params in (
+            {'end': 'garbage'},
+            {'start': 'garbage'},
+            {'start': '2024-13-45T00:00:00'},
+            {'start': '2024-02-01T00:00:00', 'end': '2024-01-01T00:00:00'},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+class RollupClicksTests(TestCase):
+    def setUp(self):
+        owner = CustomUser.objects.create_user(email='owner@example.com', password='pw')
+        link = Link.objects.create(owner=owner, target_url='https://example.com/')
+        ClickEvent.objects.bulk_create([
+            ClickEvent(link=link, created_at=timezone.now(), referrer='https://news.example.org/a', user_agent='curl/8.0')
+            for _ in range(3)
+        ])
+
+    def run_command(self, **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('rollup_clicks', no_compact=True, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_enriches_before_rolling_up(self):
+        stdout, stderr = self.run_command()
+        self.assertIn('Rolled up 3 click events', stdout)
+        self.assertEqual(stderr, '')
+        self.assertEqual(HourlyClickRollup.objects.get(dimension='').clicks, 3)
+
+    def test_warns_when_enrichment_is_behind(self):
+        stdout, stderr = self.run_command(no_enrich=True)
+        self.assertIn('Rolled up 0 click events', stdout)
+        self.assertIn('3 click events are not enriched yet', stderr)
+
+
+class BulkLinkTests(TestCase):
+    def setUp(self):
+        self.owner = CustomUser.objects.create_user(email='owner@example.com', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = reverse('links-bulk')
+
+    def test_non_string_fields_are_row_errors(self):
+        response = self.client.post(
+            self.url, [{'target_url': 123}, {'target_url': 'https://example.com/', 'title': ['x']}], format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [0, 1])
+
+    def test_string_flags_are_parsed(self):
+        response = self.client.post(
+            self.url, {'links': ['https://example.com/a'], 'is_public': 'false'}, format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Link.objects.get(owner=self.owner).is_public)
+
+    def test_reuse_false_creates_a_new_link(self):
+        Link.objects.create(owner=self.owner, target_url='https://example.com/a')
+        response = self.client.post(self.url, {'links': ['https://example.com/a'], 'reuse': 'false'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['reused'], [])
+        self.assertEqual(Link.objects.filter(owner=self.owner).count(), 2)
+
+
+class ShortCodeBlockTests(TransactionTestCase):
+    def setUp(self):
+        self.owner = CustomUser.objects.create_user(email='owner@example.com', password='pw')
+        # Start without a reserved block, as a fresh worker does.
+        allocator._next = allocator._end = 0
+
+    def test_single_creates_share_one_reserved_block(self):
+        with CaptureQueriesContext(connection) as queries:
+            for n in range(5):
+                create_link(self.owner, target_url=f'https://example.com/{n}')
+        reservations = [query for query in queries if query['sql'].startswith('UPDATE "user_shortcodesequence"')]
+        self.assertEqual(len(reservations), 1)
+        codes = set(Link.objects.values_list('short_code', flat=True))
+        self.assertEqual(len(codes), 5)
+
+
+class LinkLookupTests(TestCase):
+    def setUp(self):
+        self.owner = CustomUser.objects.create_user(email='owner@example.com', password='pw')
+        local_cache.clear()
+        cache.clear()
+        # An empty, freshly built filter: it has not seen any link yet.
+        for name, value in (('_filter', BloomFilter(100)), ('_next_refresh', float('inf')), ('_next_rebuild', float('inf'))):
+            patcher = mock.patch.object(code_filter, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_filter_miss_falls_back_to_the_database_without_a_shared_cache(self):
+        # Created "on another worker": never published to this process.
+        link = Link.objects.create(owner=self.owner, target_url='https://example.com/', is_public=True)
+        entry = get_link(link.short_code)
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.id, link.pk)
+
+    def test_filter_miss_skips_the_database_with_a_shared_cache(self):
+        with TemporaryDirectory() as location, override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}):
+            with self.assertNumQueries(0):
+                self.assertIsNone(get_link('zzzzzzz'))
+
+    def test_update_overwrites_the_shared_entry(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            link = Link.objects.create(owner=self.owner, target_url='https://example.com/old', is_public=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            link.target_url = 'https://example.com/new'
+            link.save()
+        # Another worker: nothing local, and its filter has never seen the code.
+        local_cache.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_link(link.short_code).target_url, 'https://example.com/new')
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        if self.path == '/no-head':
+            self.send_response(405)
+        elif self.path == '/moved':
+            self.send_response(302)
+            self.send_header('Location', '/ok')
+        else:
+            self.send_response(200 if self.path == '/ok' else 404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        self.send_response(200 if self.path in ('/ok', '/no-head') else 404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LinkHealthTests(TransactionTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        owner = CustomUser.objects.create_user(email='owner@example.com', password='pw')
+        self.links = {
+            path: Link.objects.create(owner=owner, target_url=self.base + path)
+            for path in ('/ok', '/no-head', '/moved', '/missing')
+        }
+
+    def test_checks_links_against_a_local_server(self):
+        stats = run_checks(timeout=5, concurrency=4)
+        self.assertEqual((stats['checked'], stats['alive'], stats['dead']), (4, 3, 1))
+        results = {
+            path: Link.objects.values_list('is_alive', 'last_status', 'final_url').get(pk=link.pk)
+            for path, link in self.links.items()
+        }
+        self.assertEqual(results['/ok'], (True, 200, self.base + '/ok'))
+        self.assertEqual(results['/no-head'], (True, 200, self.base + '/no-head'))
+        self.assertEqual(results['/moved'], (True, 200, self.base + '/ok'))
+        self.assertEqual(results['/missing'], (False, 404, self.base + '/missing'))
+        # Fresh results are not due again.
+        self.assertEqual(run_checks(stale_after=timedelta(hours=1))['checked'], 0)
+
+    def test_one_failing_url_does_not_stop_the_run(self):
+        from . import health
+
+        check_url = health.check_url
+
+        async def flaky(session, url):
+            if url.endswith('/moved'):
+                raise RuntimeError('boom')
+            return await check_url(session, url)
+
+        with mock.patch.object(health, 'check_url', flaky), self.assertLogs('user.health', 'ERROR'):
+            stats = run_checks(timeout=5, concurrency=4)
+        self.assertEqual((stats['checked'], stats['alive'], stats['dead']), (4, 2, 2))
+        self.assertEqual(
+            Link.objects.values_list('is_alive', 'last_status').get(pk=self.links['/moved'].pk), (False, None),
+        )
+
+
+class CodeFilterTests(TestCase):
+    def test_refresh_picks_up_links_with_out_of_order_ids(self):
+        owner = CustomUser.objects.create_user(email='owner@example.com', password='pw')
+        Link.objects.create(pk=1000, owner=owner, target_url='https://example.com/a')
+        codes = CodeFilter(capacity=100, error_rate=0.01, refresh=0, rebuild=3600)
+        codes._filter, codes._since = BloomFilter(100), timezone.now()
+        # Another worker's id block can sit below ids already seen.
+        link = Link.objects.create(pk=5, owner=owner, target_url='https://example.com/b')
+        codes._refresh(force=True)
+        self.assertIn(link.short_code, codes._filter)
+
+    def test_due_refresh_runs_off_the_request_path(self):
+        codes = CodeFilter(capacity=100, error_rate=0.01, refresh=0, rebuild=3600)
+        codes._filter, codes._since, codes._next_rebuild = BloomFilter(100), timezone.now(), float('inf')
+        with mock.patch('user.bloom.threading.Thread') as thread, self.assertNumQueries(0):
+            self.assertFalse(codes.might_contain('zzzzzzz'))
+        self.assertEqual(thread.call_args.kwargs['target'], codes._background_refresh)
+        # One background pass at a time.
+        with mock.patch('user.bloom.threading.Thread') as thread:
+            codes.might_contain('zzzzzzz')
+        thread.assert_not_called()
+
+
+class FanOutPageTests(TestCase):
+    def setUp(self):
+        owner = CustomUser.objects.create_user(email='owner@example.com', password='pw')
+        Link.objects.bulk_create(
+            Link(owner=owner, target_url=f'https://example.com/{index}', is_public=True) for index in range(5)
+        )
+        # Several links created in the same instant straddle a page boundary.
+        Link.objects.update(created_at=timezone.now())
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+        patcher = mock.patch('user.views.sharding_enabled', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pages_do_not_skip_links_created_in_the_same_instant(self):
+        seen = []
+        url = reverse('links-list') + '?scope=public&page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [link['id'] for link in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(sorted(seen), sorted(Link.objects.values_list('id', flat=True)))
+
+    def test_bad_cursor_is_a_400(self):
+        for params in ({'before': 'garbage'}, {'before': '2024-13-45T00:00:00'}, {'before': '2024-01-01T00:00:00', 'before_id': 'x'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('links-list'), {'scope': 'public', **params})
+                self.assertEqual(response.status_code, 400)
+
+
+@skipUnless(sharding_enabled(), "Links are not sharded; set LINK_SHARD_COUNT.")
+class RebalanceTests(TransactionTestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        assignment_cache.clear()
+        self.addCleanup(assignment_cache.clear)
+        self.owner = CustomUser.objects.create_user(email='owner@example.com')
+        self.source = shard_for_owner(self.owner.pk)
+        self.target = next(alias for alias in shard_aliases() if alias != self.source)
+        Link.objects.create(owner=self.owner, target_url='https://example.com/a')
+
+    def rebalance(self):
+        call_command('rebalance_link_shards', owner=self.owner.pk, to=self.target, settle=0, stdout=StringIO())
+
+    def test_pin_reaches_workers_that_cached_the_old_shard(self):
+        stale = assignment_cache.get(self.owner.pk)
+        self.rebalance()
+        # Another worker still holding the entry it cached before the pin.
+        assignment_cache.set(self.owner.pk, stale)
+        self.assertEqual(shard_for_owner(self.owner.pk), self.target)
+
+    def test_link_written_during_the_move_is_swept(self):
+        late = []
+
+        def move_then_write(owner, source, target, **kwargs):
+            moved = move_owner_links(owner, source, target, **kwargs)
+            if not late:
+                # A request that routed before the pin finishes once the source is empty.
+                late.append(Link.objects.using(source).create(owner=self.owner, target_url='https://example.com/late'))
+            return moved
+
+        with mock.patch('user.management.commands.rebalance_link_shards.move_owner_links', side_effect=move_then_write):
+            self.rebalance()
+        self.assertFalse(Link.objects.using(self.source).filter(owner=self.owner).exists())
+        self.assertEqual(
+            sorted(Link.objects.using(self.target).filter(owner=self.owner).values_list('target_url', flat=True)),
+            ['https://example.com/a', 'https://example.com/late'],
+        )
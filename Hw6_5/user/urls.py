@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import RegisterView, ProfileView, LinkViewSet, redirect_short_link
+from .views import RegisterView, ProfileView, DataExportView, DataExportDownloadView, LinkViewSet, redirect_short_link
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 router = DefaultRouter()
@@ -11,6 +11,8 @@ urlpatterns = [
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('profile/', ProfileView.as_view(), name='profile'),
+    path('exports/', DataExportView.as_view(), name='data_exports'),
+    path('exports/<int:pk>/download/', DataExportDownloadView.as_view(), name='data_export_download'),
     path('auth/', include('social_django.urls', namespace='social')),  
     path('r/<str:short_code>/', redirect_short_link, name='redirect_link'),
     path('', include(router.urls)),
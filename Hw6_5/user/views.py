@@ -1,37 +1,230 @@
-from rest_framework import generics, viewsets, permissions
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from rest_framework import generics, viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework_simplejwt.views import TokenObtainPairView
-from .models import CustomUser, Link
-from .serializers import RegisterSerializer, UserSerializer, LinkSerializer
+from .models import CustomUser, DataExport, Link
+from .serializers import RegisterSerializer, UserSerializer, LinkSerializer, DataExportSerializer
 from .permissions import IsOwnerOrAdmin
-from rest_framework.response import Response
-from rest_framework.decorators import api_view
-from django.shortcuts import get_object_or_404, redirect
+from django.http import Http404, HttpResponseGone, HttpResponseNotFound, HttpResponseRedirect
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_safe
+from .link_cache import get_link
+from .clicks import click_buffer
+from .analytics import ROLLUPS, link_analytics
+from .bulk import parse_flag, validate_rows, create_links
+from .dedupe import create_link
+from common import views as common
+from common.views import DeferredDeletionMixin
+from .deletion import request_deletion
+from .sharding import fan_out, shard_aliases, shard_for_owner, sharding_enabled
+from django.conf import settings
+from django.db.models import Q
 
 class RegisterView(generics.CreateAPIView):
     queryset = CustomUser.objects.all()
     serializer_class = RegisterSerializer
 
-class ProfileView(generics.RetrieveUpdateAPIView):
+class ProfileView(DeferredDeletionMixin, generics.RetrieveUpdateDestroyAPIView):
+    request_deletion = staticmethod(request_deletion)
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
     def get_object(self):
         return self.request.user
 
+
+class DataExportView(common.DataExportView):
+    queue = DataExport
+    serializer_class = DataExportSerializer
+
+
+class DataExportDownloadView(common.DataExportDownloadView):
+    queue = DataExport
+
+class LinkCursorPagination(CursorPagination):
+    # Keyset pages over the (owner, created_at) / (is_public, created_at) indexes.
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = '-created_at'
+
+
 class LinkViewSet(viewsets.ModelViewSet):
     queryset = Link.objects.all()
     serializer_class = LinkSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
+    pagination_class = LinkCursorPagination
+    scopes = ('mine', 'public', 'all')
 
-    def get_queryset(self):
+    def get_scope(self):
         user = self.request.user
-        if user.role == 'admin':
-            return Link.objects.all()
-        return Link.objects.filter(is_public=True) | Link.objects.filter(owner=user)
+        scope = self.request.query_params.get('scope') or ('all' if user.role == 'admin' else 'mine')
+        if scope not in self.scopes or (scope == 'all' and user.role != 'admin'):
+            raise ValidationError({'scope': 'Use mine or public' + (' or all.' if user.role == 'admin' else '.')})
+        return scope
+
+    def scoped_queryset(self, manager):
+        user = self.request.user
+        if self.action == 'list':
+            # Each scope is a single indexed range instead of an OR over the whole table.
+            scope = self.get_scope()
+            if scope == 'mine':
+                queryset = manager.filter(owner=user)
+            elif scope == 'public':
+                queryset = manager.filter(is_public=True)
+            else:
+                queryset = manager.all()
+        elif user.role == 'admin':
+            queryset = manager.all()
+        else:
+            queryset = manager.filter(Q(is_public=True) | Q(owner=user))
+        alive = self.request.query_params.get('alive')
+        if alive is not None:
+            # alive=false lists links the health checker flagged as dead.
+            queryset = queryset.filter(is_alive=alive.lower() in ('1', 'true', 'yes'))
+        return queryset
+
+    def get_queryset(self):
+        if self.action == 'list' and self.get_scope() == 'mine':
+            return self.scoped_queryset(Link.objects.for_owner(self.request.user))
+        return self.scoped_queryset(Link.objects.db_manager(getattr(self, 'shard', None)))
+
+    def get_object(self):
+        if not sharding_enabled():
+            return super().get_object()
+        # Link ids are unique across shards; try the user's own shard first.
+        own = shard_for_owner(self.request.user.pk)
+        for alias in [own] + [alias for alias in shard_aliases() if alias != own]:
+            self.shard = alias
+            try:
+                return super().get_object()
+            except Http404:
+                continue
+        raise Http404
+
+    def list(self, request, *args, **kwargs):
+        if not sharding_enabled() or self.get_scope() == 'mine':
+            return super().list(request, *args, **kwargs)
+        return Response(self.fan_out_page(request))
+
+    def fan_out_page(self, request):
+        # public/all span every shard: take one page from each in parallel and
+        # merge by (created_at, id); ?before=<created_at>&before_id=<id> fetches
+        # the next page, the id keeping links created in the same instant apart.
+        size = self.paginator.get_page_size(request)
+        before = self.fan_out_cursor(request)
+
+        def page(alias):
+            queryset = self.scoped_queryset(Link.objects.db_manager(alias)).order_by('-created_at', '-id')
+            if before is not None:
+                created_at, link_id = before
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=link_id))
+            return list(queryset[:size + 1])
+
+        rows = list(islice(heapq.merge(*fan_out(page), key=lambda link: (link.created_at, link.id), reverse=True), size + 1))
+        next_url = None
+        if len(rows) > size:
+            rows = rows[:size]
+            next_url = replace_query_param(request.build_absolute_uri(), 'before', rows[-1].created_at.isoformat())
+            next_url = replace_query_param(next_url, 'before_id', rows[-1].id)
+        return {'next': next_url, 'previous': None, 'results': self.get_serializer(rows, many=True).data}
+
+    def fan_out_cursor(self, request):
+        before = request.query_params.get('before')
+        if not before:
+            return None
+        try:
+            created_at = parse_datetime(before)
+            link_id = int(request.query_params.get('before_id', 0))
+        except ValueError:
+            created_at = None
+        if created_at is None:
+            raise ValidationError({'before': 'Use the next link of the previous page.'})
+        if timezone.is_naive(created_at):
+            created_at = timezone.make_aware(created_at)
+        # A next link made before before_id existed: every link of that instant counts as seen.
+        return created_at, link_id
+
+    def reuse_requested(self):
+        return parse_flag(self.request.query_params.get('reuse'))
+
+    def create(self, request, *args, **kwargs):
+        # ?reuse=1 returns the owner's existing live link for the same URL with 200.
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        link, created = create_link(request.user, reuse=self.reuse_requested(), **serializer.validated_data)
+        return Response(
+            self.get_serializer(link).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        # Accepts a list of URLs/objects, or {"links": [...], "is_public": bool, "reuse": bool}.
+        data = request.data
+        default_public = False
+        reuse = self.reuse_requested()
+        if isinstance(data, dict):
+            default_public = parse_flag(data.get('is_public'))
+            reuse = reuse or parse_flag(data.get('reuse'))
+            data = data.get('links')
+        if not isinstance(data, list) or not data:
+            return Response({'detail': 'Expected a non-empty list of links.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(data) > settings.BULK_LINK_MAX_ITEMS:
+            return Response({'detail': f'At most {settings.BULK_LINK_MAX_ITEMS} links per request.'}, status=status.HTTP_400_BAD_REQUEST)
+        cleaned, errors = validate_rows(data, default_public)
+        created, reused = create_links(request.user, cleaned, reuse=reuse)
+        if created:
+            response_status = status.HTTP_201_CREATED
+        elif reused:
+            response_status = status.HTTP_200_OK
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({'created': created, 'reused': reused, 'errors': errors}, status=response_status)
+
+    @action(detail=True, methods=['get'])
+    def analytics(self, request, pk=None):
+        link = self.get_object()
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in ROLLUPS:
+            return Response({'detail': 'granularity must be hour or day.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            end = _query_datetime(request, 'end') or timezone.now()
+            start = _query_datetime(request, 'start') or end - (
+                timedelta(days=30) if granularity == 'day' else timedelta(hours=48)
+            )
+        except ValueError:
+            return Response({'detail': 'start and end must be ISO 8601 datetimes.'}, status=status.HTTP_400_BAD_REQUEST)
+        if start > end:
+            return Response({'detail': 'start must not be after end.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(link_analytics(link, granularity, start, end))
+
+
+def _query_datetime(request, name):
+    # parse_datetime returns None for garbage and raises for out-of-range fields; both are a ValueError here.
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(name)
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
 
-    def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
 
-@api_view(['GET'])
+@require_safe
 def redirect_short_link(request, short_code):
-    link = get_object_or_404(Link, short_code=short_code, is_public=True)
-    return redirect(link.target_url)
\ No newline at end of file
+    # Plain Django view: no DRF negotiation/auth, and cached lookups skip the database.
+    entry = get_link(short_code)
+    if entry is None or not entry.is_public:
+        return HttpResponseNotFound()
+    if entry.is_expired(pending=click_buffer.pending(entry.id, entry.db)):
+        return HttpResponseGone()
+    click_buffer.record(entry.id, request.headers.get('Referer', ''), request.headers.get('User-Agent', ''), entry.db)
+    return HttpResponseRedirect(entry.target_url)
\ No newline at end of file
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 import os
 from pathlib import Path
 from decouple import config, Csv
@@ -17,6 +18,8 @@ from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Apps shared by every project in this repository (the common app) live at its root.
+sys.path.append(str(BASE_DIR.parent))
 
 
 # Quick-start development settings - unsuitable for production
@@ -46,6 +49,7 @@ INSTALLED_APPS = [
     'django_filters',
     'drf_yasg',
     'league',
+    'common',
 ]
 
 MIDDLEWARE = [
@@ -61,9 +65,14 @@ MIDDLEWARE = [
 ROOT_URLCONF = 'football.urls'
 AUTH_USER_MODEL = 'league.CustomUser'
 
+# Opt-in: authenticate API requests from token claims without loading the user row.
+JWT_CLAIMS_AUTH = config('JWT_CLAIMS_AUTH', default=False, cast=bool)
+JWT_CLAIMS_CACHE_TTL = config('JWT_CLAIMS_CACHE_TTL', default=60, cast=int)
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'league.authentication.ClaimsJWTAuthentication' if JWT_CLAIMS_AUTH
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -75,7 +84,18 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE':10,
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': config('THROTTLE_AUTH_IP', default='30/min'),
+        'auth_email': config('THROTTLE_AUTH_EMAIL', default='10/min'),
+    },
+    # Reverse proxies in front of the app: the throttles key on the client IP
+    # they append to X-Forwarded-For. 0 keys on REMOTE_ADDR, so a forged
+    # header cannot mint new IPs.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
+# Sliding-window login throttles: keys kept per worker, and an optional cache alias shared by all workers.
+THROTTLE_MAX_KEYS = config('THROTTLE_MAX_KEYS', default=100000, cast=int)
+THROTTLE_SHARED_CACHE = config('THROTTLE_SHARED_CACHE', default='')
 
 TEMPLATES = [
     {
@@ -145,8 +165,18 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'ALGORITHM': 'HS256',
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': 'league.serializers.CustomTokenObtainPairSerializer',
     }
 
+SWAGGER_SETTINGS = {
+    'SECURITY_DEFINITIONS': {
+        'Bearer': {'type': 'apiKey', 'name': 'Authorization', 'in': 'header'},
+    },
+}
+SCHEMA_CACHE_SECONDS = config('SCHEMA_CACHE_SECONDS', default=3600, cast=int)
+# Processes one simulate request may use; 1 runs it inside the web worker.
+SIMULATION_MAX_WORKERS = config('SIMULATION_MAX_WORKERS', default=1, cast=int)
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
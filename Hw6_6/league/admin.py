@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from .models import (
     CustomUser, PlayerProfile, League, Team,
-    Player, Match
+    Player, Match, ArchivedMatch
 )
 
 
@@ -34,7 +34,7 @@ class PlayerProfileAdmin(admin.ModelAdmin):
 
 @admin.register(League)
 class LeagueAdmin(admin.ModelAdmin):
-    list_display = ('name', 'season', 'country')
+    list_display = ('name', 'season', 'archived_at')
     search_fields = ('name',)
 
 @admin.register(Team)
@@ -45,7 +45,7 @@ class TeamAdmin(admin.ModelAdmin):
 
 @admin.register(Player)
 class PlayerAdmin(admin.ModelAdmin):
-    list_display = ('name', 'team', 'goals', 'assists', 'yellow_cards', 'red_cards')
+    list_display = ('profile', 'team', 'goals', 'assists', 'yellow_cards', 'red_cards')
     list_filter = ('team',)
     search_fields = ('name',)
 
@@ -53,4 +53,10 @@ class PlayerAdmin(admin.ModelAdmin):
 class MatchAdmin(admin.ModelAdmin):
     list_display = ('home_team', 'away_team', 'home_score', 'away_score', 'date')
     list_filter = ('date', 'home_team', 'away_team')
+    search_fields = ('home_team__name', 'away_team__name')
+
+@admin.register(ArchivedMatch)
+class ArchivedMatchAdmin(admin.ModelAdmin):
+    list_display = ('home_team', 'away_team', 'home_score', 'away_score', 'date', 'league')
+    list_filter = ('league',)
     search_fields = ('home_team__name', 'away_team__name')
\ No newline at end of file
@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import League, Match, ArchivedMatch
+
+
+BATCH_SIZE = 1000
+MATCH_FIELDS = ('id', 'home_team_id', 'away_team_id', 'home_score', 'away_score', 'date', 'created_at', 'updated_at')
+
+
+def has_remaining_fixtures(league):
+    return Match.objects.filter(home_team__league=league, date__gt=timezone.localdate()).exists()
+
+
+def _move(source, target, rows, extra=None):
+    objs = [target(**row, **(extra or {})) for row in rows]
+    target.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+    source.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+    return len(objs)
+
+
+@transaction.atomic
+def archive_league(league, batch_size=BATCH_SIZE):
+    """Move a finished season's matches from the hot Match table to ArchivedMatch."""
+    league = League.objects.select_for_update().get(pk=league.pk)
+    moved = 0
+    queryset = Match.objects.filter(home_team__league=league).order_by('pk').values(*MATCH_FIELDS)
+    while True:
+        rows = list(queryset[:batch_size])
+        if not rows:
+            break
+        moved += _move(Match, ArchivedMatch, rows, extra={'league_id': league.pk})
+    league.archived_at = timezone.now()
+    league.save(update_fields=['archived_at', 'updated_at'])
+    return moved
+
+
+@transaction.atomic
+def restore_league(league, batch_size=BATCH_SIZE):
+    league = League.objects.select_for_update().get(pk=league.pk)
+    restored = 0
+    queryset = ArchivedMatch.objects.filter(league=league).order_by('pk').values(*MATCH_FIELDS)
+    while True:
+        rows = list(queryset[:batch_size])
+        if not rows:
+            break
+        restored += _move(ArchivedMatch, Match, rows)
+    league.archived_at = None
+    league.save(update_fields=['archived_at', 'updated_at'])
+    return restored
@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import CustomUser
+
+
+STATE_KEY = 'league:auth:user:{}'
+DELETED = ()
+
+
+def state_ttl():
+    return getattr(settings, 'JWT_CLAIMS_CACHE_TTL', 60)
+
+
+def user_state(user_id):
+    """(is_active, role) for a user id, or DELETED; cached for JWT_CLAIMS_CACHE_TTL."""
+    key = STATE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        row = CustomUser.objects.filter(pk=user_id).values_list('is_active', 'role').first()
+        state = tuple(row) if row else DELETED
+        cache.set(key, state, state_ttl())
+    return state
+
+
+def forget_user(user_id):
+    cache.delete(STATE_KEY.format(user_id))
+
+
+class ClaimsUser(TokenUser):
+    """Request user built from the id/email/role claims of an access token.
+
+    Role checks and id comparisons never touch the database; anything the
+    claims don't carry is read from the real CustomUser, which is loaded
+    on first use. Code that needs a model instance (e.g. to assign a
+    foreign key) should use ``request.user.user``.
+    """
+
+    def __init__(self, token, role=None):
+        super().__init__(token)
+        if role is not None:
+            self.role = role
+
+    def __str__(self):
+        return f"{self.email} ({self.role})"
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def email(self):
+        return self.token.get('email', '')
+
+    @cached_property
+    def role(self):
+        return self.token.get('role', 'player')
+
+    @cached_property
+    def user(self):
+        return CustomUser.objects.get(pk=self.id)
+
+    @cached_property
+    def is_staff(self):
+        return self.user.is_staff
+
+    @cached_property
+    def is_superuser(self):
+        return self.user.is_superuser
+
+    @property
+    def groups(self):
+        return self.user.groups
+
+    @property
+    def user_permissions(self):
+        return self.user.user_permissions
+
+    def get_group_permissions(self, obj=None):
+        return self.user.get_group_permissions(obj)
+
+    def get_all_permissions(self, obj=None):
+        return self.user.get_all_permissions(obj)
+
+    def has_perm(self, perm, obj=None):
+        return self.user.has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return self.user.has_perms(perm_list, obj)
+
+    def has_module_perms(self, module):
+        return self.user.has_module_perms(module)
+
+    def get_username(self):
+        return self.email
+
+    def __eq__(self, other):
+        # CustomUser.__eq__ returns NotImplemented for us, so both
+        # `obj.manager == request.user` and the reverse end up here.
+        if isinstance(other, (TokenUser, CustomUser)):
+            return self.id == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self.user, attr)
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """JWT authentication that trusts the token's claims instead of loading the user.
+
+    Deactivated, deleted or re-roled users are caught by a short-lived
+    per-user (is_active, role) cache. Saves, deletes and queryset updates
+    through the ORM clear it at once; with a per-process cache (the LocMem
+    default) only in the process that made the change, so other workers,
+    like changes made outside the ORM, see it within JWT_CLAIMS_CACHE_TTL.
+    Everything else the token carries (email, id) stays as issued until
+    the access token expires (SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        state = user_state(user_id)
+        if state == DELETED:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        is_active, role = state
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if validated_token.get('role', role) != role:
+            raise AuthenticationFailed(_("Token role is out of date, log in again."), code="token_stale")
+        return ClaimsUser(validated_token, role=role)
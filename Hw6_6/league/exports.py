@@ -0,0 +1,114 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from .models import Team, Player, PlayerProfile, Match, ArchivedMatch
+
+
+CHUNK_SIZE = 2000
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+# resource -> (model, league lookup, exported columns); columns map the
+# output name to a field path so related names come out flattened.
+EXPORTS = {
+    'teams': (Team, 'league', {
+        'id': 'id',
+        'name': 'name',
+        'league': 'league_id',
+        'league_name': 'league__name',
+        'season': 'league__season',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }),
+    'players': (Player, 'team__league', {
+        'id': 'id',
+        'profile': 'profile_id',
+        'email': 'profile__user__email',
+        'position': 'profile__position',
+        'number': 'profile__number',
+        'team': 'team_id',
+        'team_name': 'team__name',
+        'league': 'team__league_id',
+        'goals': 'goals',
+        'assists': 'assists',
+        'yellow_cards': 'yellow_cards',
+        'red_cards': 'red_cards',
+    }),
+    'profiles': (PlayerProfile, 'league', {
+        'id': 'id',
+        'user': 'user_id',
+        'email': 'user__email',
+        'manager': 'manager_id',
+        'manager_email': 'manager__email',
+        'league': 'league_id',
+        'league_name': 'league__name',
+        'position': 'position',
+        'number': 'number',
+    }),
+    'matches': (Match, 'home_team__league', {
+        'id': 'id',
+        'date': 'date',
+        'home_team': 'home_team_id',
+        'home_team_name': 'home_team__name',
+        'away_team': 'away_team_id',
+        'away_team_name': 'away_team__name',
+        'home_score': 'home_score',
+        'away_score': 'away_score',
+        'league': 'home_team__league_id',
+    }),
+    'archived_matches': (ArchivedMatch, 'league', {
+        'id': 'id',
+        'date': 'date',
+        'home_team': 'home_team_id',
+        'home_team_name': 'home_team__name',
+        'away_team': 'away_team_id',
+        'away_team_name': 'away_team__name',
+        'home_score': 'home_score',
+        'away_score': 'away_score',
+        'league': 'league_id',
+    }),
+}
+
+
+def export_rows(resource, league=None, season=None):
+    model, league_lookup, columns = EXPORTS[resource]
+    queryset = model.objects.all()
+    if league is not None:
+        queryset = queryset.filter(**{league_lookup: league})
+    if season is not None:
+        queryset = queryset.filter(**{f'{league_lookup}__season': season})
+    # Aliases prefixed with "_" never clash with model field names in values().
+    aliases = {f'_{name}': F(path) for name, path in columns.items()}
+    queryset = queryset.order_by('pk').values(**aliases)
+    for row in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield {name: row[f'_{name}'] for name in columns}
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(resource, rows):
+    columns = list(EXPORTS[resource][2])
+    writer = csv.DictWriter(Echo(), fieldnames=columns)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_jsonl(resource, rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def stream_export(resource, fmt, league=None, season=None):
+    rows = export_rows(resource, league=league, season=season)
+    if fmt == 'csv':
+        return stream_csv(resource, rows)
+    return stream_jsonl(resource, rows)
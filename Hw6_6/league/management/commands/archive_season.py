@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from league.archive import archive_league, has_remaining_fixtures, restore_league
+from league.models import League
+
+
+class Command(BaseCommand):
+    help = "Move completed seasons' matches into the archive table (or back with --restore)."
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--league', type=int, action='append', help="League id, may be repeated.")
+        target.add_argument('--season', help="Archive every league of this season.")
+        parser.add_argument('--restore', action='store_true')
+        parser.add_argument('--force', action='store_true', help="Archive even if fixtures are still to be played.")
+
+    def handle(self, *args, **options):
+        if options['league']:
+            leagues = League.objects.filter(pk__in=options['league'])
+        else:
+            leagues = League.objects.filter(season=options['season'])
+        leagues = leagues.filter(archived_at__isnull=not options['restore'])
+        if not leagues.exists():
+            raise CommandError("No matching leagues to process.")
+
+        for league in leagues:
+            if options['restore']:
+                count = restore_league(league)
+                self.stdout.write(f"{league}: restored {count} matches.")
+                continue
+            if has_remaining_fixtures(league) and not options['force']:
+                self.stderr.write(f"{league}: has fixtures still to play, skipped (use --force).")
+                continue
+            count = archive_league(league)
+            self.stdout.write(self.style.SUCCESS(f"{league}: archived {count} matches."))
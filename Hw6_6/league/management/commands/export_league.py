@@ -0,0 +1,24 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from league.exports import EXPORTS, FORMATS, stream_export
+
+
+class Command(BaseCommand):
+    help = "Stream teams, players, profiles or matches to CSV/JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(EXPORTS))
+        parser.add_argument('--format', dest='fmt', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--league', type=int)
+        parser.add_argument('--season')
+        parser.add_argument('--output', help="File path, stdout by default.")
+
+    def handle(self, *args, **options):
+        chunks = stream_export(options['resource'], options['fmt'], league=options['league'], season=options['season'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as out:
+                out.writelines(chunks)
+        else:
+            sys.stdout.writelines(chunks)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from league.schema import SCHEMA_PATH, generate_schema
+
+
+class Command(BaseCommand):
+    help = "Write the OpenAPI schema to the versioned static file served by /api/schema/."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help="Exit with an error if the committed schema is stale.")
+
+    def handle(self, *args, **options):
+        content = generate_schema()
+        current = SCHEMA_PATH.read_bytes() if SCHEMA_PATH.exists() else None
+        if options['check']:
+            if content != current:
+                raise CommandError(f"{SCHEMA_PATH.name} is stale, run manage.py generate_schema.")
+            self.stdout.write(f"{SCHEMA_PATH.name} is up to date.")
+            return
+        if content == current:
+            self.stdout.write(f"{SCHEMA_PATH.name} unchanged.")
+            return
+        SCHEMA_PATH.parent.mkdir(parents=True, exist_ok=True)
+        SCHEMA_PATH.write_bytes(content)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {SCHEMA_PATH}."))
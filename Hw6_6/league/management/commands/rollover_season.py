@@ -0,0 +1,41 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from league.models import League
+from league.rollover import rollover_leagues
+
+
+class Command(BaseCommand):
+    help = "Clone leagues, teams and player assignments into a new season."
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--league', type=int, action='append', help="League id, may be repeated.")
+        target.add_argument('--season', help="Roll over every league of this season.")
+        parser.add_argument('--new-season', required=True)
+        parser.add_argument('--fixtures', action='store_true', help="Generate a double round robin.")
+        parser.add_argument('--start-date', type=date.fromisoformat)
+        parser.add_argument('--round-interval', type=int, default=7, help="Days between rounds.")
+        parser.add_argument('--reset-stats', action='store_true',
+                            help="Zero player stats; they are kept (and carried over) by default.")
+
+    def handle(self, *args, **options):
+        if options['league']:
+            leagues = League.objects.filter(pk__in=options['league'])
+        else:
+            leagues = League.objects.filter(season=options['season'])
+        leagues = list(leagues.order_by('id'))
+        if not leagues:
+            raise CommandError("No matching leagues to roll over.")
+
+        try:
+            created = rollover_leagues(
+                leagues, options['new_season'], fixtures=options['fixtures'], start_date=options['start_date'],
+                round_interval=options['round_interval'], reset_stats=options['reset_stats'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        for old_id, league in created.items():
+            self.stdout.write(f"{old_id} -> {league.pk} {league}")
+        self.stdout.write(self.style.SUCCESS(f"Rolled over {len(created)} leagues."))
@@ -0,0 +1,32 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from league.models import League
+from league.simulation import simulate_season
+
+
+class Command(BaseCommand):
+    help = "Monte Carlo simulation of the rest of a league's season."
+
+    def add_arguments(self, parser):
+        parser.add_argument('league', type=int)
+        parser.add_argument('--runs', type=int, default=100_000)
+        parser.add_argument('--seed', type=int)
+        parser.add_argument('--workers', type=int)
+        parser.add_argument('--top', type=int, default=4)
+        parser.add_argument('--relegation', type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            league = League.objects.get(pk=options['league'])
+        except League.DoesNotExist:
+            raise CommandError(f"League {options['league']} does not exist.")
+        try:
+            result = simulate_season(
+                league, runs=options['runs'], seed=options['seed'], workers=options['workers'],
+                top=options['top'], relegation=options['relegation'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(json.dumps(result, indent=2, ensure_ascii=False))
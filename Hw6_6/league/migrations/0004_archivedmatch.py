@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0003_league_created_at_league_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='league',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedMatch',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('home_score', models.PositiveIntegerField(default=0)),
+                ('away_score', models.PositiveIntegerField(default=0)),
+                ('date', models.DateField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('away_team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_away_matches', to='league.team')),
+                ('home_team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_home_matches', to='league.team')),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_matches', to='league.league')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['league', 'date'], name='league_arch_league__6ec609_idx')],
+            },
+        ),
+    ]
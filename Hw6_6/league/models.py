@@ -4,7 +4,22 @@ from django.utils import timezone
 from django.conf import settings
 
 
-class CustomUserManager(BaseUserManager):
+class CustomUserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # No post_save here, so bulk deactivations and role changes (bulk_update
+        # included) clear the claims auth cache for the rows they touch.
+        if {'is_active', 'role'} & set(kwargs):
+            from .authentication import forget_user
+
+            ids = list(self.values_list('pk', flat=True))
+            rows = super().update(**kwargs)
+            for user_id in ids:
+                forget_user(user_id)
+            return rows
+        return super().update(**kwargs)
+
+
+class CustomUserManager(BaseUserManager.from_queryset(CustomUserQuerySet)):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError("Email is required.")
@@ -50,6 +65,7 @@ class TimestampedModel(models.Model):
 class League(TimestampedModel):
     name = models.CharField(max_length=100)
     season = models.CharField(max_length=50, blank=True)
+    archived_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.name} ({self.season})"
@@ -98,5 +114,24 @@ class Match(TimestampedModel):
     away_score = models.PositiveIntegerField(default=0)
     date = models.DateField()
 
+    def __str__(self):
+        return f"{self.home_team} vs {self.away_team} ({self.date})"
+
+
+class ArchivedMatch(models.Model):
+    # Cold copy of Match rows for archived seasons; keeps the original id.
+    id = models.BigIntegerField(primary_key=True)
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name='archived_matches')
+    home_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='archived_home_matches')
+    away_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='archived_away_matches')
+    home_score = models.PositiveIntegerField(default=0)
+    away_score = models.PositiveIntegerField(default=0)
+    date = models.DateField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=['league', 'date'])]
+
     def __str__(self):
         return f"{self.home_team} vs {self.away_team} ({self.date})"
\ No newline at end of file
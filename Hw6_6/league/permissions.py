@@ -15,7 +15,7 @@ class IsManagerOrAdmin(permissions.BasePermission):
         if request.user.role == "admin":
             return True
         elif request.user.role == "manager":
-            return hasattr(obj, "manager") and obj.manager == request.user
+            return getattr(obj, "manager_id", None) == request.user.id
         return False
 
 
@@ -27,6 +27,6 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         if request.user.role == "admin":
             return True
         elif request.user.role == "manager":
-             return hasattr(obj, "manager") and obj.manager == request.user
+             return getattr(obj, "manager_id", None) == request.user.id
         else:  
-            return hasattr(obj, "user") and obj.user == request.user
\ No newline at end of file
+            return getattr(obj, "user_id", None) == request.user.id
\ No newline at end of file
@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, Q, When, Value
+from django.utils import timezone
+
+from .models import League, Team, Player, PlayerProfile, Match
+
+
+BATCH_SIZE = 500
+STAT_FIELDS = ('goals', 'assists', 'yellow_cards', 'red_cards')
+
+
+def round_robin(team_ids):
+    """Double round robin (circle method): list of rounds of (home, away) pairs."""
+    teams = list(team_ids)
+    if len(teams) % 2:
+        teams.append(None)
+    n = len(teams)
+    rounds = []
+    for r in range(n - 1):
+        pairs = []
+        for i in range(n // 2):
+            home, away = teams[i], teams[n - 1 - i]
+            if home is None or away is None:
+                continue
+            pairs.append((home, away) if (r + i) % 2 == 0 else (away, home))
+        rounds.append(pairs)
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    return rounds + [[(away, home) for home, away in pairs] for pairs in rounds]
+
+
+@transaction.atomic
+def rollover_leagues(leagues, new_season, fixtures=False, start_date=None, round_interval=7, reset_stats=False):
+    """Clone leagues and their teams into new_season and move player assignments over.
+
+    Everything happens in one transaction with a handful of bulk queries,
+    whatever the number of leagues. Returns {old league id: new league}.
+    Players keep their stats unless reset_stats is set; there is only one
+    stats row per player, so resetting discards last season's numbers.
+    Raises ValueError if a league with the same (name, season) as one of
+    the new ones exists already, or two of the leagues would get one.
+    """
+    leagues = list(leagues)
+    # A league is identified by (name, season): same-named leagues of other seasons don't count.
+    targets = {(league.name, new_season) for league in leagues}
+    if len(targets) < len(leagues):
+        raise ValueError(f"Two of these leagues share a name and would both become one league in {new_season!r}.")
+    clash = Q()
+    for name, season in targets:
+        clash |= Q(name=name, season=season)
+    existing = sorted(League.objects.filter(clash).values_list('name', flat=True))
+    if existing:
+        raise ValueError(f"Already rolled over into season {new_season!r}: {', '.join(existing)}.")
+    new_leagues = League.objects.bulk_create(
+        [League(name=league.name, season=new_season) for league in leagues], batch_size=BATCH_SIZE,
+    )
+    league_map = {old.pk: new.pk for old, new in zip(leagues, new_leagues)}
+
+    old_teams = list(Team.objects.filter(league_id__in=league_map).order_by('id').values('id', 'name', 'league_id'))
+    new_teams = Team.objects.bulk_create(
+        [Team(name=team['name'], league_id=league_map[team['league_id']]) for team in old_teams], batch_size=BATCH_SIZE,
+    )
+    team_map = {old['id']: new.pk for old, new in zip(old_teams, new_teams)}
+
+    # Player and PlayerProfile are one-to-one with the user, so assignments
+    # are moved onto the new season rather than copied.
+    now = timezone.now()
+    players = list(Player.objects.filter(team_id__in=team_map).only('id', 'team_id', *STAT_FIELDS))
+    for player in players:
+        player.team_id = team_map[player.team_id]
+        player.updated_at = now
+        if reset_stats:
+            for field in STAT_FIELDS:
+                setattr(player, field, 0)
+    fields = ['team', 'updated_at', *STAT_FIELDS] if reset_stats else ['team', 'updated_at']
+    Player.objects.bulk_update(players, fields, batch_size=BATCH_SIZE)
+
+    PlayerProfile.objects.filter(league_id__in=league_map).update(
+        league_id=Case(*[When(league_id=old, then=Value(new)) for old, new in league_map.items()])
+    )
+
+    if fixtures:
+        start_date = start_date or timezone.localdate()
+        matches = []
+        for new_league in new_leagues:
+            team_ids = [new.pk for new in new_teams if new.league_id == new_league.pk]
+            for number, pairs in enumerate(round_robin(team_ids)):
+                date = start_date + timedelta(days=number * round_interval)
+                matches.extend(Match(home_team_id=home, away_team_id=away, date=date) for home, away in pairs)
+        Match.objects.bulk_create(matches, batch_size=BATCH_SIZE)
+
+    return {old.pk: new for old, new in zip(leagues, new_leagues)}
@@ -0,0 +1,61 @@
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.shortcuts import render
+from django.urls import reverse
+
+
+API_VERSION = 'v1'
+SCHEMA_PATH = Path(__file__).resolve().parent / 'static' / 'league' / f'openapi-{API_VERSION}.json'
+
+
+def generate_schema():
+    """Run drf_yasg introspection once and return the encoded JSON schema."""
+    from drf_yasg import openapi
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    info = openapi.Info(title="Football League API", default_version=API_VERSION)
+    schema = OpenAPISchemaGenerator(info).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[], pretty=True).encode(schema) + b'\n'
+
+
+@lru_cache(maxsize=None)
+def load_schema():
+    """Schema bytes and their ETag, read from the committed file once per process."""
+    if SCHEMA_PATH.exists():
+        content = SCHEMA_PATH.read_bytes()
+    else:
+        content = generate_schema()
+    return content, hashlib.sha256(content).hexdigest()[:16]
+
+
+def _schema_response(request, max_age):
+    content, etag = load_schema()
+    quoted = f'"{etag}"'
+    if quoted in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = quoted
+    response['Cache-Control'] = f'public, max-age={max_age}' + (', immutable' if max_age >= 31536000 else '')
+    return response
+
+
+def schema_view(request):
+    return _schema_response(request, max_age=getattr(settings, 'SCHEMA_CACHE_SECONDS', 3600))
+
+
+def schema_digest_view(request, digest):
+    # Content-addressed URL: safe to cache for a year.
+    if digest != load_schema()[1]:
+        raise Http404
+    return _schema_response(request, max_age=31536000)
+
+
+def docs_view(request):
+    schema_url = reverse('schema-digest', kwargs={'digest': load_schema()[1]})
+    return render(request, 'league/swagger.html', {'schema_url': schema_url})
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import CustomUser, PlayerProfile, League, Team, Player, Match
+from .models import CustomUser, PlayerProfile, League, Team, Player, Match, ArchivedMatch
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
@@ -49,6 +49,37 @@ class MatchSerializer(serializers.ModelSerializer):
         model = Match
         fields = ['id', 'home_team', 'home_team_name', 'away_team', 'away_team_name', 'home_score', 'away_score', 'date', 'created_at', 'updated_at']
 
+
+class RosterPlayerSerializer(serializers.ModelSerializer):
+    email = serializers.CharField(source='profile.user.email', read_only=True)
+    manager_email = serializers.CharField(source='profile.manager.email', read_only=True, default=None)
+    position = serializers.CharField(source='profile.position', read_only=True)
+    number = serializers.IntegerField(source='profile.number', read_only=True)
+
+    class Meta:
+        model = Player
+        fields = ['id', 'profile', 'email', 'manager_email', 'position', 'number', 'goals', 'assists', 'yellow_cards', 'red_cards']
+
+
+class TeamRosterSerializer(serializers.ModelSerializer):
+    league_name = serializers.CharField(source='league.name', read_only=True)
+    season = serializers.CharField(source='league.season', read_only=True)
+    players = RosterPlayerSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Team
+        fields = ['id', 'name', 'league', 'league_name', 'season', 'players']
+
+
+class ArchivedMatchSerializer(serializers.ModelSerializer):
+    home_team_name = serializers.CharField(source='home_team.name', read_only=True)
+    away_team_name = serializers.CharField(source='away_team.name', read_only=True)
+
+    class Meta:
+        model = ArchivedMatch
+        fields = ['id', 'league', 'home_team', 'home_team_name', 'away_team', 'away_team_name', 'home_score', 'away_score', 'date', 'created_at', 'updated_at']
+        read_only_fields = fields
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
@@ -63,6 +94,13 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         data['user'] = UserSerializer(self.user).data
         return data
 
+class LeagueRolloverSerializer(serializers.Serializer):
+    season = serializers.CharField(max_length=50)
+    fixtures = serializers.BooleanField(default=False)
+    start_date = serializers.DateField(required=False)
+    round_interval = serializers.IntegerField(default=7, min_value=1)
+    reset_stats = serializers.BooleanField(default=False)
+
 class ChangePasswordSerializer(serializers.Serializer):
     old_password = serializers.CharField(required=True)
     new_password = serializers.CharField(required=True, validators = [validate_password])
@@ -0,0 +1,168 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.utils import timezone
+
+from .models import Match, Team
+
+
+CHUNK_SIZE = 10_000
+PRIOR_MATCHES = 2
+
+
+def load_fixtures(league, today=None):
+    # Match has no status column: fixtures up to today count as played.
+    today = today or timezone.localdate()
+    teams = list(Team.objects.filter(league=league).order_by('id').values_list('id', 'name'))
+    index = {team_id: i for i, (team_id, _) in enumerate(teams)}
+    rows = Match.objects.filter(home_team__league=league).values_list(
+        'home_team_id', 'away_team_id', 'home_score', 'away_score', 'date'
+    )
+    played, remaining = [], []
+    for home_id, away_id, home_score, away_score, date in rows.iterator(chunk_size=2000):
+        if home_id not in index or away_id not in index:
+            continue
+        if date <= today:
+            played.append((index[home_id], index[away_id], home_score, away_score))
+        else:
+            remaining.append((index[home_id], index[away_id]))
+    played = np.array(played, dtype=np.int64).reshape(-1, 4)
+    remaining = np.array(remaining, dtype=np.int64).reshape(-1, 2)
+    return teams, played, remaining
+
+
+def estimate_strengths(n_teams, played):
+    """Poisson attack/defence ratings with a home-advantage term.
+
+    Each team starts from PRIOR_MATCHES league-average games so that sides
+    with few or no results still get a finite, sensible rate.
+    """
+    home, away = played[:, 0], played[:, 1]
+    home_goals, away_goals = played[:, 2], played[:, 3]
+    if len(played):
+        avg_home = max(home_goals.mean(), 0.1)
+        avg_away = max(away_goals.mean(), 0.1)
+    else:
+        avg_home, avg_away = 1.5, 1.2
+    avg = (avg_home + avg_away) / 2
+
+    games = np.bincount(home, minlength=n_teams) + np.bincount(away, minlength=n_teams) + PRIOR_MATCHES
+    scored = (np.bincount(home, weights=home_goals, minlength=n_teams)
+              + np.bincount(away, weights=away_goals, minlength=n_teams) + PRIOR_MATCHES * avg)
+    conceded = (np.bincount(home, weights=away_goals, minlength=n_teams)
+                + np.bincount(away, weights=home_goals, minlength=n_teams) + PRIOR_MATCHES * avg)
+    attack = scored / games / avg
+    defence = conceded / games / avg
+    return attack, defence, avg_home, avg_away
+
+
+def current_table(n_teams, played):
+    home, away = played[:, 0], played[:, 1]
+    home_goals, away_goals = played[:, 2], played[:, 3]
+    home_points = np.where(home_goals > away_goals, 3, np.where(home_goals == away_goals, 1, 0))
+    away_points = np.where(away_goals > home_goals, 3, np.where(home_goals == away_goals, 1, 0))
+    points = np.bincount(home, weights=home_points, minlength=n_teams) + np.bincount(away, weights=away_points, minlength=n_teams)
+    diff = (np.bincount(home, weights=home_goals - away_goals, minlength=n_teams)
+            + np.bincount(away, weights=away_goals - home_goals, minlength=n_teams))
+    return points, diff
+
+
+def _simulate_chunk(args):
+    runs, seed, base_points, base_diff, remaining, home_rate, away_rate, top, bottom = args
+    rng = np.random.default_rng(seed)
+    n_teams = len(base_points)
+    home, away = remaining[:, 0], remaining[:, 1]
+
+    home_goals = rng.poisson(home_rate, size=(runs, len(remaining)))
+    away_goals = rng.poisson(away_rate, size=(runs, len(remaining)))
+    home_points = np.where(home_goals > away_goals, 3, (home_goals == away_goals).astype(np.int64))
+    away_points = np.where(away_goals > home_goals, 3, (home_goals == away_goals).astype(np.int64))
+
+    # (fixtures x teams) incidence matrices turn per-fixture results into table columns.
+    home_matrix = np.zeros((len(remaining), n_teams))
+    away_matrix = np.zeros((len(remaining), n_teams))
+    home_matrix[np.arange(len(remaining)), home] = 1
+    away_matrix[np.arange(len(remaining)), away] = 1
+    points = base_points + home_points @ home_matrix + away_points @ away_matrix
+    diff = base_diff + (home_goals - away_goals) @ home_matrix + (away_goals - home_goals) @ away_matrix
+
+    # Points, then goal difference, then a random draw to break exact ties.
+    score = points * 1e6 + diff * 1e2 + rng.random((runs, n_teams))
+    order = np.argsort(-score, axis=1)
+    title = np.bincount(order[:, 0], minlength=n_teams)
+    top_n = np.bincount(order[:, :top].ravel(), minlength=n_teams)
+    relegated = np.bincount(order[:, n_teams - bottom:].ravel(), minlength=n_teams)
+    return title, top_n, relegated
+
+
+def simulate_season(league, runs=100_000, seed=None, workers=None, top=4, relegation=3):
+    if runs < 1:
+        raise ValueError("runs must be a positive integer.")
+    started = time.perf_counter()
+    teams, played, remaining = load_fixtures(league)
+    n_teams = len(teams)
+    if n_teams < 2:
+        raise ValueError("League needs at least two teams to simulate.")
+    top = min(top, n_teams)
+    relegation = min(relegation, n_teams)
+
+    attack, defence, avg_home, avg_away = estimate_strengths(n_teams, played)
+    base_points, base_diff = current_table(n_teams, played)
+    home_rate = avg_home * attack[remaining[:, 0]] * defence[remaining[:, 1]]
+    away_rate = avg_away * attack[remaining[:, 1]] * defence[remaining[:, 0]]
+    prepared = time.perf_counter()
+
+    # Chunks and their seeds depend only on (runs, seed), so the result is the
+    # same no matter how many workers share the work.
+    sizes = [CHUNK_SIZE] * (runs // CHUNK_SIZE)
+    if runs % CHUNK_SIZE:
+        sizes.append(runs % CHUNK_SIZE)
+    sequence = np.random.SeedSequence(seed)
+    seed = sequence.entropy
+    seeds = sequence.spawn(len(sizes))
+    tasks = [
+        (size, chunk_seed, base_points, base_diff, remaining, home_rate, away_rate, top, relegation)
+        for size, chunk_seed in zip(sizes, seeds)
+    ]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks) or 1))
+    if workers == 1:
+        results = list(map(_simulate_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_chunk, tasks))
+    simulated = time.perf_counter()
+
+    title = sum((r[0] for r in results), np.zeros(n_teams))
+    top_n = sum((r[1] for r in results), np.zeros(n_teams))
+    relegated = sum((r[2] for r in results), np.zeros(n_teams))
+    table = [
+        {
+            'team': team_id,
+            'team_name': name,
+            'points': int(base_points[i]),
+            'goal_difference': int(base_diff[i]),
+            'title': round(float(title[i]) / runs, 4),
+            f'top_{top}': round(float(top_n[i]) / runs, 4),
+            'relegation': round(float(relegated[i]) / runs, 4),
+        }
+        for i, (team_id, name) in enumerate(teams)
+    ]
+    table.sort(key=lambda row: (-row['title'], -row[f'top_{top}'], row['relegation']))
+    finished = time.perf_counter()
+    return {
+        'league': league.id,
+        'runs': runs,
+        'seed': seed,
+        'workers': workers,
+        'played': len(played),
+        'remaining': len(remaining),
+        'teams': table,
+        'timings': {
+            'prepare': round(prepared - started, 4),
+            'simulate': round(simulated - prepared, 4),
+            'total': round(finished - started, 4),
+            'runs_per_second': round(runs / max(simulated - prepared, 1e-9)),
+        },
+    }
@@ -1,3 +1,327 @@
-from django.test import TestCase
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from .archive import archive_league
+from .authentication import ClaimsJWTAuthentication
+from .management.commands import generate_schema
+from .models import CustomUser, League, Match, Player, PlayerProfile, Team
+from .permissions import IsAdmin, IsManagerOrAdmin
+from .rollover import round_robin, rollover_leagues
+from .schema import SCHEMA_PATH, load_schema
+from .serializers import CustomTokenObtainPairSerializer
+
+
+def make_league(name='Premier', season='2024', teams=4):
+    """A league whose first half of a double round robin is played, the second half still to come."""
+    league = League.objects.create(name=name, season=season)
+    team_ids = [Team.objects.create(name=f'Team {n}', league=league).pk for n in range(teams)]
+    today = timezone.localdate()
+    rounds = round_robin(team_ids)
+    for number, pairs in enumerate(rounds):
+        offset = number - len(rounds) // 2
+        for home, away in pairs:
+            Match.objects.create(
+                home_team_id=home, away_team_id=away, date=today + timedelta(days=offset * 7 + (offset >= 0)),
+                home_score=(home + number) % 3, away_score=away % 2,
+            )
+    return league
+
+
+class SimulationTests(APITestCase):
+    def setUp(self):
+        admin = CustomUser.objects.create_user('admin@example.com', 'pw', role='admin')
+        self.client.force_authenticate(admin)
+        self.league = make_league()
+        self.url = reverse('league-simulate', args=[self.league.pk])
+
+    def test_same_seed_same_result(self):
+        first = self.client.get(self.url, {'runs': 2000, 'seed': 7})
+        second = self.client.get(self.url, {'runs': 2000, 'seed': 7})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data['seed'], 7)
+        self.assertGreater(first.data['remaining'], 0)
+        self.assertEqual(first.data['teams'], second.data['teams'])
+
+    def test_bad_parameters(self):
+        for params in ({'runs': 'many'}, {'workers': 'x'}, {'seed': '1.5'}, {'runs': 0}, {'workers': 0}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+    def test_workers_are_capped_by_the_setting(self):
+        response = self.client.get(self.url, {'runs': 100, 'workers': 64})
+        self.assertEqual(response.data['workers'], 1)
+
+
+class RolloverTests(TestCase):
+    def setUp(self):
+        self.league = League.objects.create(name='Premier', season='2024')
+        self.team = Team.objects.create(name='Reds', league=self.league)
+        user = CustomUser.objects.create_user('player@example.com', 'pw')
+        profile = PlayerProfile.objects.create(user=user, league=self.league)
+        self.player = Player.objects.create(profile=profile, team=self.team, goals=12, assists=3)
+
+    def test_keeps_stats_by_default(self):
+        created = rollover_leagues([self.league], '2025')
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.team.league, created[self.league.pk])
+        self.assertEqual((self.player.goals, self.player.assists), (12, 3))
+
+    def test_reset_stats_is_opt_in(self):
+        rollover_leagues([self.league], '2025', reset_stats=True)
+        self.player.refresh_from_db()
+        self.assertEqual((self.player.goals, self.player.assists), (0, 0))
+
+    def test_rejects_existing_season(self):
+        rollover_leagues([self.league], '2025')
+        with self.assertRaises(ValueError):
+            rollover_leagues([self.league], '2025')
+        self.assertEqual(League.objects.filter(name='Premier', season='2025').count(), 1)
+
+    def test_same_name_in_other_seasons_does_not_clash(self):
+        older = League.objects.create(name='Premier', season='2023')
+        Team.objects.create(name='Blues', league=older)
+        # Each source goes to its own season, though another 'Premier' is already there.
+        rollover_leagues([self.league], '2025')
+        created = rollover_leagues([older], '2024-b')
+        self.assertEqual(created[older.pk].season, '2024-b')
+        self.assertEqual(list(created[older.pk].teams.values_list('name', flat=True)), ['Blues'])
+        self.assertEqual(League.objects.filter(name='Premier').count(), 4)
+
+    def test_rejects_sources_that_would_collide(self):
+        older = League.objects.create(name='Premier', season='2023')
+        with self.assertRaises(ValueError):
+            rollover_leagues([self.league, older], '2025')
+        self.assertFalse(League.objects.filter(season='2025').exists())
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        admin = CustomUser.objects.create_user('admin@example.com', 'pw', role='admin')
+        self.client.force_authenticate(admin)
+        self.league = League.objects.create(name='Premier', season='2024')
+        self.reds = Team.objects.create(name='Reds', league=self.league)
+        self.blues = Team.objects.create(name='Blues, "B"', league=self.league)
+        Team.objects.create(name='Elsewhere', league=League.objects.create(name='Cup', season='2024'))
+
+    def get(self, resource, fmt, **params):
+        response = self.client.get(reverse('export', args=[resource, fmt]), params)
+        body = b''.join(response.streaming_content).decode() if response.streaming else None
+        return response, body
+
+    def test_csv(self):
+        response, body = self.get('teams', 'csv', league=self.league.pk)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="teams.csv"')
+        lines = body.splitlines()
+        self.assertEqual(lines[0], 'id,name,league,league_name,season,created_at,updated_at')
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith(f'{self.reds.pk},Reds,{self.league.pk},Premier,2024,'))
+        self.assertIn('"Blues, ""B"""', lines[2])
+
+    def test_jsonl(self):
+        response, body = self.get('teams', 'jsonl', season='2024')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['Reds', 'Blues, "B"', 'Elsewhere'])
+        self.assertEqual(rows[0]['league_name'], 'Premier')
+
+    def test_bad_filter_and_unknown_export(self):
+        self.assertEqual(self.get('teams', 'csv', league='premier')[0].status_code, 400)
+        self.assertEqual(self.get('coaches', 'csv')[0].status_code, 404)
+        self.assertEqual(self.get('teams', 'xlsx')[0].status_code, 404)
+
+
+class ArchivedMatchRoutingTests(APITestCase):
+    def setUp(self):
+        admin = CustomUser.objects.create_user('admin@example.com', 'pw', role='admin')
+        self.client.force_authenticate(admin)
+        self.old = make_league(season='2023')
+        self.archived_ids = sorted(Match.objects.filter(home_team__league=self.old).values_list('pk', flat=True))
+        archive_league(self.old)
+        self.current = make_league(season='2024')
+        self.current_ids = sorted(Match.objects.values_list('pk', flat=True))
+
+    def ids(self, response):
+        return sorted(row['id'] for row in response.data['results'])
+
+    def test_list_of_an_archived_league_reads_the_archive(self):
+        # League lookup, count and page: the archive check runs once per request.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('match-list'), {'league': self.old.pk, 'page_size': 100})
+        self.assertEqual(self.ids(response), self.archived_ids)
+        self.assertEqual(response.data['results'][0]['league'], self.old.pk)
+
+    def test_season_and_flag_routing(self):
+        response = self.client.get(reverse('match-list'), {'season': '2023', 'page_size': 100})
+        self.assertEqual(self.ids(response), self.archived_ids)
+        response = self.client.get(reverse('match-list'), {'archived': '1', 'page_size': 100})
+        self.assertEqual(self.ids(response), self.archived_ids)
+        response = self.client.get(reverse('match-list'), {'season': '2024', 'page_size': 100})
+        self.assertEqual(self.ids(response), self.current_ids)
+
+    def test_unfiltered_list_covers_the_hot_table_only(self):
+        response = self.client.get(reverse('match-list'), {'page_size': 100})
+        self.assertEqual(self.ids(response), self.current_ids)
+
+    def test_retrieve_falls_back_to_the_archive(self):
+        url = reverse('match-detail', args=[self.archived_ids[0]])
+        response = self.client.get(url)
+        self.assertEqual((response.status_code, response.data['league']), (200, self.old.pk))
+        self.assertEqual(self.client.patch(url, {'home_score': 9}).status_code, 404)
+
+
+class RosterTests(APITestCase):
+    def setUp(self):
+        admin = CustomUser.objects.create_user('admin@example.com', 'pw', role='admin')
+        self.client.force_authenticate(admin)
+        self.manager = CustomUser.objects.create_user('manager@example.com', 'pw', role='manager')
+        self.team = Team.objects.create(name='Reds', league=League.objects.create(name='Premier', season='2024'))
+
+    def add_players(self, count):
+        for _ in range(count):
+            n = Player.objects.count()
+            user = CustomUser.objects.create_user(f'player{n}@example.com')
+            profile = PlayerProfile.objects.create(user=user, manager=self.manager, league=self.team.league, number=n)
+            Player.objects.create(profile=profile, team=self.team, goals=n)
+
+    def test_query_count_does_not_grow_with_the_squad(self):
+        url = reverse('team-roster', args=[self.team.pk])
+        for squad in (3, 25):
+            self.add_players(squad - Player.objects.count())
+            with self.subTest(squad=squad), self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(len(response.data['players']), squad)
+        player = response.data['players'][0]
+        self.assertEqual((player['email'], player['manager_email'], player['number']),
+                         ('player0@example.com', 'manager@example.com', 0))
+
+
+class SchemaTests(TestCase):
+    def test_etag_and_not_modified(self):
+        response = self.client.get(reverse('schema'))
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(etag, f'"{load_schema()[1]}"')
+        response = self.client.get(reverse('schema'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response['ETag'], response.content), (304, etag, b''))
+        self.assertEqual(self.client.get(reverse('schema'), HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_digest_url_is_immutable(self):
+        digest = load_schema()[1]
+        response = self.client.get(reverse('schema-digest', args=[digest]))
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.client.get(reverse('schema-digest', args=['0' * 16])).status_code, 404)
+
+    def test_check_fails_on_a_stale_or_missing_file(self):
+        out = StringIO()
+        call_command('generate_schema', check=True, stdout=out)
+        self.assertIn('is up to date', out.getvalue())
+        with tempfile.TemporaryDirectory() as directory:
+            stale = Path(directory) / SCHEMA_PATH.name
+            stale.write_bytes(b'{}\n')
+            for path in (stale, Path(directory) / 'missing.json'):
+                with self.subTest(path=path.name), mock.patch.object(generate_schema, 'SCHEMA_PATH', path):
+                    with self.assertRaises(CommandError) as caught:
+                        call_command('generate_schema', check=True, stdout=StringIO())
+                    # manage.py turns a CommandError into exit status 1.
+                    self.assertEqual(caught.exception.returncode, 1)
+            self.assertEqual(stale.read_bytes(), b'{}\n')
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = CustomUser.objects.create_user('admin@example.com', role='admin')
+
+    def request(self, user=None):
+        token = CustomTokenObtainPairSerializer.get_token(user or self.user).access_token
+        return Request(APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+
+    def authenticate(self, request):
+        request.user, _ = ClaimsJWTAuthentication().authenticate(request)
+        return request.user
+
+    def test_roles_come_from_claims_without_a_user_query(self):
+        with self.assertNumQueries(1):  # the cached (is_active, role) state
+            user = self.authenticate(self.request())
+        with self.assertNumQueries(0):
+            request = self.request()
+            user = self.authenticate(request)
+            self.assertEqual((user.id, user.email, user.role), (self.user.pk, 'admin@example.com', 'admin'))
+            self.assertTrue(IsAdmin().has_permission(request, None))
+            self.assertEqual(user, self.user)
+
+    def test_role_checks(self):
+        manager = CustomUser.objects.create_user('manager@example.com', role='manager')
+        player = CustomUser.objects.create_user('player@example.com')
+        request = self.request(manager)
+        self.authenticate(request)
+        self.assertFalse(IsAdmin().has_permission(request, None))
+        self.assertTrue(IsManagerOrAdmin().has_permission(request, None))
+        own, other = PlayerProfile(user=player, manager=manager), PlayerProfile(user=player, manager=self.user)
+        self.assertTrue(IsManagerOrAdmin().has_object_permission(request, None, own))
+        self.assertFalse(IsManagerOrAdmin().has_object_permission(request, None, other))
+        request = self.request(player)
+        self.authenticate(request)
+        self.assertFalse(IsManagerOrAdmin().has_permission(request, None))
+
+    def test_deactivation_by_any_path_revokes(self):
+        def save(user):
+            user.is_active = False
+            user.save()
+
+        def bulk_update(user):
+            user.is_active = False
+            CustomUser.objects.bulk_update([user], ['is_active'])
+
+        paths = {
+            'save': save,
+            'update': lambda user: CustomUser.objects.filter(pk=user.pk).update(is_active=False),
+            'bulk_update': bulk_update,
+        }
+        for name, deactivate in paths.items():
+            with self.subTest(path=name):
+                CustomUser.objects.filter(pk=self.user.pk).update(is_active=True)
+                self.authenticate(self.request())  # warm the state cache
+                deactivate(CustomUser.objects.get(pk=self.user.pk))
+                with self.assertRaises(AuthenticationFailed) as caught:
+                    self.authenticate(self.request())
+                self.assertEqual(caught.exception.detail['code'], 'user_inactive')
+
+    def test_role_change_and_deletion_revoke(self):
+        request = self.request()
+        self.authenticate(request)
+        CustomUser.objects.filter(pk=self.user.pk).update(role='player')
+        with self.assertRaises(AuthenticationFailed) as caught:
+            self.authenticate(request)
+        self.assertEqual(caught.exception.detail['code'], 'token_stale')
+        CustomUser.objects.filter(pk=self.user.pk).delete()
+        with self.assertRaises(AuthenticationFailed) as caught:
+            self.authenticate(request)
+        self.assertEqual(caught.exception.detail['code'], 'user_not_found')
+
+    def test_api_rejects_a_user_deactivated_by_update(self):
+        api_settings = {**settings.REST_FRAMEWORK, 'DEFAULT_AUTHENTICATION_CLASSES': [
+            'league.authentication.ClaimsJWTAuthentication',
+        ]}
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        with override_settings(REST_FRAMEWORK=api_settings):
+            url = reverse('league-list')
+            self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}').status_code, 200)
+            CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+            self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}').status_code, 401)
@@ -2,9 +2,11 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     UserViewSet, PlayerProfileViewSet, LeagueViewSet,
-    TeamViewSet, PlayerViewSet, MatchViewSet
+    TeamViewSet, PlayerViewSet, MatchViewSet, ExportView
 )
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from common.throttling import AuthEmailThrottle, AuthIPThrottle
+from .schema import schema_view, schema_digest_view, docs_view
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -17,8 +19,12 @@ router.register(r'matches', MatchViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('export/<str:resource>.<str:fmt>', ExportView.as_view(), name='export'),
+    path('schema/', schema_view, name='schema'),
+    path('schema/<str:digest>.json', schema_digest_view, name='schema-digest'),
+    path('docs/', docs_view, name='docs'),
     
     
-    path('auth/jwt/create/', TokenObtainPairView.as_view(), name='jwt-create'),
+    path('auth/jwt/create/', TokenObtainPairView.as_view(throttle_classes=[AuthIPThrottle, AuthEmailThrottle]), name='jwt-create'),
     path('auth/jwt/refresh/', TokenRefreshView.as_view(), name='jwt-refresh'),
 ]
\ No newline at end of file
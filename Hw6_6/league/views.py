@@ -1,12 +1,24 @@
-from rest_framework import viewsets, filters
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.db.models import Count, Prefetch, Q
+from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.pagination import PageNumberPagination
-from .models import CustomUser, PlayerProfile, League, Team, Player, Match
+from .models import CustomUser, PlayerProfile, League, Team, Player, Match, ArchivedMatch
 from .serializers import (
     UserSerializer, PlayerProfileSerializer, LeagueSerializer, 
-    TeamSerializer, PlayerSerializer, MatchSerializer
+    TeamSerializer, PlayerSerializer, MatchSerializer, ArchivedMatchSerializer,
+    TeamRosterSerializer, LeagueRolloverSerializer
 )
 from .permissions import IsAdmin, IsManagerOrAdmin
+from .simulation import simulate_season
+from .rollover import rollover_leagues
+from .exports import EXPORTS, FORMATS, stream_export
 
 
 class StandardPagination(PageNumberPagination):
@@ -39,6 +51,44 @@ class LeagueViewSet(viewsets.ModelViewSet):
     serializer_class = LeagueSerializer
     permission_classes = [IsAdmin]
     pagination_class = StandardPagination
+    max_simulation_runs = 200_000
+
+    @action(detail=True, methods=['get'])
+    def simulate(self, request, pk=None):
+        league = self.get_object()
+        try:
+            runs = int(request.query_params.get('runs', 10_000))
+            seed = request.query_params.get('seed')
+            seed = int(seed) if seed is not None else None
+            workers = int(request.query_params.get('workers', 1))
+        except ValueError:
+            return Response({"detail": "runs, seed and workers must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if runs < 1 or workers < 1:
+            return Response({"detail": "runs and workers must be positive."}, status=status.HTTP_400_BAD_REQUEST)
+        runs = min(runs, self.max_simulation_runs)
+        # Extra workers are processes forked from this web worker, so they are
+        # capped (in-process by default); big runs belong in simulate_season.
+        workers = min(workers, getattr(settings, 'SIMULATION_MAX_WORKERS', 1))
+        try:
+            result = simulate_season(league, runs=runs, seed=seed, workers=workers)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+    @action(detail=True, methods=['post'])
+    def rollover(self, request, pk=None):
+        league = self.get_object()
+        serializer = LeagueRolloverSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            created = rollover_leagues(
+                [league], data['season'], fixtures=data['fixtures'], start_date=data.get('start_date'),
+                round_interval=data['round_interval'], reset_stats=data['reset_stats'],
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(LeagueSerializer(created[league.pk]).data, status=status.HTTP_201_CREATED)
 
 
 class TeamViewSet(viewsets.ModelViewSet):
@@ -51,6 +101,26 @@ class TeamViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name']
     pagination_class = StandardPagination
 
+    def get_queryset(self):
+        if self.action == 'roster':
+            # Two queries whatever the squad size: team + league, then players
+            # joined with profile, user and manager.
+            players = Player.objects.select_related('profile__user', 'profile__manager').only(
+                'id', 'team_id', 'goals', 'assists', 'yellow_cards', 'red_cards',
+                'profile__id', 'profile__position', 'profile__number',
+                'profile__user__id', 'profile__user__email',
+                'profile__manager__id', 'profile__manager__email',
+            ).order_by('profile__number', 'id')
+            return Team.objects.select_related('league').only(
+                'id', 'name', 'league__id', 'league__name', 'league__season',
+            ).prefetch_related(Prefetch('players', queryset=players))
+        return super().get_queryset()
+
+    @action(detail=True, methods=['get'])
+    def roster(self, request, pk=None):
+        team = self.get_object()
+        return Response(TeamRosterSerializer(team).data)
+
 
 class PlayerViewSet(viewsets.ModelViewSet):
     queryset = Player.objects.select_related('profile', 'team').all()
@@ -70,4 +140,79 @@ class MatchViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['home_team', 'away_team', 'date']
     ordering_fields = ['date']
-    pagination_class = StandardPagination
\ No newline at end of file
+    pagination_class = StandardPagination
+
+    @cached_property
+    def use_archive(self):
+        """Whether this request reads ArchivedMatch; worked out once per request.
+
+        Reads for archived seasons go there when asked for with ?archived=1,
+        ?league= of an archived league or ?season= whose leagues are all
+        archived. An unfiltered list only covers the hot table; a retrieve
+        falls back to the archive by id. Writes only ever touch Match.
+        """
+        if getattr(self, 'swagger_fake_view', False) or self.request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            return False
+        params = self.request.query_params
+        if params.get('archived') in ('1', 'true'):
+            return True
+        league = params.get('league')
+        if league and league.isdigit():
+            return League.objects.filter(pk=league, archived_at__isnull=False).exists()
+        season = params.get('season')
+        if season:
+            leagues = League.objects.filter(season=season).aggregate(
+                total=Count('pk'), live=Count('pk', filter=Q(archived_at__isnull=True)),
+            )
+            return bool(leagues['total']) and not leagues['live']
+        return False
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return super().get_queryset()
+        params = self.request.query_params
+        if self.use_archive:
+            queryset = ArchivedMatch.objects.select_related('home_team', 'away_team').order_by('date', 'id')
+            league_lookup = 'league'
+        else:
+            queryset = super().get_queryset()
+            league_lookup = 'home_team__league'
+        if params.get('league', '').isdigit():
+            queryset = queryset.filter(**{league_lookup: params['league']})
+        if params.get('season'):
+            queryset = queryset.filter(**{f'{league_lookup}__season': params['season']})
+        return queryset
+
+    def get_serializer_class(self):
+        if getattr(self, 'archived_object', False) or self.use_archive:
+            return ArchivedMatchSerializer
+        return super().get_serializer_class()
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if self.request.method != 'GET':
+                raise
+        match = get_object_or_404(ArchivedMatch.objects.select_related('home_team', 'away_team'), pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, match)
+        self.archived_object = True
+        return match
+
+
+class ExportView(APIView):
+    permission_classes = [IsManagerOrAdmin]
+
+    def get(self, request, resource, fmt):
+        if resource not in EXPORTS or fmt not in FORMATS:
+            return Response({"detail": "Unknown export."}, status=status.HTTP_404_NOT_FOUND)
+        league = request.query_params.get('league')
+        if league is not None and not league.isdigit():
+            return Response({"detail": "league must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        season = request.query_params.get('season')
+        response = StreamingHttpResponse(
+            stream_export(resource, fmt, league=league, season=season),
+            content_type=FORMATS[fmt],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{resource}.{fmt}"'
+        return response
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.db.models import Avg, Count
 from .models import (
     Tag, Ingredient, Recipe, RecipeIngredient,
-    Favorite, Comment, Rating
+    Favorite, Comment, Rating, AccountDeletion, DataExport
 )
 
 @admin.register(Tag)
@@ -68,4 +68,17 @@ class CommentAdmin(admin.ModelAdmin):
 class RatingAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'recipe', 'value')
     search_fields = ('user__username', 'recipe__title')
-    list_filter = ('value',)
\ No newline at end of file
+    list_filter = ('value',)
+
+
+@admin.register(AccountDeletion)
+class AccountDeletionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'username', 'status', 'step', 'requested_at', 'finished_at')
+    search_fields = ('username',)
+    list_filter = ('status',)
+
+
+@admin.register(DataExport)
+class DataExportAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'size', 'requested_at', 'finished_at')
+    list_filter = ('status',)
\ No newline at end of file
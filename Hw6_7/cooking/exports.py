@@ -0,0 +1,26 @@
+from common import exports as common
+from common.exports import rows
+
+from .models import Comment, Favorite, Rating, Recipe, RecipeIngredient
+
+
+def sections(user):
+    """(file name, rows) pairs that make up a user's export, each rows iterable lazy."""
+    return [
+        ('profile.jsonl', rows(type(user)._base_manager.filter(pk=user.pk))),
+        ('recipes.jsonl', rows(Recipe.objects.filter(author=user))),
+        ('recipe_ingredients.jsonl', rows(
+            RecipeIngredient.objects.filter(recipe__author=user),
+            ['recipe_id', 'ingredient__name', 'ingredient__unit', 'amount'],
+        )),
+        ('recipe_tags.jsonl', rows(
+            Recipe.tags.through.objects.filter(recipe__author=user), ['recipe_id', 'tag__name', 'tag__slug'],
+        )),
+        ('comments.jsonl', rows(Comment.objects.filter(author=user))),
+        ('ratings.jsonl', rows(Rating.objects.filter(user=user))),
+        ('favorites.jsonl', rows(Favorite.objects.filter(user=user))),
+    ]
+
+
+def build_export(export):
+    return common.build_export(export, sections)
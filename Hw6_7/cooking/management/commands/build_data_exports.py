@@ -0,0 +1,8 @@
+from common.management.base import BuildDataExportsCommand
+from cooking.exports import build_export
+from cooking.models import DataExport
+
+
+class Command(BuildDataExportsCommand):
+    queue = DataExport
+    build = staticmethod(build_export)
@@ -103,4 +103,51 @@ class Rating(models.Model):
 
 
     class Meta:
-        unique_together = ('user', 'recipe')
\ No newline at end of file
+        unique_together = ('user', 'recipe')
+
+
+class AccountDeletion(models.Model):
+    # A plain id rather than a FK: the record has to outlive the user row it tracks.
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    user_id = models.BigIntegerField(unique=True)
+    username = models.CharField(max_length=150)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    step = models.PositiveIntegerField(default=0)
+    progress = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Bumped as the job makes progress; a running record that goes quiet is up for grabs.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.username} ({self.status})"
+
+
+class DataExport(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    user = models.ForeignKey(User, related_name='data_exports', on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    # Archive name inside DATA_EXPORT_DIR once the build is done.
+    file_name = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    rows = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    # Bumped as the build makes progress; a running export that goes quiet is up for grabs.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"export {self.pk} of {self.user_id} ({self.status})"
\ No newline at end of file
@@ -5,7 +5,7 @@ from django.db.models import Avg, Count
 
 from .models import (
     Tag, Ingredient, Recipe, RecipeIngredient,
-    Favorite, Comment, Rating
+    Favorite, Comment, Rating, DataExport
 )
 
 class TagSerializer(serializers.ModelSerializer):
@@ -163,3 +163,9 @@ class RatingSerializer(serializers.ModelSerializer):
         if not (1 <= v <= 5):
             raise serializers.ValidationError("Rating must be 1..5")
         return v
+
+class DataExportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DataExport
+        fields = ('id', 'status', 'size', 'rows', 'error', 'requested_at', 'finished_at')
+        read_only_fields = fields
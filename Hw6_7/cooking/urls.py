@@ -18,4 +18,7 @@ urlpatterns = [
     path('comments/<int:pk>/', views.CommentDetailView.as_view(), name='comment-detail'),
 
     path('shopping-list/', views.ShoppingListCreateView.as_view(), name='shopping-list'),
+    path('account/', views.AccountDeleteView.as_view(), name='account-delete'),
+    path('exports/', views.DataExportView.as_view(), name='data-exports'),
+    path('exports/<int:pk>/download/', views.DataExportDownloadView.as_view(), name='data-export-download'),
 ]
\ No newline at end of file
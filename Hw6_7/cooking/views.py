@@ -8,13 +8,16 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.pagination import PageNumberPagination
 
-from .models import Tag, Ingredient, Recipe, Favorite, Comment, Rating, RecipeIngredient
+from .models import Tag, Ingredient, Recipe, Favorite, Comment, Rating, RecipeIngredient, DataExport
 from .serializers import (
     TagSerializer, IngredientSerializer,
     RecipeReadSerializer, RecipeWriteSerializer,
-    CommentSerializer, RatingSerializer
+    CommentSerializer, RatingSerializer, DataExportSerializer
 )
 from .permissions import IsAuthorOrStaff
+from common import views as common
+from common.views import DeferredDeletionMixin
+from .deletion import request_deletion
 
 class TagViewSet(viewsets.ModelViewSet):
     queryset = Tag.objects.all()
@@ -144,4 +147,20 @@ class ShoppingListCreateView(APIView):
                 },
                 'amount': float(total)
             })
-        return Response(result, status=200)
\ No newline at end of file
+        return Response(result, status=200)
+
+
+class AccountDeleteView(DeferredDeletionMixin, generics.DestroyAPIView):
+    request_deletion = staticmethod(request_deletion)
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self):
+        return self.request.user
+
+class DataExportView(common.DataExportView):
+    queue = DataExport
+    serializer_class = DataExportSerializer
+
+
+class DataExportDownloadView(common.DataExportDownloadView):
+    queue = DataExport
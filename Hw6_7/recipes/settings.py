@@ -11,12 +11,15 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import sys
 import os
 from decouple import config, Csv
 from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Apps shared by every project in this repository (the common app) live at its root.
+sys.path.append(str(BASE_DIR.parent))
 
 
 # Quick-start development settings - unsuitable for production
@@ -48,6 +51,7 @@ INSTALLED_APPS = [
     'django_filters',
 
     'cooking',
+    'common',
 
 ]
 
@@ -157,3 +161,7 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Per-user data exports written by build_data_exports, purged after DATA_EXPORT_TTL_DAYS.
+DATA_EXPORT_DIR = Path(config('DATA_EXPORT_DIR', default=str(BASE_DIR / 'exports')))
+DATA_EXPORT_TTL_DAYS = config('DATA_EXPORT_TTL_DAYS', default=7, cast=int)
@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class CommonConfig(AppConfig):
+    # Code shared by every project in this repository; it has no models.
+    name = 'common'
@@ -0,0 +1,127 @@
+import time
+
+from django.db import models, transaction
+from django.utils import timezone
+
+
+BATCH_SIZE = 500
+
+
+def _relations(model):
+    # The same reverse relations Django's Collector follows, M2M through tables included.
+    return [
+        field for field in model._meta.get_fields(include_hidden=True)
+        if field.auto_created and not field.concrete and (field.one_to_one or field.one_to_many)
+    ]
+
+
+def deletion_plan(model, lookup='', path=()):
+    """Leaf-first (model, lookup, action, field) steps that clear every row hanging off `model`.
+
+    `lookup` leads from the step's model back to the user (e.g.
+    'recipe__author'), so each step is a plain filter on the user's id.
+    Children come before their parents, so by the time a batch of rows
+    is deleted nothing references them any more and the collector has
+    nothing left to load.
+    """
+    steps = []
+    path = path or (model,)
+    for rel in _relations(model):
+        related, field = rel.related_model, rel.field
+        related_lookup = f'{field.name}__{lookup}' if lookup else field.name
+        on_delete = rel.on_delete
+        if on_delete is models.CASCADE:
+            if related in path:
+                continue  # self-referencing rows go with the parent batch
+            steps += deletion_plan(related, related_lookup, path + (related,))
+            steps.append((related, related_lookup, 'delete', field))
+        elif on_delete in (models.SET_NULL, models.SET_DEFAULT):
+            steps.append((related, related_lookup, 'detach', field))
+        elif on_delete is not models.DO_NOTHING:
+            steps.append((related, related_lookup, 'protect', field))
+    return steps
+
+
+def default_databases(model):
+    return ['default']
+
+
+def request_deletion(queue, user, **fields):
+    """Deactivate the user right away and queue their data on `queue`, the project's AccountDeletion."""
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        deletion, _ = queue.objects.get_or_create(user_id=user.pk, defaults=fields)
+    return deletion
+
+
+def run_step(model, lookup, action, field, user_id, batch_size=BATCH_SIZE, pause=0.0, progress=None,
+             databases=default_databases):
+    """Apply one plan step to the user's rows in batches of `batch_size`, each in its own transaction."""
+    done = 0
+    for using in databases(model):
+        manager = model._base_manager.using(using)
+        queryset = manager.filter(**{lookup: user_id})
+        if action == 'protect':
+            if queryset.exists():
+                raise models.ProtectedError(
+                    f"{model._meta.label} rows reference this user through {field.name} and block deletion.", set(),
+                )
+            continue
+        value = None if field.remote_field.on_delete is models.SET_NULL else field.get_default()
+        while True:
+            with transaction.atomic(using=using):
+                ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+                if not ids:
+                    break
+                batch = manager.filter(pk__in=ids)
+                if action == 'delete':
+                    # A queryset delete, so pre/post_delete receivers (cache invalidation) still run.
+                    batch.delete()
+                else:
+                    batch.update(**{field.attname: value})
+            done += len(ids)
+            if progress:
+                progress(len(ids))
+            if pause:
+                time.sleep(pause)
+    return done
+
+
+def process_deletion(deletion, user_model, batch_size=BATCH_SIZE, pause=0.0, databases=default_databases):
+    """Delete one account's data in short batches, saving progress so a rerun picks up where it stopped.
+
+    `deletion` must have been claimed. Steps before `deletion.step` are
+    skipped; the current one is simply run again, which is safe because
+    every step only ever touches rows still pointing at the user.
+    """
+    steps = deletion_plan(user_model)
+    deletion.started_at = deletion.started_at or timezone.now()
+    deletion.error = ''
+    deletion.save(update_fields=['started_at', 'error'])
+    try:
+        for index, (model, lookup, action, field) in enumerate(steps):
+            if index < deletion.step:
+                continue
+            label = f'{model._meta.label_lower}.{lookup}'
+
+            def progress(count, label=label):
+                deletion.progress[label] = deletion.progress.get(label, 0) + count
+                deletion.heartbeat_at = timezone.now()
+                deletion.save(update_fields=['progress', 'heartbeat_at'])
+
+            run_step(model, lookup, action, field, deletion.user_id, batch_size, pause, progress, databases)
+            deletion.step = index + 1
+            deletion.heartbeat_at = timezone.now()
+            deletion.save(update_fields=['step', 'heartbeat_at'])
+        user_model._base_manager.filter(pk=deletion.user_id).delete()
+    except Exception as exc:
+        # Whatever stopped it, the record must not stay 'running' with nobody working on it.
+        deletion.status = 'failed'
+        deletion.error = str(exc) or type(exc).__name__
+        deletion.save(update_fields=['status', 'error'])
+        raise
+    deletion.status = 'done'
+    deletion.finished_at = timezone.now()
+    deletion.save(update_fields=['status', 'finished_at'])
+    return deletion
@@ -0,0 +1,161 @@
+import os
+import re
+import time
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+
+
+CHUNK_SIZE = 2000
+WRITE_BUFFER = 64 * 1024
+READ_CHUNK = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# How often a long build tells other workers it is still alive.
+HEARTBEAT_EVERY = 30
+
+
+def export_dir():
+    return Path(getattr(settings, 'DATA_EXPORT_DIR', settings.BASE_DIR / 'exports'))
+
+
+def rows(queryset, fields=None):
+    """The queryset as plain dicts for an export section, password columns left out."""
+    # Straight from a server-side cursor: no model instances, constant memory.
+    fields = fields or [
+        field.attname for field in queryset.model._meta.concrete_fields if field.name != 'password'
+    ]
+    return queryset.order_by('pk').values(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+def request_export(queue, user):
+    """Queue an export on `queue`, the project's DataExport, reusing one still waiting or being built."""
+    export = queue.objects.filter(user=user, status__in=['pending', 'running']).first()
+    if export is None:
+        export = queue.objects.create(user=user)
+    return export
+
+
+def write_archive(path, sections, progress=None):
+    """Write (file name, rows) sections to a ZIP of JSON lines files and return the row counts.
+
+    Entries are deflated as they are written, so only one buffer of
+    encoded lines is held in memory however many rows a user has.
+    `progress` is called after every buffer written.
+    """
+    counts = {}
+    encode = DjangoJSONEncoder(ensure_ascii=False).encode
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, section in sections:
+            count = 0
+            with archive.open(name, 'w', force_zip64=True) as entry:
+                buffer = bytearray()
+                for row in section:
+                    buffer += encode(row).encode()
+                    buffer += b'\n'
+                    count += 1
+                    if len(buffer) >= WRITE_BUFFER:
+                        entry.write(buffer)
+                        buffer.clear()
+                        if progress:
+                            progress()
+                entry.write(buffer)
+            counts[name] = count
+    return counts
+
+
+def build_export(export, sections):
+    """Write the archive of a claimed export; `sections(user)` lists what goes in it."""
+    directory = export_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    export.error = ''
+    export.save(update_fields=['error'])
+    name = f'export-{export.pk}.zip'
+    partial = directory / f'{name}.part'
+    last_beat = time.monotonic()
+
+    def progress():
+        nonlocal last_beat
+        if time.monotonic() - last_beat >= HEARTBEAT_EVERY:
+            last_beat = time.monotonic()
+            export.heartbeat_at = timezone.now()
+            export.save(update_fields=['heartbeat_at'])
+
+    try:
+        export.rows = write_archive(partial, sections(export.user), progress)
+        # A download never sees a half-written archive.
+        os.replace(partial, directory / name)
+    except Exception as exc:
+        # Whatever stopped it, the export must not stay 'running' with nobody building it.
+        partial.unlink(missing_ok=True)
+        export.status = 'failed'
+        export.error = str(exc) or type(exc).__name__
+        export.save(update_fields=['status', 'error'])
+        raise
+    export.file_name = name
+    export.size = (directory / name).stat().st_size
+    export.status = 'done'
+    export.finished_at = timezone.now()
+    export.save(update_fields=['file_name', 'size', 'rows', 'status', 'finished_at'])
+    return export
+
+
+def purge_exports(queue, ttl_days):
+    """Delete exports older than `ttl_days` and archives whose row is gone (e.g. deleted accounts)."""
+    cutoff = timezone.now() - timedelta(days=ttl_days)
+    expired = queue.objects.filter(status__in=['done', 'failed'], requested_at__lt=cutoff)
+    removed, _ = expired.delete()
+    directory = export_dir()
+    if directory.is_dir():
+        known = set(queue.objects.exclude(file_name='').values_list('file_name', flat=True))
+        for path in directory.glob('export-*.zip*'):
+            # Leave .part files of builds that may still be running alone for a while.
+            if path.name not in known and time.time() - path.stat().st_mtime > 3600:
+                path.unlink(missing_ok=True)
+    return removed
+
+
+def ranged_file_response(request, path, filename, etag, content_type='application/zip'):
+    """Stream a file, honouring a single-range Range header (and If-Range) so downloads can resume."""
+    size = os.path.getsize(path)
+    start, end, status = 0, size - 1, 200
+    header = request.headers.get('Range', '')
+    if header and request.headers.get('If-Range', etag) == etag:
+        match = RANGE_RE.match(header.strip())
+        # Multiple or malformed ranges fall back to the whole file, which RFC 9110 allows.
+        if match and any(match.groups()):
+            first, last = match.groups()
+            if first:
+                start, end = int(first), min(int(last), size - 1) if last else size - 1
+            else:
+                start = max(size - int(last), 0)
+            if start > end:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+            status = 206
+    length = end - start + 1
+
+    def stream():
+        with open(path, 'rb') as file:
+            file.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = file.read(min(READ_CHUNK, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    response = StreamingHttpResponse(stream(), status=status, content_type=content_type)
+    response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    if status == 206:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
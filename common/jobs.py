@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+
+# A running record whose worker has not reported back for this long is taken to be interrupted.
+STALE_AFTER = timedelta(minutes=10)
+
+
+def claim(record, statuses, stale_after=STALE_AFTER):
+    """Mark a queued record running for this worker; False when another worker holds it.
+
+    `record` is any queue row with `status` and `heartbeat_at` columns.
+    The conditional UPDATE is the lock: of two workers racing for the
+    same record only one sees a row count of 1. A running record is only
+    taken over once its heartbeat is older than `stale_after`.
+    """
+    now = timezone.now()
+    free = Q(status__in=[status for status in statuses if status != 'running'])
+    if 'running' in statuses:
+        free |= Q(status='running') & (Q(heartbeat_at__isnull=True) | Q(heartbeat_at__lt=now - stale_after))
+    claimed = type(record)._base_manager.filter(free, pk=record.pk).update(status='running', heartbeat_at=now)
+    if claimed:
+        record.status, record.heartbeat_at = 'running', now
+    return bool(claimed)
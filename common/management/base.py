@@ -0,0 +1,113 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common.deletion import BATCH_SIZE
+from common.exports import purge_exports
+from common.jobs import STALE_AFTER, claim
+
+
+class ProcessAccountDeletionsCommand(BaseCommand):
+    """process_account_deletions for one project.
+
+    Subclasses set `queue` to the project's AccountDeletion model and
+    `process` to its process_deletion(deletion, batch_size, pause).
+    """
+
+    help = "Delete the data of deactivated accounts in small batches, resuming interrupted deletions."
+    queue = None
+    process = None
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches.")
+        parser.add_argument('--limit', type=int, help="Process at most this many accounts per pass.")
+        parser.add_argument('--retry-failed', action='store_true', help="Also pick up deletions that failed before.")
+        parser.add_argument(
+            '--stale-after', type=int, default=int(STALE_AFTER.total_seconds()),
+            help="Seconds without progress after which another run's deletion counts as interrupted.",
+        )
+        parser.add_argument('--loop', action='store_true', help="Keep running, one pass every --interval seconds.")
+        parser.add_argument('--interval', type=int, default=60)
+
+    def handle(self, *args, **options):
+        statuses = ['running', 'pending'] + (['failed'] if options['retry_failed'] else [])
+        stale_after = timedelta(seconds=options['stale_after'])
+        while True:
+            started = time.perf_counter()
+            # Interrupted deletions first, then the oldest requests.
+            queue = self.queue.objects.filter(status__in=statuses).order_by('-status', 'requested_at')
+            if options['limit']:
+                queue = queue[:options['limit']]
+            done = failed = 0
+            for deletion in queue:
+                if not claim(deletion, statuses, stale_after):
+                    continue  # another run has it
+                try:
+                    self.process(deletion, batch_size=options['batch_size'], pause=options['pause'])
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{deletion}: {exc}")
+                    continue
+                done += 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"{deletion}: {sum(deletion.progress.values())} rows.")
+            self.stdout.write(f"Deleted {done} accounts, {failed} failed, in {time.perf_counter() - started:.2f}s.")
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+
+class BuildDataExportsCommand(BaseCommand):
+    """build_data_exports for one project.
+
+    Subclasses set `queue` to the project's DataExport model and `build`
+    to its build_export(export).
+    """
+
+    help = "Write requested per-user data exports as ZIP archives and purge expired ones."
+    queue = None
+    build = None
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help="Build at most this many exports per pass.")
+        parser.add_argument('--retry-failed', action='store_true', help="Also rebuild exports that failed before.")
+        parser.add_argument('--ttl-days', type=int, default=getattr(settings, 'DATA_EXPORT_TTL_DAYS', 7))
+        parser.add_argument(
+            '--stale-after', type=int, default=int(STALE_AFTER.total_seconds()),
+            help="Seconds without progress after which another run's export counts as interrupted.",
+        )
+        parser.add_argument('--loop', action='store_true', help="Keep running, one pass every --interval seconds.")
+        parser.add_argument('--interval', type=int, default=30)
+
+    def handle(self, *args, **options):
+        # An interrupted export is simply written again.
+        statuses = ['running', 'pending'] + (['failed'] if options['retry_failed'] else [])
+        stale_after = timedelta(seconds=options['stale_after'])
+        while True:
+            started = time.perf_counter()
+            queue = self.queue.objects.filter(status__in=statuses).select_related('user').order_by('requested_at')
+            if options['limit']:
+                queue = queue[:options['limit']]
+            built = failed = 0
+            for export in queue:
+                if not claim(export, statuses, stale_after):
+                    continue  # another run has it
+                try:
+                    self.build(export)
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"export {export.pk}: {exc}")
+                    continue
+                built += 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"export {export.pk}: {sum(export.rows.values())} rows, {export.size} bytes.")
+            purged = purge_exports(self.queue, options['ttl_days'])
+            self.stdout.write(
+                f"Built {built} exports, {failed} failed, purged {purged} in {time.perf_counter() - started:.2f}s."
+            )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
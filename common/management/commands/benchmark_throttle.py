@@ -0,0 +1,62 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import SimpleRateThrottle
+
+from common.throttling import AuthEmailThrottle, AuthIPThrottle, counters
+
+
+class CacheRateThrottle(SimpleRateThrottle):
+    # DRF's stock cache-backed throttle, as a baseline.
+    rate = '1000000000/min'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': 'benchmark', 'ident': self.get_ident(request)}
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of the login throttles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100_000)
+        parser.add_argument('--keys', type=int, default=1000, help="Distinct client IPs and emails.")
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        requests = []
+        for i in range(min(options['keys'], options['requests'])):
+            request = Request(
+                factory.post('/token/', {'email': f'user{i}@example.com', 'password': 'x'}, format='json',
+                             REMOTE_ADDR=f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}'),
+                parsers=[JSONParser()],
+            )
+            request.data  # parse up front: only the throttle is timed
+            requests.append(request)
+        total = options['requests']
+
+        def run(throttles, allowed=True):
+            counters.clear()
+            for throttle in throttles:
+                if hasattr(throttle, 'num_requests'):
+                    throttle.num_requests = total + 1 if allowed else 0
+            started = time.perf_counter()
+            for n in range(total):
+                request = requests[n % len(requests)]
+                for throttle in throttles:
+                    throttle.allow_request(request, None)
+            return (time.perf_counter() - started) / total * 1e6
+
+        results = [
+            ("IP, allowed", run([AuthIPThrottle()])),
+            ("IP + email, allowed", run([AuthIPThrottle(), AuthEmailThrottle()])),
+            ("IP + email, rejected", run([AuthIPThrottle(), AuthEmailThrottle()], allowed=False)),
+            ("DRF cache throttle (IP)", run([CacheRateThrottle()])),
+        ]
+        shared = getattr(settings, 'THROTTLE_SHARED_CACHE', '')
+        self.stdout.write(f"Shared cache tier: {shared or 'off'}, {total} requests over {len(requests)} keys.")
+        for label, micros in results:
+            self.stdout.write(f"{label:<28} {micros:8.2f} us/request")
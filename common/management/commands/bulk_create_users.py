@@ -0,0 +1,209 @@
+import csv
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+
+BATCH_SIZE = 1000
+HASH_CHUNK = 50
+MAX_REPORTED_ERRORS = 20
+
+
+def _init_worker(settings_module):
+    # Spawned workers (macOS, Windows) start without configured settings.
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def _hash_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def describe(exc):
+    if hasattr(exc, 'error_dict'):
+        return '; '.join(f"{field}: {' '.join(messages)}" for field, messages in exc.message_dict.items())
+    return ' '.join(exc.messages)
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, row dict or error message) from a CSV or JSON lines stream."""
+    if fmt == 'csv':
+        for line, row in enumerate(csv.DictReader(stream), start=2):
+            yield line, {key.strip(): value for key, value in row.items() if key and value not in (None, '')}
+        return
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as exc:
+            yield line, f"invalid JSON: {exc}"
+            continue
+        if isinstance(row, dict):
+            # A JSON null is a missing value, as an empty CSV cell is.
+            row = {key: value for key, value in row.items() if value is not None}
+        yield line, row if isinstance(row, dict) else "expected a JSON object"
+
+
+class Command(BaseCommand):
+    help = "Create users in bulk from a CSV or JSON lines file, hashing passwords in a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSON lines file, '-' for stdin.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Password hashing processes.")
+        parser.add_argument(
+            '--on-conflict', choices=['skip', 'update', 'error'], default='skip',
+            help="Users that already exist: leave them, overwrite the columns their row provides, or stop.",
+        )
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or ('csv' if options['path'].endswith('.csv') else 'jsonl')
+        self.model = get_user_model()
+        self.key = self.model.USERNAME_FIELD
+        # Passwords only come in through the password (raw) and password_hash columns.
+        self.fields = {
+            field.name for field in self.model._meta.concrete_fields
+            if not field.primary_key and field.name != 'password'
+        }
+        self.on_conflict = options['on_conflict']
+        self.verbosity = options['verbosity']
+        self.stats = {'created': 0, 'updated': 0, 'skipped': 0, 'invalid': 0}
+
+        started = time.perf_counter()
+        stream = sys.stdin if options['path'] == '-' else open(options['path'], newline='', encoding='utf-8')
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max(1, options['workers']),
+                initializer=_init_worker, initargs=(settings.SETTINGS_MODULE,),
+            ) as pool:
+                # Hash batch N in the pool while batch N-1 is being written.
+                previous = None
+                rows = read_rows(stream, fmt)
+                while batch := list(islice(rows, options['batch_size'])):
+                    prepared = self.prepare(batch, pool)
+                    if previous:
+                        self.write(*previous)
+                    previous = prepared
+                if previous:
+                    self.write(*previous)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - started
+        done = self.stats['created'] + self.stats['updated']
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {self.stats['created']} users, updated {self.stats['updated']}, "
+            f"skipped {self.stats['skipped']} existing and {self.stats['invalid']} invalid rows "
+            f"in {elapsed:.1f}s ({done / max(elapsed, 1e-9):.0f} users/s)."
+        ))
+
+    def clean(self, row):
+        unknown = set(row) - self.fields - {'password', 'password_hash'}
+        if unknown:
+            raise ValidationError(f"unknown columns: {', '.join(sorted(unknown))}")
+        for name in ('password', 'password_hash'):
+            if name in row and not isinstance(row[name], str):
+                raise ValidationError(f"{name} must be a string.")
+        user = self.model()
+        for name, value in row.items():
+            if name in self.fields:
+                setattr(user, self.model._meta.get_field(name).attname, value)
+        user.clean_fields(exclude=['password'])
+        if 'email' in self.fields and user.email:
+            user.email = self.model.objects.normalize_email(user.email)
+        if row.get('password_hash'):
+            user.password = row['password_hash']
+        return user
+
+    def report(self, line, error):
+        self.stats['invalid'] += 1
+        if self.stats['invalid'] <= MAX_REPORTED_ERRORS:
+            self.stderr.write(f"line {line}: {error}")
+
+    def prepare(self, batch, pool):
+        users = {}
+        for line, row in batch:
+            if isinstance(row, str):
+                self.report(line, row)
+                continue
+            try:
+                user = self.clean(row)
+            except ValidationError as exc:
+                self.report(line, describe(exc))
+                continue
+            # The columns this row may overwrite on an existing user.
+            columns = set(row) & self.fields - {self.key}
+            if row.get('password') or row.get('password_hash'):
+                columns.add('password')
+            # A repeated key within the batch: the last row wins.
+            users[getattr(user, self.key)] = (user, row.get('password') or None, columns)
+
+        existing = set(
+            self.model.objects.filter(**{f'{self.key}__in': list(users)}).values_list(self.key, flat=True)
+        )
+        if existing and self.on_conflict == 'error':
+            raise CommandError(
+                f"{len(existing)} users already exist, e.g. {sorted(existing)[0]}; "
+                f"{self.stats['created']} users were created before stopping."
+            )
+        if self.on_conflict == 'skip':
+            self.stats['skipped'] += len(existing)
+            users = {key: value for key, value in users.items() if key not in existing}
+
+        pending = []
+        for user, password, _ in users.values():
+            if password is not None:
+                pending.append(user)
+            elif not user.password:
+                # Cheap, so not worth a trip to the pool; it is never written
+                # over an existing user, whose row has no password column.
+                user.password = make_password(None)
+        passwords = [password for _, password, _ in users.values() if password is not None]
+        chunks = [passwords[start:start + HASH_CHUNK] for start in range(0, len(passwords), HASH_CHUNK)]
+        hashed = pool.map(_hash_passwords, chunks)
+        return [(user, columns) for user, _, columns in users.values()], pending, hashed, existing
+
+    def write(self, users, pending, hashed, existing):
+        for user, password in zip(pending, (password for chunk in hashed for password in chunk)):
+            user.password = password
+        if not users:
+            return
+        manager = self.model.objects
+        with transaction.atomic():
+            if self.on_conflict == 'update':
+                # Updates overwrite only the columns each row provides, so rows
+                # providing the same columns go in one statement.
+                groups = defaultdict(list)
+                for user, columns in users:
+                    groups[frozenset(columns)].append(user)
+                for columns, group in groups.items():
+                    if columns:
+                        manager.bulk_create(
+                            group, batch_size=BATCH_SIZE, update_conflicts=True,
+                            unique_fields=[self.key], update_fields=sorted(columns),
+                        )
+                    else:
+                        manager.bulk_create(group, batch_size=BATCH_SIZE, ignore_conflicts=True)
+            else:
+                # Rows created concurrently since the existence check are ignored too.
+                manager.bulk_create([user for user, _ in users], batch_size=BATCH_SIZE, ignore_conflicts=True)
+        updated = sum(getattr(user, self.key) in existing for user, _ in users)
+        self.stats['updated'] += updated
+        self.stats['created'] += len(users) - updated
+        if self.verbosity > 1:
+            self.stdout.write(f"{self.stats['created']} created, {self.stats['updated']} updated so far.")
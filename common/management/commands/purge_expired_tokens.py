@@ -0,0 +1,37 @@
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding and blacklisted JWT rows in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Tokens per transaction (default 2000).")
+        parser.add_argument('--grace-hours', type=int, default=0, help="Keep tokens this long after they expire.")
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches.")
+        parser.add_argument('--limit', type=int, help="Stop after deleting this many tokens.")
+        parser.add_argument('--loop', action='store_true', help="Keep running, one pass every --interval seconds.")
+        parser.add_argument('--interval', type=int, default=3600)
+
+    def handle(self, *args, **options):
+        if not apps.is_installed('rest_framework_simplejwt.token_blacklist'):
+            raise CommandError("This project does not use the JWT blacklist.")
+        from common.tokens import PURGE_BATCH_SIZE, purge_expired_tokens
+
+        while True:
+            started = time.perf_counter()
+            deleted = purge_expired_tokens(
+                batch_size=options['batch_size'] or PURGE_BATCH_SIZE,
+                grace=timedelta(hours=options['grace_hours']),
+                pause=options['pause'],
+                limit=options['limit'],
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"Deleted {deleted} expired tokens in {time.perf_counter() - started:.2f}s."
+            ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,405 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.apps import apps
+
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from . import deletion, exports
+from .jobs import claim
+from .throttling import AuthEmailThrottle, AuthIPThrottle, SlidingWindowCounter, counters
+
+
+class BulkCreateUsersTests(TestCase):
+    def setUp(self):
+        self.User = get_user_model()
+        self.key = self.User.USERNAME_FIELD
+        self.existing = self.User.objects.create_user(
+            **{self.key: 'a@example.com'}, password='old-password', first_name='A', last_name='Original',
+        )
+
+    def run_command(self, rows, **options):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False, encoding='utf-8') as file:
+            for row in rows:
+                file.write((row if isinstance(row, str) else json.dumps(row)) + '\n')
+        self.addCleanup(os.unlink, file.name)
+        stdout, stderr = StringIO(), StringIO()
+        call_command('bulk_create_users', file.name, workers=1, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_update_overwrites_only_the_columns_each_row_provides(self):
+        self.run_command([
+            {self.key: 'a@example.com', 'last_name': 'Renamed'},
+            {self.key: 'b@example.com', 'password': 'new-password', 'first_name': 'B'},
+        ], on_conflict='update')
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.first_name, self.existing.last_name), ('A', 'Renamed'))
+        self.assertTrue(self.existing.check_password('old-password'))
+        created = self.User.objects.get(**{self.key: 'b@example.com'})
+        self.assertEqual(created.first_name, 'B')
+        self.assertTrue(created.check_password('new-password'))
+
+    def test_update_sets_a_provided_password(self):
+        self.run_command([{self.key: 'a@example.com', 'password': 'new-password'}], on_conflict='update')
+        self.existing.refresh_from_db()
+        self.assertTrue(self.existing.check_password('new-password'))
+        self.assertEqual(self.existing.first_name, 'A')
+
+    def test_skip_leaves_existing_users_alone(self):
+        stdout, _ = self.run_command([
+            {self.key: 'a@example.com', 'first_name': 'Changed'},
+            {self.key: 'c@example.com'},
+        ])
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.first_name, 'A')
+        self.assertIn('Created 1 users, updated 0, skipped 1 existing', stdout)
+        self.assertFalse(self.User.objects.get(**{self.key: 'c@example.com'}).has_usable_password())
+
+    def test_bad_rows_are_reported_not_fatal(self):
+        stdout, stderr = self.run_command([
+            'not json',
+            {self.key: 'd@example.com', 'password': 123},
+            {self.key: 'e@example.com', 'no_such_column': 'x'},
+            {self.key: 'f@example.com', 'password': 'pw'},
+        ])
+        self.assertEqual(len(stderr.splitlines()), 3)
+        self.assertIn('Created 1 users', stdout)
+
+
+class SlidingWindowCounterTests(SimpleTestCase):
+    def test_allows_up_to_the_limit_then_rejects(self):
+        counter = SlidingWindowCounter(max_keys=10)
+        self.assertEqual([counter.hit('k', 3, 60, 0)[0] for _ in range(4)], [True, True, True, False])
+        self.assertEqual(counter.hit('k', 3, 60, 30), (False, 30))
+        # Other keys have their own budget.
+        self.assertTrue(counter.hit('other', 3, 60, 30)[0])
+
+    def test_previous_window_decays(self):
+        counter = SlidingWindowCounter(max_keys=10)
+        for _ in range(4):
+            counter.hit('k', 4, 60, 59)
+        # 15s into the next window, 3/4 of the previous window still counts: 3 of 4.
+        self.assertEqual(counter.hit('k', 4, 60, 75), (True, None))
+        allowed, wait = counter.hit('k', 4, 60, 75)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 0.0)
+        # Two windows later nothing is left.
+        self.assertTrue(counter.hit('k', 4, 60, 185)[0])
+
+    def test_least_recently_used_keys_are_evicted(self):
+        counter = SlidingWindowCounter(max_keys=2)
+        counter.hit('a', 1, 60, 0)
+        counter.hit('b', 1, 60, 0)
+        counter.hit('c', 1, 60, 0)
+        self.assertTrue(counter.hit('a', 1, 60, 0)[0])
+        self.assertFalse(counter.hit('c', 1, 60, 0)[0])
+
+
+@override_settings(REST_FRAMEWORK={
+    'DEFAULT_THROTTLE_RATES': {'auth_ip': '2/min', 'auth_email': '2/min'},
+    'NUM_PROXIES': 0,
+})
+class AuthThrottleTests(SimpleTestCase):
+    def setUp(self):
+        counters.clear()
+        self.addCleanup(counters.clear)
+
+    def request(self, data, **extra):
+        return Request(APIRequestFactory().post('/token/', data, format='json', **extra), parsers=[JSONParser()])
+
+    def test_ip_throttle_ignores_forged_forwarded_for(self):
+        throttle = AuthIPThrottle()
+        results = [
+            throttle.allow_request(self.request({}, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'192.0.2.{n}'), None)
+            for n in range(3)
+        ]
+        self.assertEqual(results, [True, True, False])
+        self.assertGreater(throttle.wait(), 0)
+        self.assertTrue(throttle.allow_request(self.request({}, REMOTE_ADDR='10.0.0.2'), None))
+
+    def test_email_throttle_is_case_insensitive(self):
+        throttle = AuthEmailThrottle()
+        results = [
+            throttle.allow_request(self.request({'email': email}), None)
+            for email in ('A@example.com', 'a@example.com ', 'a@EXAMPLE.com')
+        ]
+        self.assertEqual(results, [True, True, False])
+
+    def test_email_throttle_skips_bodies_without_an_email(self):
+        throttle = AuthEmailThrottle()
+        for body in ([{'email': 'a@example.com'}], 'a@example.com', {'password': 'x'}):
+            with self.subTest(body=body):
+                self.assertIsNone(throttle.get_key(self.request(body)))
+
+    @override_settings(THROTTLE_SHARED_CACHE='default')
+    def test_shared_cache_counts_across_workers(self):
+        throttle = AuthIPThrottle()
+        results = []
+        for _ in range(3):
+            # Each request lands on a "worker" with fresh local counters.
+            counters.clear()
+            results.append(throttle.allow(f'shared-{id(self)}', now=1000))
+        self.assertEqual(results, [True, True, False])
+
+
+def _model_named(name):
+    return next((model for model in apps.get_models() if model.__name__ == name), None)
+
+
+@skipUnless(_model_named('AccountDeletion'), "This project has no account deletion queue.")
+class AccountDeletionTests(TestCase):
+    # Projects may keep user data on more than one database (sharded links).
+    databases = '__all__'
+
+    def setUp(self):
+        self.queue = _model_named('AccountDeletion')
+        self.User = get_user_model()
+        self.user = self.User.objects.create_user(**{self.User.USERNAME_FIELD: 'gone@example.com'}, password='pw')
+        label = {name: 'gone@example.com' for name in ('email', 'username') if hasattr(self.queue, name)}
+        self.record = deletion.request_deletion(self.queue, self.user, **label)
+
+    def test_request_deactivates_the_user(self):
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(self.record.status, 'pending')
+
+    def test_only_one_worker_claims_a_record(self):
+        statuses = ['running', 'pending']
+        other = self.queue.objects.get(pk=self.record.pk)
+        self.assertTrue(claim(self.record, statuses))
+        self.assertFalse(claim(other, statuses))
+        # Once the first worker has gone quiet, the record is up for grabs again.
+        self.queue.objects.filter(pk=self.record.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertTrue(claim(other, statuses))
+
+    def test_processing_deletes_the_user(self):
+        claim(self.record, ['pending'])
+        deletion.process_deletion(self.record, self.User, batch_size=2)
+        self.assertFalse(self.User.objects.filter(pk=self.user.pk).exists())
+        self.record.refresh_from_db()
+        self.assertEqual(self.record.status, 'done')
+
+    def test_any_error_marks_the_record_failed(self):
+        claim(self.record, ['pending'])
+        plan = [(self.User, 'pk', 'delete', None)]
+        with mock.patch.object(deletion, 'deletion_plan', return_value=plan), \
+                mock.patch.object(deletion, 'run_step', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                deletion.process_deletion(self.record, self.User)
+        self.record.refresh_from_db()
+        self.assertEqual((self.record.status, self.record.error), ('failed', 'boom'))
+        self.assertTrue(self.User.objects.filter(pk=self.user.pk).exists())
+
+    def test_command_skips_records_another_run_holds(self):
+        self.queue.objects.filter(pk=self.record.pk).update(status='running', heartbeat_at=timezone.now())
+        stdout = StringIO()
+        call_command('process_account_deletions', stdout=stdout)
+        self.assertIn('Deleted 0 accounts', stdout.getvalue())
+        call_command('process_account_deletions', stale_after=0, stdout=stdout)
+        self.assertIn('Deleted 1 accounts', stdout.getvalue())
+
+
+class RangedFileResponseTests(SimpleTestCase):
+    etag = '"1-100"'
+
+    def setUp(self):
+        self.body = bytes(range(100))
+        with tempfile.NamedTemporaryFile(delete=False) as file:
+            file.write(self.body)
+        self.addCleanup(os.unlink, file.name)
+        self.path = file.name
+
+    def get(self, **headers):
+        request = RequestFactory().get('/download/', headers=headers)
+        return exports.ranged_file_response(request, self.path, 'export.zip', self.etag)
+
+    def content(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_no_range_sends_the_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.content(response), self.body)
+        self.assertEqual((response['Content-Length'], response['Accept-Ranges']), ('100', 'bytes'))
+
+    def test_ranges(self):
+        for header, start, end in [
+            ('bytes=0-9', 0, 9),
+            ('bytes=90-', 90, 99),
+            ('bytes=95-200', 95, 99),
+            ('bytes=-10', 90, 99),
+            ('bytes=-500', 0, 99),
+        ]:
+            with self.subTest(header=header):
+                response = self.get(Range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/100')
+                self.assertEqual(response['Content-Length'], str(end - start + 1))
+                self.assertEqual(self.content(response), self.body[start:end + 1])
+
+    def test_unsatisfiable_range(self):
+        for header in ('bytes=100-', 'bytes=50-10', 'bytes=-0'):
+            with self.subTest(header=header):
+                response = self.get(Range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_stale_if_range_sends_the_whole_file(self):
+        response = self.get(Range='bytes=0-9', If_Range='"1-99"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.content(response), self.body)
+        self.assertEqual(self.get(Range='bytes=0-9', If_Range=self.etag).status_code, 206)
+
+    def test_malformed_or_multiple_ranges_send_the_whole_file(self):
+        for header in ('bytes=-', 'bytes=a-b', 'items=0-9', 'bytes=0-9,20-29'):
+            with self.subTest(header=header):
+                response = self.get(Range=header)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self.content(response), self.body)
+
+
+@skipUnless(_model_named('DataExport'), "This project has no data exports.")
+class DataExportTests(TestCase):
+    # Projects may keep user data on more than one database (sharded links).
+    databases = '__all__'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        export_settings = override_settings(DATA_EXPORT_DIR=directory.name)
+        export_settings.enable()
+        self.addCleanup(export_settings.disable)
+        self.queue = _model_named('DataExport')
+        User = get_user_model()
+        self.user = User.objects.create_user(**{User.USERNAME_FIELD: 'export@example.com'}, password='pw')
+        self.export = exports.request_export(self.queue, self.user)
+
+    def test_request_reuses_an_unfinished_export(self):
+        self.assertEqual(exports.request_export(self.queue, self.user), self.export)
+
+    def test_build_writes_the_sections(self):
+        claim(self.export, ['pending'])
+
+        def sections(user):
+            return [('numbers.jsonl', ({'n': n} for n in range(3)))]
+
+        exports.build_export(self.export, sections)
+        self.export.refresh_from_db()
+        self.assertEqual((self.export.status, self.export.rows), ('done', {'numbers.jsonl': 3}))
+        self.assertTrue((exports.export_dir() / self.export.file_name).is_file())
+
+    def test_long_builds_keep_their_claim(self):
+        claim(self.export, ['pending'])
+        quiet = timezone.now() - timedelta(hours=1)
+        self.queue.objects.filter(pk=self.export.pk).update(heartbeat_at=quiet)
+
+        def sections(user):
+            return [('numbers.jsonl', ({'n': n} for n in range(3)))]
+
+        with mock.patch.object(exports, 'WRITE_BUFFER', 1), mock.patch.object(exports, 'HEARTBEAT_EVERY', 0):
+            exports.build_export(self.export, sections)
+        self.export.refresh_from_db()
+        self.assertGreater(self.export.heartbeat_at, quiet)
+
+    def test_any_error_marks_the_export_failed(self):
+        claim(self.export, ['pending'])
+
+        def sections(user):
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            exports.build_export(self.export, sections)
+        self.export.refresh_from_db()
+        self.assertEqual((self.export.status, self.export.error), ('failed', 'boom'))
+        self.assertEqual(list(exports.export_dir().iterdir()), [])
+
+    def test_command_skips_exports_another_run_holds(self):
+        self.queue.objects.filter(pk=self.export.pk).update(status='running', heartbeat_at=timezone.now())
+        stdout = StringIO()
+        call_command('build_data_exports', stdout=stdout)
+        self.assertIn('Built 0 exports', stdout.getvalue())
+        call_command('build_data_exports', stale_after=0, stdout=stdout)
+        self.assertIn('Built 1 exports', stdout.getvalue())
+        self.export.refresh_from_db()
+        self.assertEqual(self.export.status, 'done')
+
+
+@skipUnless(apps.is_installed('rest_framework_simplejwt.token_blacklist'), "This project does not use the JWT blacklist.")
+class TokenBlacklistTests(TestCase):
+    def setUp(self):
+        from . import tokens
+
+        self.tokens = tokens
+        User = get_user_model()
+        self.user = User.objects.create_user(**{User.USERNAME_FIELD: 'user@example.com'})
+        # Tests flush by hand; keep the writer thread out of the way.
+        self.writer = tokens.TokenWriter(interval=60, batch_size=500)
+        for patcher in (
+            mock.patch.object(tokens.TokenWriter, '_start'), mock.patch.object(tokens, 'token_writer', self.writer),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def worker(self, name):
+        # A per-process blacklist that syncs on every lookup, with a cache no other worker sees.
+        return self.tokens.TokenBlacklist(sync_interval=0), LocMemCache(name, {})
+
+    def test_revocation_reaches_workers_with_their_own_cache(self):
+        token = self.tokens.CachedRefreshToken.for_user(self.user)
+        jti = token['jti']
+        (first, first_cache), (second, second_cache) = self.worker('first'), self.worker('second')
+        with mock.patch.object(self.tokens, 'token_blacklist', first), mock.patch.object(self.tokens, 'cache', first_cache):
+            token.blacklist()
+            self.assertIn(jti, first)
+        with mock.patch.object(self.tokens, 'cache', second_cache):
+            self.assertNotIn(jti, second)
+            self.writer.flush()
+            self.assertIn(jti, second)
+
+    def test_blacklisting_wakes_the_writer_instead_of_writing(self):
+        token = self.tokens.CachedRefreshToken.for_user(self.user)
+        with self.assertNumQueries(0):
+            token.blacklist()
+        self.assertTrue(self.writer._wake.is_set())
+
+    def test_lookups_between_syncs_do_not_query(self):
+        blacklist = self.tokens.TokenBlacklist(sync_interval=3600)
+        blacklist.sync()
+        token = self.tokens.CachedRefreshToken.for_user(self.user)
+        with self.assertNumQueries(0):
+            self.assertNotIn(token['jti'], blacklist)
+
+
+@skipUnless(apps.is_installed('rest_framework_simplejwt.token_blacklist'), "This project does not use the JWT blacklist.")
+class TokenWriterTests(SimpleTestCase):
+    def test_writer_thread_survives_unexpected_errors(self):
+        from .tokens import TokenWriter
+
+        writer = TokenWriter(interval=0.01, batch_size=100)
+        flushed = threading.Event()
+        errors = [RuntimeError('boom')]
+
+        def flush():
+            if errors:
+                raise errors.pop()
+            flushed.set()
+            return 0
+
+        with mock.patch.object(writer, 'flush', side_effect=flush), self.assertLogs('common.tokens', 'ERROR'):
+            thread = threading.Thread(target=writer._run, daemon=True)
+            thread.start()
+            self.assertTrue(flushed.wait(5))
+            writer._stopped.set()
+            thread.join(5)
@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+class SlidingWindowCounter:
+    """Two-bucket sliding-window hit counters for a bounded number of keys.
+
+    Each key stores its window index plus the previous and current window
+    counts; the rate is estimated as the previous count weighted by how
+    much of it still overlaps the sliding window, plus the current count.
+    The least recently used keys are evicted past `max_keys`, so memory
+    stays fixed however many IPs or emails show up.
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window, now):
+        """Count one hit if the key is under `limit`; return (allowed, seconds to wait)."""
+        index, offset = divmod(now, window)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [index, 0, 0]
+                if len(self._entries) > self.max_keys:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+                if entry[0] != index:
+                    entry[1] = entry[2] if entry[0] == index - 1 else 0
+                    entry[2] = 0
+                    entry[0] = index
+            previous, current = entry[1], entry[2]
+            if estimate(previous, current, offset, window) >= limit:
+                return False, wait_time(previous, current, limit, offset, window)
+            entry[2] += 1
+            return True, None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def estimate(previous, current, offset, window):
+    return previous * (1 - offset / window) + current
+
+
+def wait_time(previous, current, limit, offset, window):
+    if current >= limit or not previous:
+        return window - offset
+    # Time until the previous window's weight has decayed enough.
+    return max(window * (1 - (limit - current) / previous) - offset, 0.0)
+
+
+def parse_rate(rate):
+    """'5/min' -> (5, 60), in the format DRF's own throttles accept."""
+    num, period = rate.split('/')
+    return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+counters = SlidingWindowCounter(max_keys=getattr(settings, 'THROTTLE_MAX_KEYS', 100_000))
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Throttle on an in-process sliding window, optionally backed by a shared cache.
+
+    Rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'][scope]. The
+    local counters already turn away a single worker's flood without any
+    I/O; with THROTTLE_SHARED_CACHE set to a cache alias, requests that
+    pass locally are also counted across workers in that cache. Views
+    using these should clear authentication_classes, so a rejected
+    request never reaches the database or a password hasher.
+    """
+
+    scope = None
+
+    def __init__(self):
+        rate = api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        self.num_requests, self.duration = parse_rate(rate)
+        self._wait = None
+
+    def get_key(self, request):
+        raise NotImplementedError('.get_key() must be overridden')
+
+    def allow_request(self, request, view):
+        key = self.get_key(request)
+        return key is None or self.allow(key)
+
+    def allow(self, key, now=None):
+        now = time.time() if now is None else now
+        key = f'{self.scope}:{key}'
+        allowed, self._wait = counters.hit(key, self.num_requests, self.duration, now)
+        if allowed and getattr(settings, 'THROTTLE_SHARED_CACHE', ''):
+            allowed = self.shared_hit(caches[settings.THROTTLE_SHARED_CACHE], key, now)
+        return allowed
+
+    def shared_hit(self, cache, key, now):
+        index, offset = divmod(int(now), self.duration)
+        current_key, previous_key = f'throttle:{key}:{index}', f'throttle:{key}:{index - 1}'
+        counts = cache.get_many([current_key, previous_key])
+        previous, current = counts.get(previous_key, 0), counts.get(current_key, 0)
+        if estimate(previous, current, offset, self.duration) >= self.num_requests:
+            self._wait = wait_time(previous, current, self.num_requests, offset, self.duration)
+            return False
+        if not cache.add(current_key, 1, self.duration * 2):
+            cache.incr(current_key)
+        return True
+
+    def wait(self):
+        return self._wait
+
+
+class AuthIPThrottle(SlidingWindowThrottle):
+    # get_ident trusts X-Forwarded-For only as far as REST_FRAMEWORK['NUM_PROXIES'] says.
+    scope = 'auth_ip'
+
+    def get_key(self, request):
+        return self.get_ident(request)
+
+
+class AuthEmailThrottle(SlidingWindowThrottle):
+    # Caps guesses against one account however many IPs they come from.
+    scope = 'auth_email'
+
+    def get_key(self, request):
+        # A JSON array or scalar body has no email; the view rejects it.
+        if not isinstance(request.data, dict):
+            return None
+        email = request.data.get('email')
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+class RegisterIPThrottle(SlidingWindowThrottle):
+    scope = 'register_ip'
+
+    def get_key(self, request):
+        return self.get_ident(request)
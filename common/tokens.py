@@ -0,0 +1,250 @@
+import atexit
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+logger = logging.getLogger(__name__)
+CACHE_KEY = 'jwt:blacklist:{}'
+FLUSH_CHUNK = 500
+PURGE_BATCH_SIZE = 2000
+# Ids are taken before commit, so a row can show up below the last id seen.
+SYNC_OVERLAP = 1000
+
+
+class TokenBlacklist:
+    """Blacklisted refresh-token jtis mapped to their expiry, held per worker.
+
+    A lookup checks the local map, then the shared cache that every worker
+    writes to when it blacklists a token; it never queries the database.
+    At most every `sync_interval` seconds the map is topped up from
+    BlacklistedToken rows newer than the last one seen, which covers
+    revocations made before this worker started and, with a per-process
+    cache, revocations made by other workers. Blacklisting wakes the
+    TokenWriter, so another worker sees a revocation within the shared
+    cache round trip, or without a shared cache within `sync_interval`
+    seconds plus one write. Entries are pruned once the token has expired
+    anyway, so memory follows the number of live revoked tokens, not the
+    table size.
+    """
+
+    def __init__(self, sync_interval):
+        self.sync_interval = sync_interval
+        self._expiry = {}
+        self._last_id = 0
+        self._synced_at = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def add(self, jti, exp):
+        with self._lock:
+            self._expiry[jti] = exp
+        ttl = exp - int(time.time())
+        if ttl > 0:
+            cache.set(CACHE_KEY.format(jti), exp, ttl)
+
+    def __contains__(self, jti):
+        if self._synced_at is None or time.monotonic() - self._synced_at >= self.sync_interval:
+            self.sync()
+        if jti in self._expiry:
+            return True
+        exp = cache.get(CACHE_KEY.format(jti))
+        if exp is None:
+            return False
+        with self._lock:
+            self._expiry[jti] = exp
+        return True
+
+    def sync(self):
+        if not self._sync_lock.acquire(blocking=self._synced_at is None):
+            return  # another thread is already syncing
+        try:
+            now = int(time.time())
+            rows = (
+                BlacklistedToken.objects.filter(id__gt=self._last_id - SYNC_OVERLAP)
+                .order_by('id').values_list('id', 'token__jti', 'token__expires_at')
+            )
+            fresh = {}
+            for row_id, jti, expires_at in rows.iterator(chunk_size=FLUSH_CHUNK):
+                self._last_id = max(self._last_id, row_id)
+                fresh[jti] = int(expires_at.timestamp())
+            with self._lock:
+                self._expiry.update(fresh)
+                self._expiry = {jti: exp for jti, exp in self._expiry.items() if exp > now}
+            self._synced_at = time.monotonic()
+        finally:
+            self._sync_lock.release()
+
+
+class TokenWriter:
+    """OutstandingToken and BlacklistedToken rows queued per worker and inserted in batches.
+
+    Issuing or rotating a token only appends to a list; a daemon thread
+    writes the queue every `interval` seconds, as soon as `batch_size`
+    rows are waiting or a token is blacklisted (the caller only wakes it,
+    so issuing or revoking a token never touches the database and is safe
+    from async views), and at interpreter exit. Lookups never depend on these rows being written:
+    TokenBlacklist is updated immediately.
+    """
+
+    def __init__(self, interval, batch_size):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._outstanding = {}
+        self._blacklisted = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def _row(self, token):
+        return token.payload[api_settings.JTI_CLAIM], (
+            token.payload.get(api_settings.USER_ID_CLAIM), token.current_time,
+            str(token), datetime_from_epoch(token.payload['exp']),
+        )
+
+    def outstand(self, token, blacklist=False):
+        jti, row = self._row(token)
+        with self._lock:
+            self._outstanding.setdefault(jti, row)
+            if blacklist:
+                self._blacklisted.append(jti)
+            due = blacklist or len(self._outstanding) >= self.batch_size
+        if self._thread is None:
+            self._start()
+        if due:
+            self._wake.set()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='token-writer', daemon=True)
+            self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            # Nothing restarts this thread, so no error may end the loop.
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Token flush failed, will retry.")
+
+    def flush(self):
+        with self._lock:
+            outstanding, self._outstanding = self._outstanding, {}
+            blacklisted, self._blacklisted = self._blacklisted, []
+        if not outstanding and not blacklisted:
+            return 0
+        try:
+            self._write(outstanding, blacklisted)
+        except Exception:
+            # Whatever went wrong, the rows stay queued for the next flush.
+            with self._lock:
+                for jti, row in outstanding.items():
+                    self._outstanding.setdefault(jti, row)
+                self._blacklisted[:0] = blacklisted
+            raise
+        return len(outstanding)
+
+    def _write(self, outstanding, blacklisted):
+        # Users deleted since the token was issued would break the FK; the
+        # row is kept without a user, as OutstandingToken already allows.
+        # The user id claim is a string.
+        user_ids = {row[0] for row in outstanding.values() if row[0] is not None}
+        existing = {str(pk) for pk in get_user_model().objects.filter(pk__in=user_ids).values_list('pk', flat=True)}
+        with transaction.atomic():
+            OutstandingToken.objects.bulk_create(
+                [
+                    OutstandingToken(
+                        jti=jti, user_id=user_id if user_id in existing else None,
+                        created_at=created_at, token=token, expires_at=expires_at,
+                    )
+                    for jti, (user_id, created_at, token, expires_at) in outstanding.items()
+                ],
+                batch_size=FLUSH_CHUNK,
+                ignore_conflicts=True,
+            )
+            for start in range(0, len(blacklisted), FLUSH_CHUNK):
+                ids = OutstandingToken.objects.filter(jti__in=blacklisted[start:start + FLUSH_CHUNK]).values_list('id', flat=True)
+                BlacklistedToken.objects.bulk_create(
+                    [BlacklistedToken(token_id=token_id) for token_id in ids], ignore_conflicts=True,
+                )
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        self.flush()
+
+
+token_blacklist = TokenBlacklist(sync_interval=getattr(settings, 'TOKEN_BLACKLIST_SYNC', 5))
+token_writer = TokenWriter(
+    interval=getattr(settings, 'TOKEN_FLUSH_INTERVAL', 2),
+    batch_size=getattr(settings, 'TOKEN_FLUSH_BATCH', 500),
+)
+
+
+class CachedRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check and bookkeeping stay off the request's DB path."""
+
+    @classmethod
+    def for_user(cls, user):
+        # Skip BlacklistMixin.for_user, which inserts the OutstandingToken row inline.
+        token = super(BlacklistMixin, cls).for_user(user)
+        token_writer.outstand(token)
+        return token
+
+    def check_blacklist(self):
+        if self.payload[api_settings.JTI_CLAIM] in token_blacklist:
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        token_blacklist.add(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        token_writer.outstand(self, blacklist=True)
+
+    def outstand(self):
+        token_writer.outstand(self)
+
+
+def purge_expired_tokens(batch_size=PURGE_BATCH_SIZE, grace=timedelta(0), pause=0.0, limit=None):
+    """Delete expired outstanding tokens and their blacklist rows, one short transaction per batch.
+
+    Expired tokens fail signature checks on their own, so their rows are
+    dead weight. The scan walks the primary key forward, so each batch
+    costs the same however large the tables have grown.
+    """
+    cutoff = timezone.now() - grace
+    last_id = 0
+    deleted = 0
+    while limit is None or deleted < limit:
+        size = batch_size if limit is None else min(batch_size, limit - deleted)
+        with transaction.atomic():
+            ids = list(
+                OutstandingToken.objects.filter(id__gt=last_id, expires_at__lt=cutoff)
+                .order_by('id').values_list('id', flat=True)[:size]
+            )
+            if not ids:
+                break
+            # One DELETE for the blacklist rows, one for the tokens.
+            OutstandingToken.objects.filter(id__in=ids).delete()
+        last_id = ids[-1]
+        deleted += len(ids)
+        if pause:
+            time.sleep(pause)
+    return deleted
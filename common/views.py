@@ -0,0 +1,58 @@
+from django.http import Http404
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+
+from .exports import export_dir, ranged_file_response, request_export
+
+
+class DeferredDeletionMixin:
+    """destroy() for the user's own account: switched off now, its data left to process_account_deletions.
+
+    Views set `request_deletion` to their project's request_deletion(user).
+    """
+
+    request_deletion = None
+
+    def destroy(self, request, *args, **kwargs):
+        deletion = self.request_deletion(self.get_object())
+        return Response({'status': deletion.status, 'requested_at': deletion.requested_at},
+                        status=status.HTTP_202_ACCEPTED)
+
+
+class DataExportView(generics.ListCreateAPIView):
+    """The user's recent exports; POST queues a new one. Subclasses set `queue` to the project's DataExport."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
+    queue = None
+
+    def get_queryset(self):
+        return self.queue.objects.filter(user=self.request.user).order_by('-requested_at')[:20]
+
+    def create(self, request, *args, **kwargs):
+        # build_data_exports writes the archive; clients poll the list until it is done.
+        export = request_export(self.queue, request.user)
+        return Response(self.get_serializer(export).data, status=status.HTTP_202_ACCEPTED)
+
+
+class DataExportDownloadView(generics.RetrieveAPIView):
+    """A finished export's archive, resumable with Range requests. Subclasses set `queue`."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    queue = None
+
+    def get_queryset(self):
+        return self.queue.objects.filter(user=self.request.user, status='done')
+
+    def perform_content_negotiation(self, request, force=False):
+        # The body is a ZIP whatever the Accept header asks for.
+        return super().perform_content_negotiation(request, force=True)
+
+    def retrieve(self, request, *args, **kwargs):
+        export = self.get_object()
+        path = export_dir() / export.file_name
+        if not path.is_file():
+            raise Http404
+        return ranged_file_response(
+            request, path, f'data-export-{export.finished_at:%Y-%m-%d}.zip', etag=f'"{export.pk}-{export.size}"',
+        )
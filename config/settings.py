@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 
     'users', 
     'posts',
+    'common',
 ]
 
 MIDDLEWARE = [
@@ -118,3 +119,7 @@ STATIC_URL = 'static/'
 
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Per-user data exports written by build_data_exports, purged after DATA_EXPORT_TTL_DAYS.
+DATA_EXPORT_DIR = Path(os.getenv('DATA_EXPORT_DIR', BASE_DIR / 'exports'))
+DATA_EXPORT_TTL_DAYS = int(os.getenv('DATA_EXPORT_TTL_DAYS', 7))
@@ -0,0 +1,14 @@
+from common import deletion as common
+from common.deletion import BATCH_SIZE
+
+from .models import AccountDeletion, CustomUser
+
+
+def request_deletion(user):
+    """Deactivate the user right away and queue their data for the background job."""
+    return common.request_deletion(AccountDeletion, user, email=user.email)
+
+
+def process_deletion(deletion, batch_size=BATCH_SIZE, pause=0.0):
+    # CustomUser, not get_user_model(): this project does not set AUTH_USER_MODEL.
+    return common.process_deletion(deletion, CustomUser, batch_size, pause)
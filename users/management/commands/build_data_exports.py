@@ -0,0 +1,8 @@
+from common.management.base import BuildDataExportsCommand
+from users.exports import build_export
+from users.models import DataExport
+
+
+class Command(BuildDataExportsCommand):
+    queue = DataExport
+    build = staticmethod(build_export)
@@ -0,0 +1,8 @@
+from common.management.base import ProcessAccountDeletionsCommand
+from users.deletion import process_deletion
+from users.models import AccountDeletion
+
+
+class Command(ProcessAccountDeletionsCommand):
+    queue = AccountDeletion
+    process = staticmethod(process_deletion)
@@ -6,5 +6,8 @@ urlpatterns = [
     path('register/', RegisterView.as_view()),
     path('token/', CustomTokenObtainPairView.as_view()),
     path('token/refresh/', TokenRefreshView.as_view()),
+    path('account/', AccountDeleteView.as_view()),
+    path('exports/', DataExportView.as_view()),
+    path('exports/<int:pk>/download/', DataExportDownloadView.as_view()),
 
 ]
\ No newline at end of file
@@ -1,8 +1,12 @@
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import CustomTokenObtainPairSerializer
-from rest_framework import generics, permissions
-from .models import CustomUser
-from .serializers import RegisterSerializer
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from .models import CustomUser, DataExport
+from .serializers import RegisterSerializer, DataExportSerializer
+from common import views as common
+from common.views import DeferredDeletionMixin
+from .deletion import request_deletion
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
@@ -10,4 +14,19 @@ class CustomTokenObtainPairView(TokenObtainPairView):
 class RegisterView(generics.CreateAPIView):
     queryset = CustomUser.objects.all()
     serializer_class = RegisterSerializer
-    permission_classes = [permissions.AllowAny]
\ No newline at end of file
+    permission_classes = [permissions.AllowAny]
+
+class AccountDeleteView(DeferredDeletionMixin, generics.DestroyAPIView):
+    request_deletion = staticmethod(request_deletion)
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_object(self):
+        return self.request.user
+
+class DataExportView(common.DataExportView):
+    queue = DataExport
+    serializer_class = DataExportSerializer
+
+
+class DataExportDownloadView(common.DataExportDownloadView):
+    queue = DataExport